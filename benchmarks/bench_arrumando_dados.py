@@ -0,0 +1,49 @@
+"""
+Benchmark de hipotese3.arrumando_dados: a conversao original (to_datetime com
+inferencia de formato e .apply linha a linha) contra a atual, na planilha de
+pilotos e num cadastro sintetico de 1 milhao de pilotos.
+
+Uso: python3 benchmarks/bench_arrumando_dados.py [linhas]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import hipotese3
+
+
+def arrumando_dados_original(dataframe: pd.DataFrame) -> pd.DataFrame:
+    # Conversao original, mantida aqui apenas como referencia
+    dataframe = dataframe[["nationality", "dob"]].copy()
+    dataframe["dob"] = pd.to_datetime(dataframe["dob"])
+    dataframe["birth year"] = dataframe["dob"].apply(lambda x: x.year)
+    return dataframe.drop(columns=["dob"])
+
+def synthetic_drivers(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    drivers = tabelas.load_table("drivers")
+    dias = rng.integers(-25_000, 15_000, rows)
+    return pd.DataFrame({"nationality": rng.choice(drivers["nationality"].unique(), rows),
+                         "dob": pd.to_datetime(dias, unit="D").strftime(hipotese3.DOB_FORMAT)})
+
+def timed(func, *args) -> tuple:
+    inicio = time.perf_counter()
+    resultado = func(*args)
+    return resultado, time.perf_counter() - inicio
+
+def compare(label: str, dataframe: pd.DataFrame) -> None:
+    original, t_original = timed(arrumando_dados_original, dataframe)
+    novo, t_novo = timed(hipotese3.arrumando_dados, dataframe)
+    pd.testing.assert_frame_equal(novo.astype({"nationality": object}), original)
+    print(f"{label:<22} original: {t_original * 1000:9.1f} ms   atual: {t_novo * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    compare("drivers.csv", tabelas.load_table("drivers"))
+    compare(f"sintetico ({rows})", synthetic_drivers(rows))
+    hipotese3.arrumando_dados()
+    _, t_guardado = timed(hipotese3.arrumando_dados)
+    print(f"{'planilha guardada':<22} {t_guardado * 1000:.3f} ms")
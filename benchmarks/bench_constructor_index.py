@@ -0,0 +1,46 @@
+"""
+Mede o tempo de construcao do indice (raceId, driverId) -> constructorId e a
+vazao das buscas, comparando com a juncao do pandas usada antes.
+
+Uso: python3 benchmarks/bench_constructor_index.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import indices
+
+
+def best_of(func, repeat: int = 5) -> float:
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+if __name__ == '__main__':
+    results = tabelas.load_table("results")
+    sprints = tabelas.load_table("sprint_results")
+    pit_stops = tabelas.load_table("pit_stops")
+
+    build = best_of(lambda: indices.ConstructorIndex.from_frames(results))
+    build_sprints = best_of(lambda: indices.ConstructorIndex.from_frames(results, sprints))
+    index = indices.ConstructorIndex.from_frames(results)
+    print(f"construcao (results):                {build * 1000:8.2f} ms, {len(index)} chaves")
+    print(f"construcao (results + sprints):      {build_sprints * 1000:8.2f} ms")
+
+    rng = np.random.default_rng(0)
+    sample = results.iloc[rng.integers(0, len(results), 1_000_000)]
+    race_ids = sample["raceId"].to_numpy()
+    driver_ids = sample["driverId"].to_numpy()
+    lookup = best_of(lambda: index.lookup(race_ids, driver_ids))
+    print(f"busca de {len(race_ids)} pares:            {lookup * 1000:8.2f} ms ({len(race_ids) / lookup / 1e6:.1f} M buscas/s)")
+
+    columns = results[["raceId", "driverId", "constructorId"]]
+    merge = best_of(lambda: pd.merge(pit_stops, columns, on=["raceId", "driverId"], how="inner"))
+    indexed = best_of(lambda: index.lookup(pit_stops["raceId"], pit_stops["driverId"]))
+    print(f"pit stops ({len(pit_stops)}): merge {merge * 1000:.2f} ms, indice {indexed * 1000:.2f} ms")
@@ -0,0 +1,56 @@
+"""
+Benchmark da contagem da hipotese 3 num cadastro sintetico grande: o pipeline
+com o arquivo inteiro (obtem_dados_csv + arrumando_dados + cubo) contra
+cubo_em_blocos, comparando tempo e pico de memoria (tracemalloc).
+
+Uso: python3 benchmarks/bench_contagem_em_blocos.py [linhas] [chunksize]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import hipotese3
+
+
+def write_registry(path: str, rows: int) -> None:
+    # Cadastro sintetico com as colunas da planilha de pilotos que a hipotese usa
+    rng = np.random.default_rng(0)
+    drivers = tabelas.load_table("drivers")
+    bloco = 500_000
+    for inicio in range(0, rows, bloco):
+        n = min(bloco, rows - inicio)
+        df = pd.DataFrame({"driverId": np.arange(inicio, inicio + n),
+                           "nationality": rng.choice(drivers["nationality"].unique(), n),
+                           "dob": pd.to_datetime(rng.integers(-25_000, 15_000, n), unit="D").strftime("%Y-%m-%d"),
+                           "url": "http://en.wikipedia.org/wiki/Piloto"})
+        df.to_csv(path, index=False, mode="w" if inicio == 0 else "a", header=inicio == 0)
+
+def measure(func, *args) -> tuple:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = func(*args)
+    tempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, tempo, pico
+
+def inteiro(path: str) -> hipotese3.CuboDeContagens:
+    return hipotese3.cubo_de_contagens(pd.read_csv(path))
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    with tempfile.TemporaryDirectory() as pasta:
+        path = os.path.join(pasta, "drivers.csv")
+        write_registry(path, rows)
+        cubo, t_inteiro, m_inteiro = measure(inteiro, path)
+        blocos, t_blocos, m_blocos = measure(hipotese3.cubo_em_blocos, path, chunksize)
+    pd.testing.assert_frame_equal(blocos.tabela(10), cubo.tabela(10))
+    print(f"{rows} linhas")
+    print(f"arquivo inteiro       {t_inteiro:6.2f} s   pico {m_inteiro / 2**20:8.1f} MB")
+    print(f"em blocos ({chunksize})  {t_blocos:6.2f} s   pico {m_blocos / 2**20:8.1f} MB")
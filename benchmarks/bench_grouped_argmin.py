@@ -0,0 +1,47 @@
+"""
+Compara o kernel grouped_argmin (lexsort + reduceat) com o groupby().idxmin()
+do pandas para achar a volta mais rapida de cada (raceId, lap).
+
+Uso: python3 benchmarks/bench_grouped_argmin.py [repeticoes_do_arquivo]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import voltas
+
+
+def best_of(func, repeat: int = 5) -> float:
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def main(scale: int) -> None:
+    df = voltas.read_lap_times()
+    if scale > 1:
+        offset = int(df["raceId"].max()) + 1
+        df = pd.concat([df.assign(raceId=df["raceId"] + i * offset) for i in range(scale)], ignore_index=True)
+    race = df["raceId"].to_numpy()
+    lap = df["lap"].to_numpy()
+    ms = df["milliseconds"].to_numpy()
+
+    kernel = voltas.grouped_argmin(ms, (race, lap))
+    pandas_idx = df.groupby(["raceId", "lap"])["milliseconds"].idxmin().to_numpy()
+    assert np.array_equal(kernel, pandas_idx), "resultados diferentes"
+
+    order = np.lexsort((lap, race))
+    t_kernel = best_of(lambda: voltas.grouped_argmin(ms, (race, lap)))
+    t_sorted = best_of(lambda: voltas.grouped_argmin(ms[order], (race[order], lap[order]), presorted=True))
+    t_pandas = best_of(lambda: df.groupby(["raceId", "lap"])["milliseconds"].idxmin())
+    print(f"linhas: {len(df)}, grupos: {len(kernel)}")
+    print(f"groupby().idxmin():             {t_pandas * 1000:8.1f} ms")
+    print(f"grouped_argmin:                 {t_kernel * 1000:8.1f} ms")
+    print(f"grouped_argmin (presorted):     {t_sorted * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -0,0 +1,34 @@
+"""
+Benchmark do heatmap da hipotese 3 gravado em PNG sem janela: o caminho com
+seaborn (annot=True, um texto por celula) contra mapa_de_calor_rapido (imshow,
+anotando so as celulas nao nulas ou as top-N), para varios periodos.
+
+Uso: python3 benchmarks/bench_heatmap.py
+"""
+import os
+import sys
+import time
+import tempfile
+import matplotlib
+matplotlib.use("Agg")
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import hipotese3
+
+
+def timed(func, *args, **kwargs) -> float:
+    inicio = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - inicio
+
+if __name__ == '__main__':
+    cubo = hipotese3.cubo_de_contagens()
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, "heatmap.png")
+        for periodo in (10, 2, 1):
+            tabela = cubo.tabela(periodo)
+            seaborn = timed(hipotese3.visualizando_pilotos_por_pais_e_periodo, tabela, True, arquivo=arquivo)
+            rapido = timed(hipotese3.mapa_de_calor_rapido, tabela, arquivo)
+            top = timed(hipotese3.mapa_de_calor_rapido, tabela, arquivo, top_n=100)
+            svg = timed(hipotese3.mapa_de_calor_rapido, tabela, os.path.join(pasta, "heatmap.svg"))
+            print(f"periodo {periodo:>2} ({tabela.shape[0]}x{tabela.shape[1]}): seaborn {seaborn:6.2f} s"
+                  f"   imagem {rapido:6.2f} s   top-100 {top:6.2f} s   svg {svg:6.2f} s")
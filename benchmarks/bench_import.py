@@ -0,0 +1,52 @@
+"""
+Benchmark do tempo de importacao de cada modulo de src/, cada um num
+interpretador novo. Mede so o custo do proprio modulo, descontando numpy e
+pandas (carregados antes), e falha (status 1) se algum passar do orcamento ou
+carregar matplotlib/seaborn na importacao.
+
+Uso: python3 benchmarks/bench_import.py [orcamento em ms]
+     (padrao: F1_IMPORT_BUDGET_MS ou 250)
+"""
+import os
+import sys
+import json
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+MODULES = ("tabelas", "memo", "banco", "indices", "voltas", "graficos",
+           "hipotese1", "hipotese2", "hipotese3", "relatorio")
+PLOTTING = ("matplotlib", "seaborn")
+REPEAT = 3
+
+_CODE = """
+import sys, time, json
+import numpy, pandas
+inicio = time.perf_counter()
+import {module}
+fim = time.perf_counter()
+print(json.dumps({{"ms": (fim - inicio) * 1000, "plotting": [m for m in {plotting!r} if m in sys.modules]}}))
+"""
+
+def import_time(module: str) -> tuple:
+    # menor tempo entre REPEAT execucoes, e os pacotes de grafico carregados
+    tempos = []
+    for _ in range(REPEAT):
+        saida = subprocess.run([sys.executable, "-c", _CODE.format(module=module, plotting=PLOTTING)],
+                               cwd=SRC, capture_output=True, text=True, check=True).stdout
+        resultado = json.loads(saida.strip().splitlines()[-1])
+        tempos.append(resultado["ms"])
+    return min(tempos), resultado["plotting"]
+
+if __name__ == '__main__':
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.environ.get("F1_IMPORT_BUDGET_MS", "250"))
+    falhas = []
+    for module in MODULES:
+        ms, plotting = import_time(module)
+        status = "ok"
+        if ms > budget or plotting:
+            status = "FALHOU"
+            falhas.append(module)
+        extra = f"   carregou {', '.join(plotting)}" if plotting else ""
+        print(f"{module:>10}: {ms:7.1f} ms  {status}{extra}")
+    print(f"orcamento {budget:.0f} ms por modulo")
+    sys.exit(1 if falhas else 0)
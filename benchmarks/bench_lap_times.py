@@ -0,0 +1,70 @@
+"""
+Roda calculate_hipotesis (caminho padrao: conversao do lap_times.csv para o
+LapStore e calculo de todos os anos) sobre um lap_times.csv sintetico N vezes
+maior que o original e mede o pico de memoria contra um orcamento fixo.
+
+As copias recebem raceIds deslocados, entao o arquivo cresce mas as temporadas
+pedidas continuam com o mesmo numero de voltas. Tudo (planilhas, store, snapshots,
+anos guardados) fica numa pasta temporaria, entao o .cache do projeto nao e usado.
+
+Uso: python3 benchmarks/bench_lap_times.py [escala] [orcamento_mb]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import voltas
+import indices
+import memo
+import hipotese1
+
+
+def build_synthetic(target: str, scale: int) -> None:
+    original = pd.read_csv(tabelas.table_path("lap_times"))
+    offset = int(original["raceId"].max()) + 1
+    for copy in range(scale):
+        block = original.copy()
+        block["raceId"] += copy * offset
+        block.to_csv(target, mode="w" if copy == 0 else "a", header=(copy == 0), index=False)
+
+def isolate(tmp: str, scale: int) -> None:
+    #Planilhas e caches apontando para a pasta temporaria
+    data_dir = os.path.join(tmp, "data")
+    os.makedirs(data_dir)
+    for name in hipotese1.TABLES:
+        shutil.copy(tabelas.table_path(name), data_dir)
+    build_synthetic(os.path.join(data_dir, "lap_times.csv"), scale)
+    tabelas.DATA_DIR = data_dir
+    tabelas.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+    voltas.LAP_STORE_DIR = os.path.join(tmp, "lap_store")
+    indices.INDEX_DIR = os.path.join(tmp, "indices")
+    memo.MEMO_DIR = os.path.join(tmp, "memo")
+    hipotese1.SEASON_STORE_DIR = os.path.join(tmp, "hipotese1")
+
+def main(scale: int, budget_mb: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(tmp, scale)
+        size_mb = os.path.getsize(tabelas.table_path("lap_times")) / 2**20
+
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        hipotese1.calculate_hipotesis(2023, 1995, workers=1, force=True, diagnostics="silent")
+        tempo = time.perf_counter() - inicio
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        voltas._open_stores.clear()
+
+    peak_mb = peak / 2**20
+    print(f"arquivo: {size_mb:.0f} MB ({scale}x), tempo: {tempo:.1f} s, pico: {peak_mb:.0f} MB, orcamento: {budget_mb:.0f} MB")
+    if peak_mb > budget_mb:
+        sys.exit("pico de memoria acima do orcamento")
+
+if __name__ == '__main__':
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    budget_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 256
+    main(scale, budget_mb)
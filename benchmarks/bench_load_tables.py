@@ -0,0 +1,68 @@
+"""
+Benchmark da carga das tabelas da hipotese 2: leitura uma apos a outra
+contra tabelas.load_tables com um pool de uma thread por tabela (forcado com
+workers; sem ele load_tables le em sequencia quando ha uma so CPU),
+com o cache do processo vazio
+e, quando o sistema permite, com os arquivos retirados do cache de paginas
+(posix_fadvise DONTNEED), simulando o disco frio.
+
+Uso: python3 benchmarks/bench_load_tables.py [repeticoes]
+"""
+import os
+import sys
+import glob
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import hipotese2
+
+
+def drop_page_cache() -> bool:
+    # Tenta tirar do cache de paginas os CSVs e os snapshots; devolve False se nao for possivel
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    arquivos = [tabelas.table_path(name) for name in hipotese2.TABLES]
+    arquivos += glob.glob(os.path.join(tabelas.SNAPSHOT_DIR, "*"))
+    for arquivo in arquivos:
+        fd = os.open(arquivo, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+def sequential() -> None:
+    for name in hipotese2.TABLES:
+        tabelas.load_table(name)
+
+def concurrent() -> None:
+    tabelas.load_tables(hipotese2.TABLES, workers=len(hipotese2.TABLES))
+
+def end_to_end(preload) -> None:
+    preload()
+    hipotese2.pit_stops_across_years(2011, 2023)
+
+def best_cold(func, repeat: int) -> float:
+    tempos = []
+    for _ in range(repeat):
+        tabelas.clear_cache()
+        drop_page_cache()
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    tabelas.build_snapshots()
+    hipotese2.pit_stops_across_years(2011, 2023)
+    print(f"cache de paginas frio: {'sim' if drop_page_cache() else 'nao'}, CPUs: {os.cpu_count()}")
+    for label, snapshots in (("snapshots", True), ("csv", False)):
+        tabelas.USE_SNAPSHOTS = snapshots
+        seq = best_cold(sequential, repeat)
+        par = best_cold(concurrent, repeat)
+        print(f"{label:<10} carga    sequencial: {seq * 1000:8.1f} ms   threads: {par * 1000:8.1f} ms")
+        seq = best_cold(lambda: end_to_end(sequential), repeat)
+        par = best_cold(lambda: end_to_end(concurrent), repeat)
+        print(f"{label:<10} 2011-23  sequencial: {seq * 1000:8.1f} ms   threads: {par * 1000:8.1f} ms")
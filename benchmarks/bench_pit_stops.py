@@ -0,0 +1,62 @@
+"""
+Microbenchmark da montagem da media de pit stop por construtor: o laco
+antigo com iterrows e .loc contra mean_pit_by_constructor, nas 13 temporadas
+de 2011 a 2023 e num grid sintetico de 50 construtores.
+
+Uso: python3 benchmarks/bench_pit_stops.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import hipotese2
+
+
+def assemble_loop(pit_stops_agg: pd.DataFrame, r_result: pd.Series) -> pd.DataFrame:
+    # Montagem original, mantida aqui apenas como referencia
+    final = pd.DataFrame(columns=["pits", "time"], index=r_result.index)
+    for index, row in pit_stops_agg.iterrows():
+        constructor = row["constructorId"]
+        final.loc[constructor, "pits"] = row['total_pits']
+        final.loc[constructor, "time"] = row['total_time_ms']
+    final["mean_pit"] = final["time"] / final["pits"]
+    return final.drop(columns=["pits", "time"])
+
+def season_inputs(year: int) -> tuple:
+    races = hipotese2.search_year(year)
+    merged = hipotese2.associate_constructors(hipotese2.filter_pit_stops(year, races))
+    return hipotese2.aggregate_pit_stops(merged), hipotese2.constructor_result(year)
+
+def synthetic_inputs(constructors: int = 50) -> tuple:
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, constructors + 1)
+    # alguns construtores pontuam sem ter pit stops registrados
+    with_pits = ids[rng.random(constructors) > 0.1]
+    agg = pd.DataFrame({"constructorId": with_pits,
+                        "total_time_ms": rng.integers(500_000, 2_000_000, len(with_pits)),
+                        "total_pits": rng.integers(20, 80, len(with_pits))})
+    points = pd.Series(rng.integers(0, 500, constructors).astype(float),
+                       index=pd.Index(ids, name="constructorId"), name="points")
+    return agg, points
+
+def best_of(func, repeat: int = 20) -> float:
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def compare(label: str, inputs: list) -> None:
+    for agg, points in inputs:
+        novo = hipotese2.mean_pit_by_constructor(agg, points)
+        pd.testing.assert_frame_equal(novo, assemble_loop(agg, points).astype(float))
+    loop = best_of(lambda: [assemble_loop(agg, points) for agg, points in inputs])
+    novo = best_of(lambda: [hipotese2.mean_pit_by_constructor(agg, points) for agg, points in inputs])
+    print(f"{label:<28} iterrows: {loop * 1000:8.2f} ms   alinhado: {novo * 1000:8.2f} ms")
+
+if __name__ == '__main__':
+    compare("13 temporadas (2011-2023)", [season_inputs(year) for year in range(2011, 2024)])
+    compare("grid sintetico (50)", [synthetic_inputs(50)])
@@ -0,0 +1,34 @@
+"""
+Benchmark do grafico de dispersao da hipotese 2 gravado em PNG sem janela:
+modo "pontos" (um marcador por linha) contra modo "densidade" (grade de
+np.histogram2d), com quantidades crescentes de pontos sinteticos.
+
+Uso: python3 benchmarks/bench_scatter.py
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import hipotese2
+
+
+def timed(func, *args, **kwargs) -> float:
+    inicio = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - inicio
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, "scatter.png")
+        for n in (1_000, 100_000, 1_000_000):
+            combined_df = pd.DataFrame({"mean_pit": rng.normal(25000, 3000, n), "points": rng.exponential(100, n),
+                                        "year": rng.integers(2011, 2024, n)})
+            pontos = timed(hipotese2.plot_scatter, combined_df, arquivo, modo="pontos")
+            densidade = timed(hipotese2.plot_scatter, combined_df, arquivo, modo="densidade")
+            print(f"{n:>9} pontos: pontos {pontos:6.2f} s   densidade {densidade:6.2f} s")
@@ -0,0 +1,46 @@
+"""
+Compara o tempo de carga das planilhas lidas com pd.read_csv com o tempo
+de carga pelo snapshot colunar (frio: gera o snapshot, quente: ja existe),
+no formato em uso (feather com pyarrow, npz sem). A ultima coluna diz o que
+read_csv_cached usa: arquivos abaixo de tabelas.SNAPSHOT_MIN_BYTES sao lidos do CSV.
+
+Uso: python3 benchmarks/bench_snapshots.py [tabela ...]
+"""
+import os
+import sys
+import time
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+
+
+def best_of(func, repeat: int = 5) -> float:
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def cold_load(filepath: str) -> None:
+    target = tabelas.snapshot_path(filepath)
+    if os.path.exists(target):
+        os.remove(target)
+    tabelas.build_snapshot(os.path.basename(filepath))
+
+def main(names: list) -> None:
+    print(f"formato: {'feather' if tabelas.HAS_PYARROW else 'npz'}")
+    print(f"{'tabela':<24}{'read_csv (ms)':>15}{'frio (ms)':>12}{'quente (ms)':>13}{'usado':>10}")
+    for name in names:
+        filepath = tabelas.table_path(name)
+        csv = best_of(lambda: pd.read_csv(filepath))
+        cold = best_of(lambda: cold_load(filepath), repeat=3)
+        target = tabelas.snapshot_path(filepath)
+        meta = tabelas._source_meta(os.stat(filepath))
+        warm = best_of(lambda: tabelas._read_snapshot(target, meta))
+        usado = "snapshot" if tabelas._is_snapshotable(filepath, os.path.getsize(filepath)) else "csv"
+        print(f"{name:<24}{csv * 1000:>15.1f}{cold * 1000:>12.1f}{warm * 1000:>13.1f}{usado:>10}")
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or sorted(f[:-4] for f in os.listdir(tabelas.DATA_DIR) if f.endswith('.csv'))
+    main(names)
@@ -0,0 +1,42 @@
+"""
+Benchmark das consultas pontuais das hipoteses com e sem o backend SQLite:
+search_year, championship_result, filter_pit_stops e constructor_result de um
+ano, com o cache de tabelas e o memo vazios (como num processo novo).
+
+Uso: python3 benchmarks/bench_sqlite.py [ano]
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import memo
+import banco
+import hipotese1
+import hipotese2
+
+
+def point_queries(year: int) -> None:
+    races = hipotese2.search_year(year)
+    hipotese1.championship_result(year)
+    hipotese2.filter_pit_stops(year, races)
+    hipotese2.constructor_result(year)
+
+def best_cold(year: int, repeat: int = 5) -> float:
+    tempos = []
+    for _ in range(repeat):
+        tabelas.clear_cache()
+        memo.clear_all()
+        inicio = time.perf_counter()
+        point_queries(year)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+if __name__ == '__main__':
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else 2023
+    inicio = time.perf_counter()
+    banco.build_database()
+    print(f"banco conferido/importado em {time.perf_counter() - inicio:.2f} s ({banco.DB_PATH})")
+    for label, enabled in (("csv/snapshots", False), ("sqlite", True)):
+        banco.ENABLED = enabled
+        print(f"{label:<14} {year}: {best_cold(year) * 1000:8.2f} ms")
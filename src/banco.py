@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+import tabelas
+
+#Banco SQLite com as planilhas da pasta data/, gerado a partir dos CSVs
+DB_PATH = os.path.join(tabelas.CACHE_DIR, 'f1.sqlite')
+#O backend e opcional: F1_BACKEND=sqlite faz as consultas pontuais das hipoteses usarem o banco
+ENABLED = os.environ.get("F1_BACKEND", "csv") == "sqlite"
+#Colunas indexadas em toda tabela que as tiver, e indices compostos por tabela
+INDEXED_COLUMNS = ("raceId", "year", "driverId", "constructorId")
+COMPOSITE_INDEXES = {"lap_times": [("raceId", "lap")]}
+
+_local = threading.local()
+_lock = threading.Lock()
+#Tabelas ja conferidas neste processo: nome -> (caminho do banco, mtime, tamanho do CSV)
+_checked = {}
+
+def active(dataset=None) -> bool:
+    """
+    Diz se as consultas devem ir para o banco: backend ligado e nenhum dataset informado.
+    """
+    return ENABLED and dataset is None
+
+def _connection() -> sqlite3.Connection:
+    #Uma conexao por thread, refeita se DB_PATH mudar
+    connection = getattr(_local, "connection", None)
+    if connection is None or _local.path != DB_PATH:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        connection = sqlite3.connect(DB_PATH, timeout=60)
+        connection.execute("CREATE TABLE IF NOT EXISTS _sources (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)")
+        _local.connection = connection
+        _local.path = DB_PATH
+    return connection
+
+def import_table(name: str) -> None:
+    """
+    Importa (ou reimporta) um CSV da pasta data/ para o banco e cria os indices.
+
+    Parameters
+    ----------
+    name : str
+        Nome da tabela, com ou sem a extensao .csv.
+
+    Raises
+    ------
+    FileNotFoundError
+        Se o CSV nao existir.
+    """
+    filepath = tabelas.table_path(name)
+    name = os.path.basename(filepath)[:-4]
+    stat = os.stat(filepath)
+    df = pd.read_csv(filepath)
+    connection = _connection()
+    with connection:
+        #A tabela e refeita do zero, entao o rowid segue a ordem das linhas do CSV
+        connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+        df.to_sql(name, connection, index=False, chunksize=100_000)
+        for column in INDEXED_COLUMNS:
+            if column in df.columns:
+                connection.execute(f'CREATE INDEX "ix_{name}_{column}" ON "{name}" ("{column}")')
+        for columns in COMPOSITE_INDEXES.get(name, []):
+            joined = ", ".join(f'"{column}"' for column in columns)
+            connection.execute(f'CREATE INDEX "ix_{name}_{"_".join(columns)}" ON "{name}" ({joined})')
+        connection.execute("INSERT OR REPLACE INTO _sources VALUES (?, ?, ?)", (name, stat.st_mtime_ns, stat.st_size))
+
+def ensure_tables(names) -> None:
+    """
+    Garante que as tabelas estejam no banco e atualizadas em relacao aos CSVs,
+    importando apenas as que faltam ou mudaram.
+
+    Parameters
+    ----------
+    names : list
+        Nomes das tabelas.
+    """
+    for name in names:
+        stat = os.stat(tabelas.table_path(name))
+        key = (DB_PATH, stat.st_mtime_ns, stat.st_size)
+        if _checked.get(name) == key:
+            continue
+        with _lock:
+            saved = _connection().execute("SELECT mtime_ns, size FROM _sources WHERE name = ?", (name,)).fetchone()
+            if saved != (stat.st_mtime_ns, stat.st_size):
+                import_table(name)
+            _checked[name] = key
+
+def build_database(names=None) -> list:
+    """
+    Importa para o banco todos os CSVs da pasta data/ (ou apenas os pedidos).
+
+    Parameters
+    ----------
+    names : list, opcional
+        Nomes das tabelas. Se None, todas as planilhas de data/.
+
+    Returns
+    -------
+    list
+        Nomes das tabelas conferidas.
+    """
+    if names is None:
+        names = sorted(filename[:-4] for filename in os.listdir(tabelas.DATA_DIR) if filename.endswith('.csv'))
+    ensure_tables(names)
+    return list(names)
+
+def query(sql: str, params=(), tables=()) -> pd.DataFrame:
+    """
+    Executa uma consulta no banco e devolve apenas as linhas pedidas.
+
+    Parameters
+    ----------
+    sql : str
+        Consulta SQL, com ? para os parametros.
+    params : tuple
+        Valores dos parametros.
+    tables : list
+        Tabelas usadas pela consulta, conferidas (e importadas se preciso) antes.
+
+    Returns
+    -------
+    pd.DataFrame
+        Resultado da consulta.
+
+    Examples
+    --------
+    >>> query('SELECT name FROM races WHERE raceId = ?', (1098,), ["races"])
+                     name
+    0  Bahrain Grand Prix
+    """
+    ensure_tables(tables)
+    return pd.read_sql_query(sql, _connection(), params=list(params))
+
+def _placeholders(values) -> tuple:
+    values = [int(value) for value in values]
+    return ", ".join("?" * len(values)), values
+
+def races_of_year(year: int) -> np.ndarray:
+    """
+    IDs das corridas de um ano, em ordem crescente (somente leitura).
+    """
+    df = query('SELECT raceId FROM races WHERE year = ? ORDER BY raceId', (int(year),), ["races"])
+    races = df["raceId"].to_numpy(dtype=np.int64)
+    races.flags.writeable = False
+    return races
+
+def standings_after_race(race_id: int) -> pd.DataFrame:
+    """
+    Pontos de cada piloto no campeonato apos uma corrida, na ordem de classificacao.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexado por driverId com a coluna points.
+    """
+    df = query('SELECT driverId, points FROM driver_standings WHERE raceId = ? ORDER BY position, rowid',
+               (int(race_id),), ["driver_standings"])
+    df["points"] = df["points"].astype(float)
+    return df.set_index("driverId")
+
+def pit_stops_of_races(races, max_milliseconds: int) -> pd.DataFrame:
+    """
+    Pit stops das corridas pedidas com duracao abaixo do limite, na ordem do CSV
+    e com o numero da linha do CSV como indice.
+    """
+    marks, values = _placeholders(races)
+    df = query(f'SELECT rowid - 1 AS "_row", * FROM pit_stops WHERE raceId IN ({marks}) '
+               f'AND milliseconds < ? ORDER BY rowid', (*values, int(max_milliseconds)), ["pit_stops"])
+    df = df.set_index("_row")
+    df.index.name = None
+    return df
+
+def constructor_points(races) -> pd.Series:
+    """
+    Soma dos pontos de cada construtor nas corridas pedidas.
+
+    Returns
+    -------
+    pd.Series
+        Serie points indexada por constructorId, em ordem crescente.
+    """
+    marks, values = _placeholders(races)
+    df = query(f'SELECT constructorId, SUM(points) AS points FROM constructor_results '
+               f'WHERE raceId IN ({marks}) GROUP BY constructorId ORDER BY constructorId',
+               values, ["constructor_results"])
+    return df.set_index("constructorId")["points"].astype(float)
+
+if __name__ == '__main__':
+    print(build_database())
@@ -0,0 +1,236 @@
+import os
+import sys
+import argparse
+import functools
+import importlib.util
+
+#Formatos de saida e a extensao de arquivo de cada um
+FORMATS = {"csv": ".csv", "json": ".json", "parquet": ".parquet"}
+#Anos e periodo padrao (intervalos fechados); as voltas do lap_times.csv vao de 1996 a 2023
+LAP_YEARS = (1996, 2023)
+DEFAULT_YEARS = {"hipotese1": (2023, 1996), "hipotese2": (2011, 2023)}
+DEFAULT_PERIOD = 10
+
+#Caminhos dentro da pasta do cache que cada modulo calcula ao ser importado
+CACHE_PATHS = (("tabelas", "SNAPSHOT_DIR"), ("voltas", "LAP_STORE_DIR"), ("indices", "INDEX_DIR"),
+               ("memo", "MEMO_DIR"), ("banco", "DB_PATH"), ("hipotese1", "SEASON_STORE_DIR"),
+               ("relatorio", "REPORT_DIR"))
+
+def set_cache_dir(cache_dir: str) -> None:
+    """
+    Troca a pasta do cache: a variavel F1_CACHE_DIR (para os processos filhos)
+    e os caminhos de CACHE_PATHS, que os modulos calcularam na importacao a
+    partir da pasta antiga, mantendo a mesma subpasta dentro da nova.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Nova pasta do cache.
+    """
+    import importlib
+    import tabelas
+    cache_dir = os.path.abspath(cache_dir)
+    os.environ["F1_CACHE_DIR"] = cache_dir
+    for module_name, attribute in CACHE_PATHS:
+        module = importlib.import_module(module_name)
+        relative = os.path.relpath(getattr(module, attribute), tabelas.CACHE_DIR)
+        setattr(module, attribute, os.path.join(cache_dir, relative))
+    tabelas.CACHE_DIR = cache_dir
+
+def _apply_cache_options(args: argparse.Namespace) -> None:
+    #As variaveis de ambiente valem para os processos filhos; os atributos, para este processo
+    if args.cache_dir is not None:
+        set_cache_dir(args.cache_dir)
+    if args.no_snapshots:
+        os.environ["F1_SNAPSHOTS"] = "0"
+        import tabelas
+        tabelas.USE_SNAPSHOTS = False
+    if args.memo_disk:
+        os.environ["F1_MEMO_DISK"] = "1"
+        import memo
+        memo.DISK_ENABLED = True
+    if args.backend is not None:
+        os.environ["F1_BACKEND"] = args.backend
+        import banco
+        banco.ENABLED = args.backend == "sqlite"
+
+def _output_format(args: argparse.Namespace) -> str:
+    if args.format is not None:
+        return args.format
+    if args.output not in (None, "-"):
+        extension = os.path.splitext(args.output)[1].lower()
+        for formato, ext in FORMATS.items():
+            if extension == ext:
+                return formato
+    return "csv"
+
+def _parquet_available() -> bool:
+    return any(importlib.util.find_spec(engine) is not None for engine in ("pyarrow", "fastparquet"))
+
+def write_result(df, formato: str, output: str = None) -> None:
+    """
+    Grava o resultado de uma hipotese em CSV, JSON (uma lista de registros) ou
+    Parquet, no arquivo pedido ou na saida padrao. Um indice com nome vira
+    coluna; o indice numerico sem nome e descartado.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Resultado da hipotese.
+    formato : str
+        "csv", "json" ou "parquet".
+    output : str, opcional
+        Caminho do arquivo. Se None ou "-", escreve na saida padrao.
+
+    Raises
+    ------
+    ValueError
+        Se o formato for invalido.
+    """
+    if formato not in FORMATS:
+        raise ValueError(f"formato precisa ser um de {sorted(FORMATS)}")
+    if any(name is not None for name in df.index.names):
+        df = df.reset_index()
+    else:
+        df = df.reset_index(drop=True)
+    #Parquet e JSON pedem nomes de coluna em texto (os periodos da hipotese 3 sao inteiros)
+    df.columns = [str(column) for column in df.columns]
+    df.columns.name = None
+    to_stdout = output in (None, "-")
+    if formato == "csv":
+        df.to_csv(sys.stdout if to_stdout else output, index=False)
+    elif formato == "json":
+        texto = df.to_json(orient="records", force_ascii=False)
+        if to_stdout:
+            sys.stdout.write(texto + "\n")
+        else:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(texto + "\n")
+    else:
+        if to_stdout:
+            sys.stdout.flush()
+            df.to_parquet(sys.stdout.buffer, index=False)
+            sys.stdout.buffer.flush()
+        else:
+            df.to_parquet(output, index=False)
+
+def _run_hipotese1(args: argparse.Namespace):
+    import hipotese1
+    #calculate_hipotesis nao inclui o ultimo ano (range(f_year, l_year, -1)); na CLI o intervalo e fechado
+    newest, oldest = max(args.years), min(args.years)
+    relacao, report = hipotese1.calculate_hipotesis_report(newest, oldest - 1, workers=args.workers,
+                                                           force=args.force)
+    #O relatorio vai para stderr, para nao misturar com o resultado na saida padrao
+    if not report.empty:
+        print(f"Voltas rapidas de pilotos fora do campeonato:\n{report.to_string(index=False)}", file=sys.stderr)
+    plot = functools.partial(hipotese1.plot_hipotesis, relacao)
+    return relacao, plot
+
+def _run_hipotese2(args: argparse.Namespace):
+    import hipotese2
+    combined = hipotese2.pit_stops_across_years(min(args.years), max(args.years))
+    plot = functools.partial(hipotese2.plot_scatter, combined)
+    return combined, plot
+
+def _run_hipotese3(args: argparse.Namespace):
+    import pandas as pd
+    import hipotese3
+    tabela = hipotese3.cubo_de_contagens().tabela(args.period)
+    if not args.maximos:
+        plot = functools.partial(hipotese3.visualizando_pilotos_por_pais_e_periodo, tabela, False)
+        return tabela, plot
+    maximos, paises = hipotese3.paises_com_mais_pilotos_por_periodo(tabela)
+    resumo = pd.DataFrame({"pilotos": maximos, "nationality": paises})
+    plot = functools.partial(hipotese3.visualizando_quais_paises_nasceram_mais_pilotos_por_periodo, maximos, paises)
+    return resumo, plot
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Monta o parser da linha de comando, com um subcomando por hipotese.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    saida = common.add_argument_group("saida")
+    saida.add_argument("-o", "--output", metavar="ARQUIVO",
+                       help="arquivo do resultado; sem ele (ou com -) escreve na saida padrao")
+    saida.add_argument("-f", "--format", choices=sorted(FORMATS),
+                       help="formato do resultado; padrao: pela extensao de --output, senao csv")
+    saida.add_argument("--no-plot", action="store_true", help="so calcula, sem gerar o grafico")
+    saida.add_argument("--plot-file", metavar="ARQUIVO",
+                       help="grava o grafico nesse arquivo (PNG, SVG, ...) em vez de abrir a janela")
+    cache = common.add_argument_group("cache")
+    cache.add_argument("--cache-dir", metavar="PASTA",
+                       help="pasta do cache (F1_CACHE_DIR); padrao: .cache na raiz do projeto")
+    cache.add_argument("--no-snapshots", action="store_true", help="le sempre os CSVs, sem os snapshots (F1_SNAPSHOTS=0)")
+    cache.add_argument("--memo-disk", action="store_true", help="guarda os resultados memoizados em disco (F1_MEMO_DISK=1)")
+    cache.add_argument("--backend", choices=("csv", "sqlite"), help="backend das consultas pontuais (F1_BACKEND)")
+
+    parser = argparse.ArgumentParser(prog="cli.py", description="Analises das hipoteses sobre a Formula 1.")
+    subparsers = parser.add_subparsers(dest="hipotese", required=True, metavar="HIPOTESE")
+
+    h1 = subparsers.add_parser("hipotese1", parents=[common], help="pontos x voltas rapidas por piloto e ano")
+    h1.add_argument("--years", nargs=2, type=int, metavar=("ANO", "ANO"), default=DEFAULT_YEARS["hipotese1"],
+                    help="intervalo de anos, em qualquer ordem (1996 a 2023); padrao: 2023 1996")
+    h1.add_argument("-w", "--workers", type=int, help="processos para calcular os anos em paralelo (F1_WORKERS)")
+    h1.add_argument("--force", action="store_true", help="recalcula todos os anos, ignorando o .cache/hipotese1")
+    h1.set_defaults(run=_run_hipotese1)
+
+    h2 = subparsers.add_parser("hipotese2", parents=[common], help="media de pit stop x pontos dos construtores")
+    h2.add_argument("--years", nargs=2, type=int, metavar=("ANO", "ANO"), default=DEFAULT_YEARS["hipotese2"],
+                    help="intervalo de anos, em qualquer ordem; padrao: 2011 2023")
+    h2.set_defaults(run=_run_hipotese2)
+
+    h3 = subparsers.add_parser("hipotese3", parents=[common], help="pilotos nascidos por periodo e nacionalidade")
+    h3.add_argument("--period", type=int, default=DEFAULT_PERIOD, help="tamanho do periodo em anos; padrao: 10")
+    h3.add_argument("--maximos", action="store_true",
+                    help="so o pais com mais pilotos nascidos em cada periodo, em vez da tabela completa")
+    h3.set_defaults(run=_run_hipotese3)
+    return parser
+
+def main(argv=None) -> int:
+    """
+    Ponto de entrada da linha de comando: calcula a hipotese pedida, grava o
+    resultado e, sem --no-plot, gera o grafico.
+
+    Parameters
+    ----------
+    argv : list, opcional
+        Argumentos (sem o nome do programa). Se None, usa sys.argv.
+
+    Returns
+    -------
+    int
+        Codigo de saida (0 em caso de sucesso).
+
+    Examples
+    --------
+    >>> main(["hipotese2", "--years", "2022", "2023", "--no-plot", "-o", "h2.parquet"])
+    0
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    formato = _output_format(args)
+    if formato == "parquet" and not _parquet_available():
+        parser.error("o formato parquet precisa do pyarrow ou do fastparquet instalado")
+    if getattr(args, "workers", None) is not None and args.workers < 1:
+        parser.error("--workers precisa ser positivo")
+    if args.hipotese == "hipotese1" and not all(LAP_YEARS[0] <= year <= LAP_YEARS[1] for year in args.years):
+        parser.error(f"--years precisa estar entre {LAP_YEARS[0]} e {LAP_YEARS[1]} (anos com dados de voltas)")
+    if getattr(args, "period", None) is not None and args.period < 1:
+        parser.error("--period precisa ser positivo")
+    _apply_cache_options(args)
+
+    try:
+        resultado, plot = args.run(args)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+    write_result(resultado, formato, args.output)
+    if not args.no_plot:
+        if args.plot_file is not None:
+            #Sem janela quando o grafico vai para um arquivo
+            import matplotlib
+            matplotlib.use("Agg")
+        plot(arquivo=args.plot_file)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
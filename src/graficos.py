@@ -0,0 +1,96 @@
+import os
+import numpy as np
+
+#Acima desta quantidade de pontos os graficos de dispersao passam para o modo de densidade
+DENSITY_THRESHOLD = int(os.environ.get("F1_DENSITY_THRESHOLD", "50000"))
+DENSITY_BINS = 200
+
+def scatter_mode(n_points: int, modo: str = "auto", limite: int = None) -> str:
+    """
+    Escolhe como desenhar um grafico de dispersao.
+
+    Parameters
+    ----------
+    n_points : int
+        Quantidade de pontos.
+    modo : str
+        "pontos" (dispersao exata), "densidade" (grade de contagens) ou
+        "auto", que usa densidade acima do limite.
+    limite : int, opcional
+        Limite do modo "auto". Se None, usa DENSITY_THRESHOLD.
+
+    Returns
+    -------
+    str
+        "pontos" ou "densidade".
+
+    Raises
+    ------
+    ValueError
+        Se o modo for invalido.
+    """
+    if modo not in ("auto", "pontos", "densidade"):
+        raise ValueError('modo precisa ser "auto", "pontos" ou "densidade"')
+    if modo != "auto":
+        return modo
+    if limite is None:
+        limite = DENSITY_THRESHOLD
+    return "densidade" if n_points > limite else "pontos"
+
+def density_grid(x, y, values=None, bins: int = DENSITY_BINS) -> tuple:
+    """
+    Agrupa os pontos numa grade 2D com np.histogram2d.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Coordenadas dos pontos (NaN sao ignorados).
+    values : array-like, opcional
+        Valor de cada ponto. Se informado, a grade traz a media desses
+        valores por celula; senao, a contagem de pontos.
+    bins : int
+        Quantidade de faixas em cada eixo.
+
+    Returns
+    -------
+    tuple
+        (grade, bordas_x, bordas_y), com a grade mascarada onde nao ha pontos
+        e indexada como [y, x] (pronta para pcolormesh).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    validos = np.isfinite(x) & np.isfinite(y)
+    if values is not None:
+        values = np.asarray(values, dtype=float)
+        validos &= np.isfinite(values)
+    x, y = x[validos], y[validos]
+    contagens, bordas_x, bordas_y = np.histogram2d(x, y, bins=bins)
+    if values is None:
+        grade = contagens
+    else:
+        somas, _, _ = np.histogram2d(x, y, bins=[bordas_x, bordas_y], weights=values[validos])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grade = somas / contagens
+    return np.ma.masked_where(contagens.T == 0, grade.T), bordas_x, bordas_y
+
+def density_scatter(ax, x, y, values=None, bins: int = DENSITY_BINS, cmap: str = "viridis"):
+    """
+    Desenha a grade de density_grid no eixo com pcolormesh. O custo do desenho
+    depende so da quantidade de faixas, nao da quantidade de pontos.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Eixo onde desenhar.
+    x, y, values, bins
+        Repassados para density_grid.
+    cmap : str
+        Mapa de cores.
+
+    Returns
+    -------
+    matplotlib.collections.QuadMesh
+        A malha desenhada (para a barra de cores).
+    """
+    grade, bordas_x, bordas_y = density_grid(x, y, values, bins)
+    return ax.pcolormesh(bordas_x, bordas_y, grade, cmap=cmap, shading="flat")
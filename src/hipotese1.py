@@ -1,10 +1,27 @@
 import pandas as pd
 import numpy as np
-from matplotlib import pyplot as plt
 import sys
 import os
+import glob
+import pickle
+import hashlib
+from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import tabelas
+import voltas
+import indices
+import memo
+import banco
+import graficos
 
-def search_year(year: int) -> np.array:
+#Tabelas lidas pela hipotese 1 alem das voltas, carregadas juntas por tabelas.load_tables
+TABLES = ("races", "driver_standings", "drivers")
+
+def _table(name: str, dataset: tabelas.Dataset = None) -> pd.DataFrame:
+    #Sem dataset as tabelas vem da pasta data/, pelo cache
+    return tabelas.resolve_dataset(dataset).table(name)
+
+def search_year(year: int, dataset: tabelas.Dataset = None) -> np.array:
     """
     Procura todas as corridas de um certo ano passado como parametros
 
@@ -12,12 +29,14 @@ def search_year(year: int) -> np.array:
     ----------
     year: int
         Indica o ano desejado
+    dataset: tabelas.Dataset
+        Conjunto de tabelas a usar, se None le da pasta data/
     
     Retorno
     -------
     races: numpy.array
-        array com todos os id das corridas do ano
-        passado como parametro
+        array (somente leitura) com todos os id das corridas do ano
+        passado como parametro, em ordem crescente
     
     Exemplo
     -------
@@ -30,17 +49,14 @@ def search_year(year: int) -> np.array:
     if year > 2023 or year < 1950:
         raise ValueError(f'{year} esta fora do intervalo 2023-1950')
     
-    #Caminho para a planilha com informacoes sobre as corridas
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'races.csv')
-    collumn_year = "year"
-
-    df = pd.read_csv(filepath)
-    #Filtra apenas as corridas de um determinado ano passado como parametro
-    races = df[df[collumn_year]==year]
-    races = races["raceId"].unique()
+    if banco.active(dataset):
+        return banco.races_of_year(year)
+    #Consulta o indice ano -> corridas, construido uma vez a partir do races.csv
+    races = indices.race_index(dataset).races_of_year(year)
     return races
 
-def championship_result(year: int) -> pd.DataFrame:
+@memo.memoize(["races", "driver_standings"])
+def championship_result(year: int, dataset: tabelas.Dataset = None) -> pd.DataFrame:
     """
     Busca pelo resultado real do campeonato de pilotos,
     seguindo a pontuacao oficial da categoria
@@ -49,6 +65,8 @@ def championship_result(year: int) -> pd.DataFrame:
     ----------
     year: int
         Indica o ano desejado
+    dataset: tabelas.Dataset
+        Conjunto de tabelas a usar, se None le da pasta data/
 
     Retorno
     -------
@@ -88,32 +106,41 @@ def championship_result(year: int) -> pd.DataFrame:
     if year > 2023 or year < 1950:
         raise ValueError(f'{year} esta fora do intervalo 2023-1950')
     
-    filepath = (os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),"data","driver_standings.csv"))
     collumn_race = "raceId"
     collumn_driver = "driverId"
     collumn_points = "points"
 
-    races = search_year(year)
-    df = pd.read_csv(filepath)
+    races = search_year(year, dataset)
     #Dado um ano, busca o resultado final do campeonato, ou seja, a pontuação após a ultima corrida
     race = races.max()
+    if banco.active(dataset):
+        #Consulta indexada que traz apenas as linhas da ultima corrida
+        return banco.standings_after_race(race)
+    df = _table("driver_standings", dataset)
     champ_year = df[df[collumn_race] == race].sort_values(by="position")
     champ_year = champ_year[[collumn_driver, collumn_points]].set_index(collumn_driver)
     return champ_year
 
-def calculate_fastest_laps(df: pd.DataFrame, drivers: pd.Index, races: np.array) -> pd.DataFrame:
+def calculate_fastest_laps(df: pd.DataFrame, drivers: pd.Index, races: np.array, unknown: list = None, dataset: tabelas.Dataset = None) -> pd.DataFrame:
     """
     Auxilia a parte principal da hipotese, dado todas corridas
     de um ano, retorna a quantidade de voltas rapidas de cada piloto
 
     Parametros
     ----------
-    df: pandas.DataFrame
-        O dataframe com os dados de volta a volta
+    df: pandas.DataFrame ou voltas.LapStore
+        O dataframe com os dados de volta a volta, ou o store mapeado
+        em memoria (nesse caso cada corrida e lida como uma fatia, sem filtro do pandas)
     drivers: pandas.Index
         Id dos pilotos participantes em um certo ano
     races: numpy.ndarray
         Id de todas as corridas de um certo ano
+    unknown: list
+        Se for passada uma lista, as voltas rapidas de pilotos que nao estao em
+        drivers sao adicionadas nela como pares (driverId, raceId) e nada e impresso.
+        Se None, essas voltas sao impressas de uma vez com unknown_drivers_report
+    dataset: tabelas.Dataset
+        Repassado para unknown_drivers_report, se None le da pasta data/
 
     Retorno
     -------
@@ -158,25 +185,82 @@ def calculate_fastest_laps(df: pd.DataFrame, drivers: pd.Index, races: np.array)
     collumn_lap = "lap"
     #Cria um dataframe de zeros com os indices dos pilotos presentes no resultado final do campeonato
     final = pd.DataFrame(np.zeros(len(drivers), dtype=np.int32), index=drivers, columns=["fast"])
-    
-    for track in races:
-        df_btrack = (df[df[circuit_collumn] == track])
-        laps = (df_btrack[collumn_lap].unique())
-        for lap in laps:
-            df_laps = (df_btrack[df_btrack[collumn_lap] == lap])
-            fast_lap = df_laps[collumn_time].argmin()
-            piloto = df_laps.iloc[fast_lap].loc[collumn_driver]
-            #Para evitar erros de pilotos que fizeram alguma volta rapida, mas nao entraram na pontuacao do mundial de pilotos
-            #apenas imprimo usando outra funcao e seguimos
-            try:
-                final.loc[piloto] += 1
-            except:
-                find_driver_track_err(int(piloto), int(track))
 
-    
+    #No store cada corrida ja vem agrupada e ordenada por volta, entao nao precisa reordenar
+    presorted = isinstance(df, voltas.LapStore)
+    if presorted:
+        df_season = df.races(races)
+    else:
+        df_season = df[df[circuit_collumn].isin(races)]
+    if len(df_season) == 0:
+        return final
+    race_ids = np.asarray(df_season[circuit_collumn])
+    laps = np.asarray(df_season[collumn_lap])
+    times = np.asarray(df_season[collumn_time])
+    driver_ids = np.asarray(df_season[collumn_driver])
+
+    #A volta mais rapida de cada (corrida, volta); em caso de empate fica
+    #a linha que aparece primeiro no arquivo, como no argmin
+    winners = voltas.grouped_argmin(times, (race_ids, laps), presorted=presorted)
+
+    #Converte o id de cada piloto vencedor para a sua posicao em drivers e conta tudo de uma vez
+    slots = drivers.get_indexer(driver_ids[winners])
+    found = slots >= 0
+    final["fast"] = np.bincount(slots[found], minlength=len(drivers)).astype(np.int32)
+
+    #Pilotos que fizeram alguma volta rapida, mas nao entraram na pontuacao do mundial de pilotos,
+    #sao apenas anotados (na ordem das corridas recebidas) e seguimos
+    missing = winners[~found]
+    race_order = pd.Index(races).get_indexer(race_ids[missing])
+    missing = missing[np.lexsort((laps[missing], race_order))]
+    pairs = [(int(driver_ids[pos]), int(race_ids[pos])) for pos in missing]
+    if unknown is not None:
+        unknown.extend(pairs)
+    elif pairs:
+        print(unknown_drivers_report(pairs, dataset).to_string(index=False), '\n')
+
     return final
 
-def find_driver_track_err(driverid: int, raceid: int) -> None:
+def unknown_drivers_report(unknown: list, dataset: tabelas.Dataset = None) -> pd.DataFrame:
+    """
+    Monta o relatorio dos pilotos que fizeram voltas rapidas mas nao estao
+    no resultado final do campeonato, com uma unica juncao com as planilhas
+    de pilotos e de corridas
+
+    Parametros
+    ----------
+    unknown: list
+        Pares (driverId, raceId), um para cada volta rapida sem piloto no campeonato
+    dataset: tabelas.Dataset
+        Conjunto de tabelas a usar, se None le da pasta data/
+
+    Retorno
+    -------
+    pandas.DataFrame
+        Uma linha por piloto e corrida, na ordem em que apareceram, com as colunas
+        driverId, raceId, driver (nome e sobrenome), year, round, grand_prix e
+        laps (quantidade de voltas rapidas)
+
+    Exemplos
+    --------
+    >>> print(unknown_drivers_report([(28, 45), (28, 45)]).to_string(index=False))
+     driverId  raceId            driver  year  round          grand_prix  laps
+           28      45 Markus Winkelhock  2007     10 European Grand Prix     2
+    """
+    if not isinstance(unknown, list):
+        raise TypeError('unknown precisa ser uma lista de pares (driverId, raceId)')
+
+    df_drivers = _table("drivers", dataset)[['driverId', 'forename', 'surname']]
+    df_races = _table("races", dataset)[['raceId', 'year', 'round', 'name']]
+
+    pairs = pd.DataFrame(unknown, columns=['driverId', 'raceId'], dtype=np.int64)
+    report = pairs.groupby(['driverId', 'raceId'], sort=False).size().rename('laps').reset_index()
+    report = report.merge(df_drivers, on='driverId', how='left').merge(df_races, on='raceId', how='left')
+    report['driver'] = report['forename'] + ' ' + report['surname']
+    report = report.rename(columns={'name': 'grand_prix'})
+    return report[['driverId', 'raceId', 'driver', 'year', 'round', 'grand_prix', 'laps']]
+
+def find_driver_track_err(driverid: int, raceid: int, dataset: tabelas.Dataset = None) -> None:
     """
     Printa no terminal nome do piloto e informacoes da pista
     caso exista erro de ter volta mais rapida e nao tiver no 
@@ -188,6 +272,8 @@ def find_driver_track_err(driverid: int, raceid: int) -> None:
         Id do piloto
     raceid: int
         Id da pista
+    dataset: tabelas.Dataset
+        Conjunto de tabelas a usar, se None le da pasta data/
 
     Retorno
     -------
@@ -207,23 +293,127 @@ def find_driver_track_err(driverid: int, raceid: int) -> None:
         raise TypeError(f'os valores nao sao inteiros')
 
     #Busca na base de dados com nomes dos pilotos e imprime o nome e sobrenome
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "drivers.csv")
-    df = pd.read_csv(filepath)
+    df = _table("drivers", dataset)
 
     name = df[df['driverId'] == driverid]
     if name.empty:
         raise ValueError(f'nao foi encontrado piloto com id {driverid}')
     print(name[['forename', 'surname']].to_string(index=False))
     #Busca na base de dados dos GrandPrix ano, nome e rodada em relacao ao campeonato
-    filepath = (os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "races.csv"))
-    df = pd.read_csv(filepath)
+    df = _table("races", dataset)
     
     track = df[df['raceId'] == raceid]
     if track.empty:
         raise ValueError(f'nao foi encontrado grandprix com id {raceid}')
     print(track[['year', 'round', 'name']].to_string(index=False),'\n')
 
-def calculate_hipotesis(f_year: int, l_year=None) -> pd.DataFrame:
+def season_relation(year: int, laps, unknown: list = None, dataset: tabelas.Dataset = None) -> pd.DataFrame:
+    """
+    Calcula a relacao entre voltas rapidas e pontos de um unico ano,
+    as duas colunas em porcentagem relativa ao ano
+
+    Parametros
+    ----------
+    year: int
+        Indica o ano desejado
+    laps: pandas.DataFrame ou voltas.LapStore
+        Dados de volta a volta, basta conter as corridas do ano
+    unknown: list
+        Repassada para calculate_fastest_laps, recebe as voltas rapidas
+        de pilotos fora do campeonato
+    dataset: tabelas.Dataset
+        Conjunto de tabelas a usar, se None le da pasta data/
+
+    Retorno
+    -------
+    pandas.DataFrame
+        Dataframe indexado pelos pilotos do campeonato, com as colunas
+        fast e points (% relativa ao ano)
+    """
+    champ_year = championship_result(year, dataset)
+    drivers = champ_year.index
+    races = search_year(year, dataset)
+    final = calculate_fastest_laps(laps, drivers, races, unknown, dataset)
+    champ_year = champ_year*(100/champ_year.sum())
+    final = final*(100/final.sum())
+    return final.join(champ_year, how='inner')
+
+def _season_worker(args: tuple) -> tuple:
+    #Executado nos processos filhos, recebe apenas as voltas da temporada
+    year, laps, dataset = args
+    unknown = []
+    return season_relation(year, pd.DataFrame(laps), unknown, dataset), unknown
+
+SEASON_STORE_DIR = os.path.join(tabelas.CACHE_DIR, 'hipotese1')
+#Mudar quando o calculo de season_relation mudar, para descartar os anos guardados
+_SEASON_VERSION = 1
+
+def season_fingerprint(year: int, store) -> str:
+    """
+    Calcula a impressao digital dos dados usados por um ano: as corridas,
+    as voltas dessas corridas e o resultado final do campeonato.
+    Se um arquivo mudar apenas em outro ano, a impressao deste ano continua a mesma
+
+    Parametros
+    ----------
+    year: int
+        Indica o ano desejado
+    store: voltas.LapStore
+        Store com os dados de volta a volta
+
+    Retorno
+    -------
+    str
+        Hash hexadecimal dos dados do ano
+    """
+    races = search_year(year)
+    champ_year = championship_result(year)
+    digest = hashlib.sha1()
+    digest.update(str(_SEASON_VERSION).encode())
+    digest.update(np.ascontiguousarray(races, dtype=np.int64).tobytes())
+    digest.update(store.races(races).tobytes())
+    digest.update(pd.util.hash_pandas_object(champ_year, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def _season_path(year: int, key: str) -> str:
+    return os.path.join(SEASON_STORE_DIR, f'{year}-{key}.pkl')
+
+def _load_season(year: int, key: str):
+    #Cada ano guarda o resultado e as voltas rapidas de pilotos fora do campeonato
+    try:
+        saved = pd.read_pickle(_season_path(year, key))
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None
+    if not isinstance(saved, dict):
+        return None
+    return saved['season'], saved['unknown']
+
+def _save_season(year: int, key: str, season: pd.DataFrame, unknown: list) -> None:
+    #Remove versoes antigas do ano e grava a nova de forma atomica
+    os.makedirs(SEASON_STORE_DIR, exist_ok=True)
+    for old in glob.glob(os.path.join(SEASON_STORE_DIR, f'{year}-*.pkl')):
+        #Outro processo salvando o mesmo ano pode ter removido o arquivo antes
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass
+    target = _season_path(year, key)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    pd.to_pickle({'season': season, 'unknown': unknown}, tmp)
+    os.replace(tmp, target)
+
+def _resolve_workers(workers) -> int:
+    if workers is None:
+        workers = os.environ.get("F1_WORKERS", "1")
+        try:
+            workers = int(workers)
+        except ValueError:
+            raise ValueError(f'F1_WORKERS precisa ser um inteiro, recebido {workers}')
+    if not isinstance(workers, int):
+        raise TypeError(f'workers precisa ser um inteiro, recebido {workers}')
+    return workers
+
+def calculate_hipotesis(f_year: int, l_year=None, workers=None, force=False, diagnostics="print", dataset=None) -> pd.DataFrame:
     """
     Calcula a quantidade de voltas rapidas ano a ano no periodo dado.
 
@@ -234,17 +424,35 @@ def calculate_hipotesis(f_year: int, l_year=None) -> pd.DataFrame:
     l_year: int
         O ultimo ano a ser calculado (mais antigo), min:1995
         se None => l_year = f_year (calcula apenas um ano)
+    workers: int
+        Quantidade de processos para calcular os anos em paralelo,
+        se None usa a variavel de ambiente F1_WORKERS (padrao 1, sem paralelismo).
+        Cada processo recebe apenas as voltas do seu ano e o resultado
+        e identico ao calculo sequencial
+    force: bool
+        Cada ano calculado fica guardado em disco (.cache/hipotese1), junto com a
+        impressao digital dos dados usados, e nas proximas chamadas so os anos
+        que faltam ou mudaram sao recalculados. Com force=True tudo e recalculado
+    diagnostics: str
+        O que fazer com as voltas rapidas de pilotos fora do campeonato, juntadas
+        de todos os anos num unico relatorio (ver unknown_drivers_report):
+        "print" imprime o relatorio no final e "silent" ignora.
+        Para receber o relatorio use calculate_hipotesis_report
+    dataset: tabelas.Dataset
+        Conjunto de tabelas a usar, com as voltas na tabela lap_times. Se None,
+        le da pasta data/ (voltas pelo store mapeado em memoria). Com um dataset
+        nada e lido nem gravado em disco: os anos nao passam pelo .cache/hipotese1
 
     Retorno
     -------
     pandas.DataFrame
         Um dataframe com todos pilotos nesse periodo, ano a ano,
         as colunas sao o pontos feitos(% relativa ao ano)
-        e quantidade de voltas rapidas(% relativa ao ano)
+        e quantidade de voltas rapidas(% relativa ao ano).
 
     Exemplo
     -------
-    >>> print(calculate_hipotesis(2023, 1995))
+    >>> print(calculate_hipotesis(2023, 1995, workers=4))
               fast     points
     0    41.056604  23.393002
     1    13.207547  11.594793
@@ -260,6 +468,38 @@ def calculate_hipotesis(f_year: int, l_year=None) -> pd.DataFrame:
 
     [667 rows x 2 columns]
     """
+    if diagnostics not in ("print", "silent"):
+        raise ValueError(f'diagnostics precisa ser "print" ou "silent", recebido {diagnostics}')
+    relacao, unknown = _calculate_seasons(f_year, l_year, workers, force, dataset)
+    if diagnostics == "print":
+        #Todos os pilotos fora do campeonato sao resolvidos de uma vez, no final
+        report = unknown_drivers_report(unknown, dataset)
+        if not report.empty:
+            print(report.to_string(index=False))
+    return relacao
+
+def calculate_hipotesis_report(f_year: int, l_year=None, workers=None, force=False,
+                               dataset=None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Igual a calculate_hipotesis, mas devolve tambem o relatorio das voltas
+    rapidas de pilotos fora do campeonato, em vez de imprimi-lo.
+
+    Parametros
+    ----------
+    f_year, l_year, workers, force, dataset
+        Os mesmos de calculate_hipotesis
+
+    Retorno
+    -------
+    tuple
+        (relacao, relatorio): o dataframe de calculate_hipotesis e o de
+        unknown_drivers_report, com os pilotos de todos os anos do periodo
+    """
+    relacao, unknown = _calculate_seasons(f_year, l_year, workers, force, dataset)
+    return relacao, unknown_drivers_report(unknown, dataset)
+
+def _calculate_seasons(f_year: int, l_year, workers, force, dataset) -> Tuple[pd.DataFrame, list]:
+    #Calcula (ou le do .cache/hipotese1) os anos do periodo; devolve a relacao e os pares fora do campeonato
     if l_year == None:
         l_year = f_year
     if f_year > 2023:
@@ -268,23 +508,96 @@ def calculate_hipotesis(f_year: int, l_year=None) -> pd.DataFrame:
         raise ValueError(f'Nao existem dados de voltas coletados antes de 1996')
     if not isinstance(f_year, int) or not isinstance(l_year, int):
         raise TypeError(f'Os valores para limites de ano nao sao inteiros {f_year}, {l_year}')
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),"data","lap_times.csv")
-    df = pd.read_csv(filepath)
-    relacao = pd.DataFrame()
-    
-    for year in range(f_year, l_year, -1):
-        champ_year = championship_result(year)
-        drivers = champ_year.index
-        races = search_year(year)
-        final = calculate_fastest_laps(df, drivers, races)
-        champ_year = champ_year*(100/champ_year.sum())
-        final = final*(100/final.sum())
-        final = final.join(champ_year, how='inner')
-        relacao = pd.concat([relacao, final], ignore_index=True)
-    return relacao
+    if not isinstance(force, bool):
+        raise TypeError(f'force precisa ser um bool, recebido {force}')
+    workers = _resolve_workers(workers)
+    years = list(range(f_year, l_year, -1))
+    if dataset is None:
+        filepath = tabelas.table_path("lap_times")
+        #Na primeira execucao converte as voltas para o store mapeado em memoria, depois so abre.
+        #Enquanto isso as outras tabelas da hipotese sao carregadas no cache em paralelo
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            tables = executor.submit(tabelas.load_tables, TABLES)
+            df = voltas.open_lap_store(filepath)
+            tables.result()
+        #Reaproveita os anos guardados cuja impressao digital nao mudou
+        keys = {year: season_fingerprint(year, df) for year in years}
+    else:
+        dataset = tabelas.resolve_dataset(dataset)
+        df = dataset.table("lap_times")
+        keys = None
+
+    seasons = {}
+    if not force and keys is not None:
+        for year in years:
+            season = _load_season(year, keys[year])
+            if season is not None:
+                seasons[year] = season
+    pending = [year for year in years if year not in seasons]
+
+    if workers > 1 and len(pending) > 1:
+        #Cada processo recebe so a fatia de voltas do seu ano; o map mantem a ordem dos anos
+        if dataset is None:
+            tasks = [(year, df.races(search_year(year)), None) for year in pending]
+        else:
+            #Os processos recebem so as tabelas usadas por season_relation
+            small = tabelas.Dataset({name: dataset.table(name) for name in ("races", "driver_standings")})
+            tasks = [(year, df[df["raceId"].isin(search_year(year, dataset))], small) for year in pending]
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            computed = list(executor.map(_season_worker, tasks))
+    else:
+        computed = []
+        for year in pending:
+            unknown = []
+            computed.append((season_relation(year, df, unknown, dataset), unknown))
+    for year, (season, unknown) in zip(pending, computed):
+        if keys is not None:
+            _save_season(year, keys[year], season, unknown)
+        seasons[year] = (season, unknown)
 
+    if seasons:
+        relacao = pd.concat([seasons[year][0] for year in years], ignore_index=True)
+    else:
+        relacao = pd.DataFrame()
+    return relacao, [pair for year in years for pair in seasons[year][1]]
+
+def plot_hipotesis(relacao: pd.DataFrame, arquivo: str = None, modo: str = "auto", limite: int = None,
+                   bins: int = graficos.DENSITY_BINS) -> None:
+    """
+    Grafico de dispersao entre pontos e voltas rapidas (% relativa ao ano)
+
+    Parametros
+    ----------
+    relacao: pandas.DataFrame
+        Resultado de calculate_hipotesis, com as colunas fast e points
+    arquivo: str
+        Se informado, grava o grafico nesse arquivo (PNG, SVG, ...) em vez de mostrar a janela
+    modo: str
+        "pontos" desenha cada piloto; "densidade" pinta uma grade com a quantidade
+        de pilotos por celula; "auto" usa densidade acima do limite
+    limite: int
+        Quantidade de pontos a partir da qual o modo "auto" usa densidade
+        (None usa graficos.DENSITY_THRESHOLD)
+    bins: int
+        Faixas em cada eixo no modo densidade
+    """
+    if not isinstance(relacao, pd.DataFrame):
+        raise TypeError('relacao precisa ser um DataFrame')
+    #matplotlib so e carregado quando um grafico e pedido
+    from matplotlib import pyplot as plt
+    if graficos.scatter_mode(len(relacao), modo, limite) == "densidade":
+        ax = plt.figure().gca()
+        malha = graficos.density_scatter(ax, relacao['points'], relacao['fast'], bins=bins)
+        plt.colorbar(malha, ax=ax, label='Quantidade')
+        ax.set(title='Relação entre Pontos e voltas rapidas', xlabel='Pontos (%)', ylabel='voltas rapidas (%)')
+    else:
+        relacao.plot.scatter(x='points', y='fast', title='Relação entre Pontos e voltas rapidas', xlabel='Pontos (%)', ylabel='voltas rapidas (%)')
+    if arquivo is not None:
+        plt.savefig(arquivo, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
 
 if __name__ == '__main__':
     relacao = calculate_hipotesis(2023, 1995)
-    relacao.plot.scatter(x='points', y='fast', title='Relação entre Pontos e voltas rapidas', xlabel='Pontos (%)', ylabel='voltas rapidas (%)')
-    plt.show() 
\ No newline at end of file
+    plot_hipotesis(relacao) 
\ No newline at end of file
@@ -1,11 +1,18 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import os
+import tabelas
+import indices
+import memo
+import banco
+import graficos
+
+# Tabelas lidas pela hipótese 2, carregadas juntas por tabelas.load_tables
+TABLES = ("races", "pit_stops", "results", "constructor_results")
 
 def load_csv(filepath: str) -> pd.DataFrame:
     """
     Carrega um arquivo CSV e retorna um DataFrame. Lida com erros de leitura.
+    A leitura passa pelo cache de tabelas, entao cada arquivo e lido uma vez por processo.
 
     Parameters
     ----------
@@ -15,7 +22,7 @@ def load_csv(filepath: str) -> pd.DataFrame:
     Returns
     -------
     pd.DataFrame
-        DataFrame com os dados do CSV.
+        DataFrame somente leitura com os dados do CSV.
         
     Raises
     ------
@@ -30,7 +37,7 @@ def load_csv(filepath: str) -> pd.DataFrame:
         raise TypeError("O caminho do arquivo deve ser uma string.")
     
     try:
-        return pd.read_csv(filepath)
+        return tabelas.read_csv_cached(filepath)
     except FileNotFoundError:
         print(f"Erro: O arquivo {filepath} não foi encontrado.")
         raise
@@ -38,7 +45,13 @@ def load_csv(filepath: str) -> pd.DataFrame:
         print(f"Erro: O arquivo {filepath} está vazio.")
         raise
 
-def search_year(year: int) -> np.ndarray:
+def _table(name: str, dataset: tabelas.Dataset = None) -> pd.DataFrame:
+    # Sem dataset, mantém a leitura da pasta data/ com as mensagens de erro de load_csv
+    if dataset is None:
+        return load_csv(tabelas.table_path(name))
+    return tabelas.resolve_dataset(dataset).table(name)
+
+def search_year(year: int, dataset: tabelas.Dataset = None) -> np.ndarray:
     """
     Retorna uma lista dos IDs de corridas (raceId) que ocorreram no ano especificado.
 
@@ -46,11 +59,13 @@ def search_year(year: int) -> np.ndarray:
     ----------
     year : int
         Ano das corridas a serem buscadas.
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas a usar. Se None, lê da pasta data/.
 
     Returns
     -------
     np.ndarray
-        Array de IDs das corridas realizadas no ano especificado.
+        Array somente leitura de IDs das corridas realizadas no ano especificado, em ordem crescente.
         
     Raises
     ------
@@ -60,15 +75,12 @@ def search_year(year: int) -> np.ndarray:
     if not isinstance(year, int):
         raise TypeError("O ano deve ser um inteiro.")
     
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'races.csv')   
-    df = load_csv(filepath)
-    column_year = "year"
-    column_raceId = "raceId"
-    
-    races = df[df[column_year] == year]
-    return races[column_raceId].unique()
+    if banco.active(dataset):
+        return banco.races_of_year(year)
+    # Consulta o indice ano -> corridas compartilhado com a hipotese 1
+    return indices.race_index(dataset).races_of_year(year)
 
-def filter_pit_stops(year: int, races: np.ndarray) -> pd.DataFrame:
+def filter_pit_stops(year: int, races: np.ndarray, dataset: tabelas.Dataset = None) -> pd.DataFrame:
     """
     Filtra os pit stops correspondentes ao ano especificado.
 
@@ -78,6 +90,8 @@ def filter_pit_stops(year: int, races: np.ndarray) -> pd.DataFrame:
         Ano das corridas.
     races : np.ndarray
         IDs das corridas ocorridas no ano.
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas a usar. Se None, lê da pasta data/.
 
     Returns
     -------
@@ -94,8 +108,10 @@ def filter_pit_stops(year: int, races: np.ndarray) -> pd.DataFrame:
     if not isinstance(races, np.ndarray):
         raise TypeError("Os IDs das corridas devem ser um array numpy.")
     
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'pit_stops.csv') 
-    df_pit_stops = load_csv(filepath)
+    if banco.active(dataset):
+        # Consulta indexada que traz apenas os pit stops das corridas do ano
+        return banco.pit_stops_of_races(races, 50000)
+    df_pit_stops = _table('pit_stops', dataset)
     column_raceId = "raceId"
     column_time = "milliseconds"
     
@@ -104,14 +120,17 @@ def filter_pit_stops(year: int, races: np.ndarray) -> pd.DataFrame:
     return df_pit_stops[df_pit_stops[column_raceId].isin(races)]
 
 
-def associate_constructors(pit_stops: pd.DataFrame) -> pd.DataFrame:
+def associate_constructors(pit_stops: pd.DataFrame, dataset: tabelas.Dataset = None) -> pd.DataFrame:
     """
-    Associa os pit stops com os construtores a partir do dataset de resultados.
+    Associa os pit stops com os construtores a partir do dataset de resultados,
+    usando o índice (raceId, driverId) -> constructorId construído uma vez a partir do results.csv.
 
     Parameters
     ----------
     pit_stops : pd.DataFrame
         DataFrame filtrado contendo os pit stops.
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas de onde vem o results. Se None, usa o índice da pasta data/.
 
     Returns
     -------
@@ -126,18 +145,16 @@ def associate_constructors(pit_stops: pd.DataFrame) -> pd.DataFrame:
     if not isinstance(pit_stops, pd.DataFrame):
         raise TypeError("O pit_stops deve ser um DataFrame.")
     
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'results.csv') 
-    df_results = load_csv(filepath)
     column_raceId = "raceId"
     column_driverId = "driverId"
     column_constructorId = "constructorId"
     
-    return pd.merge(
-        pit_stops,
-        df_results[[column_raceId, column_driverId, column_constructorId]],
-        on=[column_raceId, column_driverId],
-        how='inner'
-    )
+    constructors = indices.constructor_index(dataset=dataset).lookup(pit_stops[column_raceId], pit_stops[column_driverId])
+    # Como na junção interna, pit stops sem resultado correspondente são descartados
+    found = constructors >= 0
+    merged = pit_stops[found].reset_index(drop=True)
+    merged[column_constructorId] = constructors[found]
+    return merged
 
 def aggregate_pit_stops(merged_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -170,7 +187,8 @@ def aggregate_pit_stops(merged_df: pd.DataFrame) -> pd.DataFrame:
         column_pits: 'count'
     }).reset_index().rename(columns={column_time_ms: 'total_time_ms', column_pits: 'total_pits'})
 
-def constructor_result(year: int) -> pd.Series:
+@memo.memoize(["races", "constructor_results"])
+def constructor_result(year: int, dataset: tabelas.Dataset = None) -> pd.Series:
     """
     Retorna os pontos dos construtores no ano especificado.
 
@@ -178,6 +196,8 @@ def constructor_result(year: int) -> pd.Series:
     ----------
     year : int
         Ano das corridas.
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas a usar. Se None, lê da pasta data/.
 
     Returns
     -------
@@ -192,9 +212,10 @@ def constructor_result(year: int) -> pd.Series:
     if not isinstance(year, int):
         raise TypeError("O ano deve ser um inteiro.")
     
-    races = search_year(year)
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'constructor_results.csv')  
-    df = load_csv(filepath)
+    races = search_year(year, dataset)
+    if banco.active(dataset):
+        return banco.constructor_points(races)
+    df = _table('constructor_results', dataset)
     
     column_raceId = "raceId"
     column_constructorId = "constructorId"
@@ -205,7 +226,8 @@ def constructor_result(year: int) -> pd.Series:
     
     return constructor_points
 
-def pit_stops(year: int) -> pd.DataFrame:
+@memo.memoize(TABLES)
+def pit_stops(year: int, dataset: tabelas.Dataset = None) -> pd.DataFrame:
     """
     Função principal que analisa os pit stops de um determinado ano e calcula a média de tempo de pit stops por construtor.
 
@@ -213,6 +235,8 @@ def pit_stops(year: int) -> pd.DataFrame:
     ----------
     year : int
         Ano das corridas.
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas a usar. Se None, lê da pasta data/.
 
     Returns
     -------
@@ -227,30 +251,57 @@ def pit_stops(year: int) -> pd.DataFrame:
     if not isinstance(year, int):
         raise TypeError("O ano deve ser um inteiro.")
 
-    column_constructorId = "constructorId"
-    column_pits = "pits"
-    column_time = "time"
-
-    races = search_year(year)
-    pit_stops_filtered = filter_pit_stops(year, races)
-    merged_df = associate_constructors(pit_stops_filtered)
+    races = search_year(year, dataset)
+    pit_stops_filtered = filter_pit_stops(year, races, dataset)
+    merged_df = associate_constructors(pit_stops_filtered, dataset)
     pit_stops_agg = aggregate_pit_stops(merged_df)
     
-    r_result = constructor_result(year)
-    
-    final = pd.DataFrame(columns=[column_pits, column_time], index=r_result.index)
-
-    for index, row in pit_stops_agg.iterrows():
-        constructor = row[column_constructorId]
-        final.loc[constructor, column_pits] = row['total_pits']
-        final.loc[constructor, column_time] = row['total_time_ms']
-    
-    final["mean_pit"] = final[column_time] / final[column_pits]
-    final = final.drop(columns=[column_pits, column_time])
+    r_result = constructor_result(year, dataset)
  
-    return final 
+    return mean_pit_by_constructor(pit_stops_agg, r_result)
+
+def mean_pit_by_constructor(pit_stops_agg: pd.DataFrame, constructor_points: pd.Series) -> pd.DataFrame:
+    """
+    Monta a média de pit stop por construtor a partir dos pit stops agregados,
+    alinhando com os construtores que pontuaram no ano.
+
+    Parameters
+    ----------
+    pit_stops_agg : pd.DataFrame
+        Resultado de aggregate_pit_stops (constructorId, total_time_ms, total_pits).
+    constructor_points : pd.Series
+        Pontos por construtor (resultado de constructor_result).
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com a coluna mean_pit (float), indexado pelos construtores de
+        constructor_points seguidos dos que só aparecem nos pit stops.
+        Construtores sem dados de pit stop ficam com NaN.
+
+    Raises
+    ------
+    TypeError
+        Se pit_stops_agg não for um DataFrame ou constructor_points não for uma Series.
+    """
+    if not isinstance(pit_stops_agg, pd.DataFrame):
+        raise TypeError("pit_stops_agg deve ser um DataFrame.")
+    if not isinstance(constructor_points, pd.Series):
+        raise TypeError("constructor_points deve ser uma Series.")
 
-def plot_scatter(combined_df: pd.DataFrame) -> None:
+    column_constructorId = "constructorId"
+
+    agg = pit_stops_agg.set_index(column_constructorId)
+    # Construtores com pit stop mas sem pontuação entram no final, na ordem da agregação
+    index = constructor_points.index.append(agg.index.difference(constructor_points.index, sort=False))
+    index.name = constructor_points.index.name
+    agg = agg.reindex(index)
+
+    mean_pit = agg['total_time_ms'].astype(float) / agg['total_pits'].astype(float)
+    return mean_pit.to_frame("mean_pit")
+
+def plot_scatter(combined_df: pd.DataFrame, arquivo: str = None, modo: str = "auto", limite: int = None,
+                 bins: int = graficos.DENSITY_BINS, cor: str = "ano") -> None:
     """
     Gera e salva um gráfico de dispersão mostrando a relação entre a média de pit stops e os pontos dos construtores.
     
@@ -258,25 +309,139 @@ def plot_scatter(combined_df: pd.DataFrame) -> None:
     ----------
     combined_df : pd.DataFrame
         DataFrame contendo as informações combinadas de pit stops e pontos.
+    arquivo : str, opcional
+        Se informado, grava o gráfico nesse arquivo (PNG, SVG, ...) em vez de mostrar a janela.
+    modo : str
+        "pontos" desenha cada ponto; "densidade" agrupa os pontos numa grade
+        (custo de desenho fixo); "auto" usa densidade acima do limite.
+    limite : int, opcional
+        Quantidade de pontos a partir da qual o modo "auto" usa densidade.
+        Se None, usa graficos.DENSITY_THRESHOLD.
+    bins : int
+        Faixas em cada eixo no modo densidade.
+    cor : str
+        No modo densidade, "ano" pinta cada célula com o ano médio dos pontos
+        e "contagem" com a quantidade de pontos.
 
     Raises
     ------
     TypeError
         Se combined_df não for um DataFrame.
+    ValueError
+        Se modo ou cor forem inválidos.
     """
     if not isinstance(combined_df, pd.DataFrame):
         raise TypeError("combined_df deve ser um DataFrame.")
+    if cor not in ("ano", "contagem"):
+        raise ValueError('cor deve ser "ano" ou "contagem".')
+    modo = graficos.scatter_mode(len(combined_df), modo, limite)
+    # matplotlib só é carregado quando um gráfico é pedido
+    import matplotlib.pyplot as plt
     
     plt.figure(figsize=(10, 6))
-    scatter = plt.scatter(combined_df['mean_pit'], combined_df['points'], c=combined_df['year'], cmap='viridis', alpha=0.7)
-    plt.colorbar(scatter, label='Ano')
+    if modo == "densidade":
+        valores = combined_df['year'] if cor == "ano" else None
+        malha = graficos.density_scatter(plt.gca(), combined_df['mean_pit'], combined_df['points'], valores, bins)
+        plt.colorbar(malha, label='Ano médio' if cor == "ano" else 'Quantidade')
+    else:
+        scatter = plt.scatter(combined_df['mean_pit'], combined_df['points'], c=combined_df['year'], cmap='viridis', alpha=0.7)
+        plt.colorbar(scatter, label='Ano')
     plt.title('Relação entre Média de Pit Stops e Pontuação dos Construtores')
     plt.xlabel('Média de Pit Stops (ms)')
     plt.ylabel('Pontuação dos Construtores')
     plt.grid(True)
-    plt.show()
+    if arquivo is not None:
+        plt.savefig(arquivo, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
 
-def analyze_pit_stops_across_years(start_year: int, end_year: int) -> None:
+def pit_stops_across_years(start_year: int, end_year: int, batch: bool = True, dataset: tabelas.Dataset = None) -> pd.DataFrame:
+    """
+    Junta a média de pit stop, o ano e os pontos de cada construtor em todos os anos do intervalo.
+
+    Parameters
+    ----------
+    start_year : int
+        Ano inicial para análise.
+    end_year : int
+        Ano final para análise.
+    batch : bool
+        Se True, lê cada tabela uma vez e faz tudo numa única passada agrupada por
+        (year, constructorId). Se False, chama pit_stops e constructor_result ano a ano.
+        Os dois modos retornam o mesmo resultado.
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas a usar. Se None, as tabelas da pasta data/ são
+        carregadas de uma vez com tabelas.load_tables.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexado por constructorId com as colunas mean_pit, year e points.
+
+    Raises
+    ------
+    TypeError
+        Se os anos não forem inteiros ou batch não for bool.
+    ValueError
+        Se os anos de início e fim forem menores ou iguais a 2010.
+    """
+    if not isinstance(start_year, int) or not isinstance(end_year, int):
+        raise TypeError("Os anos devem ser inteiros.")
+    if not isinstance(batch, bool):
+        raise TypeError("batch deve ser um bool.")
+    if start_year <= 2010 or end_year <= 2010:
+        raise ValueError("Os anos de início e fim devem ser maiores que 2010.")
+
+    if dataset is None:
+        # As quatro tabelas são lidas de uma vez (em paralelo se houver mais de uma CPU) e ficam no cache para as etapas seguintes
+        tabelas.load_tables(TABLES)
+
+    if not batch:
+        frames = []
+        for year in range(start_year, end_year + 1):
+            year_data = pit_stops(year, dataset)
+            year_data['year'] = year
+            year_data['points'] = constructor_result(year, dataset)
+            frames.append(year_data)
+        if not frames:
+            # Intervalo vazio (start_year > end_year): as mesmas colunas e tipos do modo batch
+            return pd.DataFrame({'mean_pit': pd.Series(dtype=float), 'year': pd.Series(dtype='int64'),
+                                 'points': pd.Series(dtype=float)},
+                                index=pd.Index([], dtype='int64', name='constructorId'))
+        return pd.concat(frames)
+
+    column_raceId = "raceId"
+    column_constructorId = "constructorId"
+    column_year = "year"
+    column_time = "milliseconds"
+    keys = [column_year, column_constructorId]
+
+    df_races = _table("races", dataset)
+    df_races = df_races[(df_races[column_year] >= start_year) & (df_races[column_year] <= end_year)]
+    df_races = df_races[[column_raceId, column_year]]
+
+    # O ano entra em cada pit stop por uma única junção com as corridas
+    df_pit_stops = _table("pit_stops", dataset)
+    df_pit_stops = df_pit_stops[df_pit_stops[column_time] < 50000]
+    df_pit_stops = df_pit_stops.merge(df_races, on=column_raceId, how='inner')
+    merged_df = associate_constructors(df_pit_stops, dataset)
+    pits = merged_df.groupby(keys).agg(total_time_ms=(column_time, 'sum'), total_pits=('stop', 'count'))
+
+    df_points = _table("constructor_results", dataset)
+    df_points = df_points.merge(df_races, on=column_raceId, how='inner')
+    points = df_points.groupby(keys)['points'].sum()
+
+    # Como no modo ano a ano: primeiro os construtores que pontuaram, depois os que só têm pit stop
+    combined = points.to_frame().join(pits, how='outer')
+    combined['pit_only'] = ~combined.index.isin(points.index)
+    combined = combined.reset_index().sort_values([column_year, 'pit_only', column_constructorId], kind='stable')
+
+    combined['mean_pit'] = combined['total_time_ms'].astype(float) / combined['total_pits'].astype(float)
+    combined = combined.set_index(column_constructorId)
+    return combined[['mean_pit', column_year, 'points']]
+
+def analyze_pit_stops_across_years(start_year: int, end_year: int, batch: bool = True, dataset: tabelas.Dataset = None) -> None:
     """
     Analisa os pit stops e os pontos dos construtores ao longo de um intervalo de anos e gera o gráfico de visualização.
     
@@ -286,6 +451,10 @@ def analyze_pit_stops_across_years(start_year: int, end_year: int) -> None:
         Ano inicial para análise.
     end_year : int
         Ano final para análise.
+    batch : bool
+        Repassado para pit_stops_across_years.
+    dataset : tabelas.Dataset, opcional
+        Repassado para pit_stops_across_years.
 
     Raises
     ------
@@ -295,13 +464,7 @@ def analyze_pit_stops_across_years(start_year: int, end_year: int) -> None:
     if start_year <= 2010 or end_year <= 2010:
         raise ValueError("Os anos de início e fim devem ser maiores que 2010.")
 
-    combined_df = pd.DataFrame()
-
-    for year in range(start_year, end_year + 1):
-        year_data = pit_stops(year)
-        year_data['year'] = year
-        year_data['points'] = constructor_result(year)
-        combined_df = pd.concat([combined_df, year_data])
+    combined_df = pit_stops_across_years(start_year, end_year, batch, dataset)
 
     plot_scatter(combined_df)
 if __name__ == '__main__':
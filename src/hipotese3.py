@@ -1,11 +1,16 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from typing import Tuple, Optional
-import warnings
+from typing import Tuple, Optional, TYPE_CHECKING
 import os
-warnings.filterwarnings("ignore")
+import tabelas
+import memo
+
+# matplotlib e seaborn só são carregados dentro das funções de gráfico
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Formato das datas de nascimento (coluna dob) no drivers.csv
+DOB_FORMAT = "%Y-%m-%d"
 
 def obtem_dados_csv(path: str) -> Optional[pd.DataFrame]:
     """
@@ -34,27 +39,47 @@ def obtem_dados_csv(path: str) -> Optional[pd.DataFrame]:
             raise FileNotFoundError("Esse arquivo não foi encontrado.")
         else:
             # lendo os dados contidos no csv
-            dataframe = pd.read_csv(path)
+            dataframe = tabelas.read_csv_cached(path)
                 
             return dataframe
     except FileNotFoundError as e:
         raise
         print(f"Erro: {e}")
         
-def arrumando_dados(dataframe: pd.DataFrame) -> Optional[pd.DataFrame]:
+def _anos_de_nascimento(dob: pd.Series) -> np.ndarray:
+    # Converte apenas as datas distintas, com o formato explícito, e espalha o
+    # ano de volta para todas as linhas
+    codigos, datas = pd.factorize(dob)
+    try:
+        anos = pd.to_datetime(datas, format=DOB_FORMAT).year
+    except ValueError:
+        anos = pd.to_datetime(datas).year
+    anos = np.asarray(anos, dtype=np.int64)
+    if (codigos < 0).any():
+        # datas ausentes ficam com ano NaN, como na conversão linha a linha
+        anos = np.append(anos.astype(float), np.nan)
+    return anos[codigos]
+
+def arrumando_dados(dataframe: Optional[pd.DataFrame] = None, dataset: Optional[tabelas.Dataset] = None) -> Optional[pd.DataFrame]:
     """
     Remove dados que não são úteis e formata os dados úteis para serem
     utilizados posteriormente
 
     Parameters
     ----------
-    dataframe : pd.DataFrame
-        Dataframe que desejamos modificar
+    dataframe : pd.DataFrame, opcional
+        Dataframe que desejamos modificar. Se None, usa a tabela drivers
+        do dataset
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas de onde vem a tabela drivers quando dataframe
+        for None. Se None, lê da pasta data/
 
     Returns
     -------
     dataframe : pd.Dataframe
-        Dataframe modificado
+        Dataframe novo com as colunas nationality (categórica) e birth year.
+        Sem dataframe e sem dataset, o resultado da planilha de pilotos fica
+        guardado e é reaproveitado enquanto o drivers.csv não mudar
         
     Examples
     --------
@@ -62,8 +87,13 @@ def arrumando_dados(dataframe: pd.DataFrame) -> Optional[pd.DataFrame]:
     >>> path = r"path_generico"
     >>> df = obtem_dados_csv(path)
     >>> df_arrumado = arrumando_dados(df)
+    >>> df_arrumado = arrumando_dados(dataset=tabelas.Dataset({"drivers": df}))
     """
     try:
+        if dataframe is None and dataset is None:
+            return _pilotos_arrumados()
+        if dataframe is None:
+            dataframe = tabelas.resolve_dataset(dataset).table("drivers")
         # Verificando se os tipos passados e as colunas estão conforme o esperado
         if type(dataframe) != pd.DataFrame:
             raise TypeError("o parâmetro passado precisa ser do tipo pd.DataFrame")
@@ -72,18 +102,12 @@ def arrumando_dados(dataframe: pd.DataFrame) -> Optional[pd.DataFrame]:
         if "dob" not in dataframe.columns:
             raise KeyError("Coluna esperada inexistente no dataframe")
         else:
-            # selecionando as colunas que nos interessam no dataframe original
-            dataframe = dataframe[["nationality", "dob"]]
-                
-            # convertendo dados da coluna dob para datetime, para manipular 
-            # bem as datas, e depois colhendo os apenas os anos 
-            dataframe["dob"] = pd.to_datetime(dataframe["dob"])
-            dataframe["birth year"] = dataframe["dob"].apply(lambda x: x.year)
-                
-            # removendo a coluna dob
-            dataframe = dataframe.drop(columns=["dob"])
-                
-            return dataframe
+            # montando um dataframe novo (e não uma fatia do original) com as
+            # nacionalidades como categoria
+            return pd.DataFrame({
+                "nationality": pd.Categorical(dataframe["nationality"]),
+                "birth year": _anos_de_nascimento(dataframe["dob"]),
+            }, index=dataframe.index)
     except TypeError as e:
         raise
         print(f"Erro: {e}")
@@ -91,6 +115,11 @@ def arrumando_dados(dataframe: pd.DataFrame) -> Optional[pd.DataFrame]:
         raise
         print(f"Erro: {e}")
 
+@memo.memoize(["drivers"], maxsize=1)
+def _pilotos_arrumados() -> pd.DataFrame:
+    # Planilha de pilotos já arrumada, guardada pelo memo enquanto o drivers.csv não mudar
+    return arrumando_dados(tabelas.load_table("drivers"))
+
 def classificando_em_periodos(dataframe_com_birth_year: pd.DataFrame, periodo: int) -> Optional[pd.DataFrame]:
     """
     Cria uma nova coluna que classifica os dados em períodos com base
@@ -185,10 +214,13 @@ def agrupando_nacionalidades_por_periodos_e_transformando_em_tabela(dataframe_co
             raise KeyError("Coluna esperada ausente do dataframe")
         else:
             # agrupando dados por nacionalidade e ano e depois tirando o tamanho 
-            dataframe_agrupado = dataframe_com_period.groupby(["nationality", "period"]).size()
+            # (observed=True: com a nacionalidade categórica, só as combinações que existem)
+            dataframe_agrupado = dataframe_com_period.groupby(["nationality", "period"], observed=True).size()
                 
             # dispondo dados obtidos em tabela
             tabela_dados = dataframe_agrupado.unstack().fillna(0)
+            if isinstance(tabela_dados.index, pd.CategoricalIndex):
+                tabela_dados.index = tabela_dados.index.astype(object)
                 
             return tabela_dados
     except TypeError as e:
@@ -199,7 +231,389 @@ def agrupando_nacionalidades_por_periodos_e_transformando_em_tabela(dataframe_co
         print(f"Erro: {e}")
         
 
-def visualizando_pilotos_por_pais_e_periodo(tabela: pd.DataFrame, anotacoes: bool) -> None:
+class CuboDeContagens:
+    """
+    Matriz densa de contagens nacionalidade x ano de nascimento, montada uma
+    única vez a partir das linhas dos pilotos. A tabela de qualquer período é
+    obtida somando colunas vizinhas da matriz (np.add.reduceat sobre as faixas
+    de anos), sem voltar às linhas.
+
+    Parameters
+    ----------
+    dataframe_com_birth_year : pd.DataFrame
+        Dataframe com as colunas "nationality" e "birth year" (como o devolvido
+        por arrumando_dados). Linhas sem nacionalidade ou sem ano são ignoradas,
+        como no agrupamento por linhas
+
+    Raises
+    ------
+    TypeError
+        Se o parâmetro não for um pd.DataFrame
+    KeyError
+        Se faltar alguma das colunas esperadas
+
+    Examples
+    --------
+    >>> cubo = CuboDeContagens(arrumando_dados())
+    >>> tabela = cubo.tabela(10)
+    """
+
+    def __init__(self, dataframe_com_birth_year: pd.DataFrame):
+        if type(dataframe_com_birth_year) != pd.DataFrame:
+            raise TypeError("O parametro precisa ter o tipo pd.DataFrame")
+        for coluna in ("nationality", "birth year"):
+            if coluna not in dataframe_com_birth_year.columns:
+                raise KeyError("Coluna esperada ausente do dataframe")
+
+        nacionalidades = dataframe_com_birth_year["nationality"]
+        anos = dataframe_com_birth_year["birth year"]
+        validas = (nacionalidades.notna() & anos.notna()).to_numpy()
+        # o tipo dos anos define o tipo dos rótulos dos períodos, como em classificando_em_periodos
+        self.tipo_dos_anos = anos.dtype
+
+        codigos, self.nacionalidades = pd.factorize(nacionalidades[validas], sort=True)
+        self.nacionalidades = pd.Index(np.asarray(self.nacionalidades, dtype=object), name="nationality")
+        anos = anos[validas].to_numpy().astype(np.int64)
+        if len(anos):
+            self.primeiro_ano = int(anos.min())
+            n_anos = int(anos.max()) - self.primeiro_ano + 1
+        else:
+            self.primeiro_ano, n_anos = 0, 0
+
+        # uma única contagem: cada linha cai na célula (nacionalidade, ano)
+        celulas = codigos.astype(np.int64) * n_anos + (anos - self.primeiro_ano)
+        self.contagens = np.bincount(celulas, minlength=len(self.nacionalidades) * n_anos)
+        self.contagens = self.contagens.reshape(len(self.nacionalidades), n_anos)
+        self.contagens.flags.writeable = False
+
+    @classmethod
+    def de_contagens(cls, nacionalidades, primeiro_ano: int, contagens: np.ndarray, tipo_dos_anos=np.int64) -> "CuboDeContagens":
+        """
+        Monta o cubo direto de uma matriz de contagens já acumulada (por exemplo,
+        em blocos por contagem_em_blocos). As linhas são reordenadas pela
+        nacionalidade.
+
+        Parameters
+        ----------
+        nacionalidades : list
+            Nacionalidade de cada linha da matriz
+        primeiro_ano : int
+            Ano da primeira coluna (as colunas são anos consecutivos)
+        contagens : np.ndarray
+            Matriz nacionalidade x ano
+        tipo_dos_anos : dtype
+            Tipo dos anos de nascimento, que vira o tipo dos rótulos dos períodos
+
+        Returns
+        -------
+        CuboDeContagens
+            Cubo com as contagens
+        """
+        ordem = np.argsort(np.asarray(nacionalidades, dtype=object), kind="stable")
+        cubo = cls.__new__(cls)
+        cubo.tipo_dos_anos = np.dtype(tipo_dos_anos)
+        cubo.nacionalidades = pd.Index(np.asarray(nacionalidades, dtype=object)[ordem], name="nationality")
+        cubo.primeiro_ano = int(primeiro_ano)
+        cubo.contagens = np.ascontiguousarray(np.asarray(contagens, dtype=np.int64)[ordem])
+        cubo.contagens.flags.writeable = False
+        return cubo
+
+    @property
+    def anos(self) -> np.ndarray:
+        """
+        Anos das colunas da matriz, consecutivos do primeiro ao último ano.
+        """
+        return np.arange(self.primeiro_ano, self.primeiro_ano + self.contagens.shape[1], dtype=np.int64)
+
+    def contagens_por_periodo(self, periodo: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma as colunas da matriz em faixas de periodo anos.
+
+        Parameters
+        ----------
+        periodo : int
+            Intervalo de tempo dos períodos
+
+        Returns
+        -------
+        periodos : np.ndarray
+            Início de cada período que tem pelo menos um piloto
+        contagens : np.ndarray
+            Matriz nacionalidade x período com as contagens
+
+        Raises
+        ------
+        TypeError
+            Se periodo não for inteiro
+        ZeroDivisionError
+            Se periodo for zero
+        ValueError
+            Se periodo for negativo
+        """
+        if type(periodo) != int:
+            raise TypeError("Periodo precisa ser um inteiro")
+        if periodo == 0:
+            raise ZeroDivisionError("O peridodo precisa ser diferente de zero")
+        if periodo < 0:
+            raise ValueError("O periodo deve ser positivo, pois é um intervalo de tempo")
+
+        rotulos = (self.anos // periodo) * periodo
+        if len(rotulos) == 0:
+            return rotulos, self.contagens[:, :0]
+        # cada faixa começa onde o rótulo do período muda
+        inicios = np.flatnonzero(np.r_[True, rotulos[1:] != rotulos[:-1]])
+        contagens = np.add.reduceat(self.contagens, inicios, axis=1)
+        # só ficam os períodos com algum piloto, como no agrupamento por linhas
+        ocupados = contagens.sum(axis=0) > 0
+        return rotulos[inicios][ocupados], contagens[:, ocupados]
+
+    def tabela(self, periodo: int) -> pd.DataFrame:
+        """
+        Tabela nacionalidade x período, igual à de
+        agrupando_nacionalidades_por_periodos_e_transformando_em_tabela
+
+        Parameters
+        ----------
+        periodo : int
+            Intervalo de tempo dos períodos
+
+        Returns
+        -------
+        tabela_dados : pd.DataFrame
+            Dataframe com colunas com os períodos, linhas como os países e cada
+            célula como a contagem
+        """
+        periodos, contagens = self.contagens_por_periodo(periodo)
+        colunas = pd.Index(periodos.astype(self.tipo_dos_anos), name="period")
+        tabela_dados = pd.DataFrame(contagens, index=self.nacionalidades.copy(), columns=colunas)
+        # o unstack deixa NaN (e portanto float) quando alguma combinação não existe
+        if (contagens == 0).any():
+            tabela_dados = tabela_dados.astype(float)
+        return tabela_dados
+
+@memo.memoize(["drivers"], maxsize=1)
+def _cubo_pilotos() -> CuboDeContagens:
+    # Cubo da planilha de pilotos, guardado pelo memo enquanto o drivers.csv não mudar
+    return CuboDeContagens(_pilotos_arrumados())
+
+def cubo_de_contagens(dataframe: Optional[pd.DataFrame] = None, dataset: Optional[tabelas.Dataset] = None) -> CuboDeContagens:
+    """
+    Retorna o cubo de contagens nacionalidade x ano de nascimento
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame, opcional
+        Pilotos com "nationality" e "dob" (planilha original) ou "birth year"
+        (já arrumada). Se None, usa a tabela drivers do dataset
+    dataset : tabelas.Dataset, opcional
+        Conjunto de tabelas de onde vem a tabela drivers. Se None, lê da
+        pasta data/ e o cubo fica guardado enquanto o drivers.csv não mudar
+
+    Returns
+    -------
+    CuboDeContagens
+        Cubo de contagens
+
+    Examples
+    --------
+    >>> tabela = cubo_de_contagens().tabela(5)
+    """
+    if dataframe is None and dataset is None:
+        return _cubo_pilotos()
+    if dataframe is None or "birth year" not in dataframe.columns:
+        dataframe = arrumando_dados(dataframe, dataset)
+    return CuboDeContagens(dataframe)
+
+def cubo_em_blocos(path: str, chunksize: int = 100_000) -> CuboDeContagens:
+    """
+    Monta o cubo de contagens lendo o csv de pilotos em blocos, sem carregar o
+    arquivo inteiro. Só as colunas nationality e dob são lidas, e cada bloco é
+    somado à matriz nacionalidade x ano, então a memória depende apenas do
+    tamanho do bloco e da quantidade de nacionalidades (e de anos)
+
+    Parameters
+    ----------
+    path : str
+        Path do csv de pilotos, com as colunas nationality e dob
+    chunksize : int
+        Quantidade de linhas lidas por bloco
+
+    Returns
+    -------
+    CuboDeContagens
+        O mesmo cubo que cubo_de_contagens monta com o arquivo inteiro
+
+    Raises
+    ------
+    FileNotFoundError
+        Se o arquivo não existir
+    TypeError
+        Se chunksize não for inteiro
+    ValueError
+        Se chunksize não for positivo
+
+    Examples
+    --------
+    >>> cubo = cubo_em_blocos(r"path_generico", chunksize=50_000)
+    >>> tabela = cubo.tabela(10)
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError("Esse arquivo não foi encontrado.")
+    if type(chunksize) != int:
+        raise TypeError("chunksize precisa ser um inteiro")
+    if chunksize <= 0:
+        raise ValueError("chunksize precisa ser positivo")
+
+    linhas = {}
+    primeiro_ano, contagens = 0, np.zeros((0, 0), dtype=np.int64)
+    tem_ausentes = False
+    for bloco in pd.read_csv(path, usecols=["nationality", "dob"], chunksize=chunksize):
+        anos = _anos_de_nascimento(bloco["dob"])
+        validas = bloco["nationality"].notna().to_numpy() & ~np.isnan(anos)
+        tem_ausentes |= anos.dtype.kind == "f"
+        if not validas.any():
+            continue
+        anos = anos[validas].astype(np.int64)
+        codigos, nacionalidades = pd.factorize(bloco["nationality"][validas])
+
+        # aumentando a matriz quando aparecem nacionalidades ou anos novos
+        for nacionalidade in nacionalidades:
+            linhas.setdefault(nacionalidade, len(linhas))
+        inicio, fim = int(anos.min()), int(anos.max())
+        if contagens.shape[1] == 0:
+            primeiro_ano = inicio
+        novo_inicio = min(primeiro_ano, inicio)
+        novo_fim = max(primeiro_ano + contagens.shape[1] - 1, fim)
+        contagens = np.pad(contagens, ((0, len(linhas) - contagens.shape[0]),
+                                       (primeiro_ano - novo_inicio, novo_fim - (primeiro_ano + contagens.shape[1] - 1))))
+        primeiro_ano = novo_inicio
+
+        # somando o bloco na matriz
+        destino = np.array([linhas[nacionalidade] for nacionalidade in nacionalidades], dtype=np.int64)
+        celulas = destino[codigos] * contagens.shape[1] + (anos - primeiro_ano)
+        contagens += np.bincount(celulas, minlength=contagens.size).reshape(contagens.shape)
+
+    return CuboDeContagens.de_contagens(list(linhas), primeiro_ano, contagens,
+                                        np.float64 if tem_ausentes else np.int64)
+
+def contagem_em_blocos(path: str, periodo: int, chunksize: int = 100_000) -> Tuple[pd.DataFrame, pd.Series, pd.Series]:
+    """
+    Versão em blocos do pipeline da hipótese: lê o csv de pilotos aos poucos,
+    acumula as contagens e devolve a tabela e os países com mais pilotos por período
+
+    Parameters
+    ----------
+    path : str
+        Path do csv de pilotos
+    periodo : int
+        Intervalo de tempo dos períodos
+    chunksize : int
+        Quantidade de linhas lidas por bloco
+
+    Returns
+    -------
+    tabela : pd.DataFrame
+        Mesma tabela de agrupando_nacionalidades_por_periodos_e_transformando_em_tabela
+    pilotos_maximos_nascidos_por_periodo : pd.Series
+        Série dos maiores nascimentos por período
+    paises_dos_pilotos : pd.Series
+        Série dos países respectivos a esses maiores nascimentos
+
+    Examples
+    --------
+    >>> tabela, maximos, paises = contagem_em_blocos(r"path_generico", 10)
+    """
+    tabela = cubo_em_blocos(path, chunksize).tabela(periodo)
+    pilotos_maximos_nascidos_por_periodo, paises_dos_pilotos = paises_com_mais_pilotos_por_periodo(tabela)
+    return tabela, pilotos_maximos_nascidos_por_periodo, paises_dos_pilotos
+
+def _celulas_anotadas(valores: np.ndarray, top_n: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+    # Linhas e colunas das células não nulas, ou só das top_n maiores
+    linhas, colunas = np.nonzero(valores)
+    if top_n is not None and len(linhas) > top_n:
+        maiores = np.argsort(-valores[linhas, colunas], kind="stable")[:top_n]
+        linhas, colunas = linhas[maiores], colunas[maiores]
+    return linhas, colunas
+
+def mapa_de_calor_rapido(tabela: pd.DataFrame, arquivo: Optional[str] = None, anotacoes: bool = True,
+                         top_n: Optional[int] = None) -> "Figure":
+    """
+    Desenha a tabela de países x períodos como uma única imagem (imshow) e
+    anota só as células não nulas, ou só as top_n maiores. Serve para tabelas
+    grandes (períodos de 1 ou 2 anos), onde o heatmap do seaborn com anotações
+    cria milhares de textos
+
+    Parameters
+    ----------
+    tabela : pd.DataFrame
+        Tabela que contém contagem de pilotos por período e país
+    arquivo : str, opcional
+        Caminho do PNG/SVG (o formato vem da extensão). Se informado, a figura
+        é montada sem o pyplot e só gravada, sem abrir janela
+    anotacoes : bool
+        True para escrever a contagem nas células
+    top_n : int, opcional
+        Se informado, anota apenas as top_n maiores células
+
+    Returns
+    -------
+    Figure
+        Figura desenhada
+
+    Examples
+    --------
+    >>> tabela = cubo_de_contagens().tabela(1)
+    >>> figura = mapa_de_calor_rapido(tabela, "heatmap.png", top_n=50)
+    """
+    if type(tabela) != pd.DataFrame:
+        raise TypeError("O tipo do parâmetro tabela precisa ser um pd.Dataframe")
+    if type(anotacoes) != bool:
+        raise TypeError("O tipo do parâmetro anotacoes precisa ser um bool")
+    if top_n is not None and type(top_n) != int:
+        raise TypeError("top_n precisa ser um inteiro")
+    if top_n is not None and top_n <= 0:
+        raise ValueError("top_n precisa ser um inteiro positivo")
+
+    if arquivo is not None:
+        from matplotlib.figure import Figure
+        figura = Figure(figsize=(16, 10))
+    else:
+        import matplotlib.pyplot as plt
+        figura = plt.figure(figsize=(16, 10))
+    eixo = figura.add_subplot()
+    valores = tabela.to_numpy(dtype=float)
+    imagem = eixo.imshow(valores, cmap="Spectral", aspect="auto", interpolation="nearest")
+    figura.colorbar(imagem, ax=eixo)
+
+    # no máximo uns 50 rótulos de período, para não sobrepor
+    passo = max(1, int(np.ceil(tabela.shape[1] / 50)))
+    eixo.set_xticks(np.arange(0, tabela.shape[1], passo))
+    eixo.set_xticklabels([str(rotulo) for rotulo in tabela.columns[::passo]], rotation=90)
+    eixo.set_yticks(np.arange(tabela.shape[0]))
+    eixo.set_yticklabels([str(rotulo) for rotulo in tabela.index])
+
+    if anotacoes and valores.size:
+        linhas, colunas = _celulas_anotadas(valores, top_n)
+        minimo, maximo = np.nanmin(valores), np.nanmax(valores)
+        escala = (valores[linhas, colunas] - minimo) / ((maximo - minimo) or 1)
+        inteiros = np.all(np.mod(valores, 1) == 0)
+        tamanho = 8 if tabela.shape[1] <= 30 else 5
+        for linha, coluna, nivel in zip(linhas, colunas, escala):
+            # texto branco nas pontas escuras do mapa de cores
+            cor = "white" if nivel < 0.15 or nivel > 0.85 else "black"
+            valor = valores[linha, coluna]
+            texto = f"{valor:.0f}" if inteiros else f"{valor:.2g}"
+            eixo.text(coluna, linha, texto, ha="center", va="center", fontsize=tamanho, color=cor)
+
+    eixo.set_title("Heatmap dos pilotos nascidos por período e nacionalidade")
+    eixo.set_xlabel("Períodos")
+    eixo.set_ylabel("Países")
+    if arquivo is not None:
+        figura.savefig(arquivo, bbox_inches="tight")
+    return figura
+
+def visualizando_pilotos_por_pais_e_periodo(tabela: pd.DataFrame, anotacoes: bool, modo: str = "seaborn",
+                                           arquivo: Optional[str] = None, top_n: Optional[int] = None) -> None:
     """
     Visualiza a relação entre países, períodos e quantidade de pilotos nascidos
 
@@ -209,6 +623,13 @@ def visualizando_pilotos_por_pais_e_periodo(tabela: pd.DataFrame, anotacoes: boo
         Tabela que contém contagem de pilotos por período e país
     anotacoes : bool
         True caso desejemos anotações que o heatmap mostre a contagem
+    modo : str
+        "seaborn" para o heatmap do seaborn ou "imagem" para mapa_de_calor_rapido,
+        indicado para tabelas grandes
+    arquivo : str, opcional
+        Se informado, grava o gráfico nesse PNG/SVG em vez de mostrar a janela
+    top_n : int, opcional
+        No modo "imagem", anota apenas as top_n maiores células
 
     Returns
     -------
@@ -231,14 +652,26 @@ def visualizando_pilotos_por_pais_e_periodo(tabela: pd.DataFrame, anotacoes: boo
             raise TypeError("O tipo do parâmetro tabela precisa ser um pd.Dataframe")
         if type(anotacoes) != bool:
             raise TypeError("O tipo do parâmetro anotacoes precisa ser um bool")
+        if modo not in ("seaborn", "imagem"):
+            raise ValueError('modo precisa ser "seaborn" ou "imagem"')
+        import matplotlib.pyplot as plt
+        if modo == "imagem":
+            mapa_de_calor_rapido(tabela, arquivo, anotacoes, top_n)
+            if arquivo is None:
+                plt.show()
         else:
             # montando um heatmap para visualizar melhor os dados
+            import seaborn as sns
             plt.figure(figsize=(16, 10))
             sns.heatmap(tabela, annot=anotacoes, cmap="Spectral")
             plt.title("Heatmap dos pilotos nascidos por período e nacionalidade")
             plt.xlabel("Períodos")
             plt.ylabel("Países")
-            plt.show()
+            if arquivo is not None:
+                plt.savefig(arquivo, bbox_inches="tight")
+                plt.close()
+            else:
+                plt.show()
     except TypeError as e:
         raise
         print(f"Erro: {e}")        
@@ -286,7 +719,8 @@ def paises_com_mais_pilotos_por_periodo(tabela: pd.DataFrame) -> Optional[Tuple[
         print(f"Erro: {e}")
             
 
-def visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(pilotos_maximos_nascidos_por_periodo: pd.Series, paises_dos_pilotos: pd.Series) -> None:
+def visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(pilotos_maximos_nascidos_por_periodo: pd.Series, paises_dos_pilotos: pd.Series,
+                                                                arquivo: Optional[str] = None) -> None:
     """
     Visualiza quais países nasceram mais pilotos por períodos através de um gráfico de barras
 
@@ -296,6 +730,8 @@ def visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(pilotos_maximos_
         Série dos maiores nascimentos por período
     paises_dos_pilotos : pd.Series
         Série dos países respectivos a esses maiores nascimentos
+    arquivo : str, opcional
+        Se informado, grava o gráfico nesse PNG/SVG em vez de mostrar a janela
 
     Returns
     -------
@@ -322,22 +758,24 @@ def visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(pilotos_maximos_
             raise TypeError("Os parametros passados precisam ser pd.Series")
         else:
             # montando um gráfico de barras para visualizar melhor os dados
+            import matplotlib.pyplot as plt
+            import seaborn as sns
             plt.figure(figsize=(16, 10))
             sns.barplot(x=pilotos_maximos_nascidos_por_periodo.index, y=pilotos_maximos_nascidos_por_periodo, 
                             hue=paises_dos_pilotos, dodge=False)
             plt.xlabel("Anos")
             plt.ylabel("Quantidade de pilotos nascidos")
             plt.title("Maior quantidade de pilotos nascidos por período e país")
-            plt.show()
+            if arquivo is not None:
+                plt.savefig(arquivo, bbox_inches="tight")
+                plt.close()
+            else:
+                plt.show()
     except TypeError as e:
         raise
         print(f"Erro: {e}")
 if __name__ == '__main__':        
-    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "drivers.csv")
-    df = obtem_dados_csv(path)
-    df_arrumado = arrumando_dados(df)
-    df_com_periodo = classificando_em_periodos(df_arrumado, 10)
-    tabela = agrupando_nacionalidades_por_periodos_e_transformando_em_tabela(df_com_periodo)
+    tabela = cubo_de_contagens().tabela(10)
     pilotos_maximos_paises_e_periodo, paises_pilotos = paises_com_mais_pilotos_por_periodo(tabela)
     visualizando_pilotos_por_pais_e_periodo(tabela, False)
     visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(pilotos_maximos_paises_e_periodo, paises_pilotos)
\ No newline at end of file
@@ -0,0 +1,354 @@
+import os
+import json
+import threading
+import weakref
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+import tabelas
+
+class RaceInfo(NamedTuple):
+    """
+    Dados de uma corrida guardados no indice de corridas.
+    """
+    year: int
+    round: int
+    circuitId: int
+    name: str
+
+class RaceIndex:
+    """
+    Indice nos dois sentidos sobre o races.csv: ano -> IDs das corridas
+    (ordenados) e raceId -> ano, rodada, circuito e nome. As consultas sao
+    buscas em dicionario e os arrays devolvidos sao somente leitura, sem copia.
+
+    Parameters
+    ----------
+    races : pd.DataFrame
+        DataFrame com as colunas raceId, year, round, circuitId e name.
+
+    Raises
+    ------
+    TypeError
+        Se races nao for um DataFrame.
+    KeyError
+        Se faltar alguma coluna esperada.
+    """
+
+    def __init__(self, races: pd.DataFrame):
+        if not isinstance(races, pd.DataFrame):
+            raise TypeError("races deve ser um DataFrame.")
+        columns = ["raceId", "year", "round", "circuitId", "name"]
+        missing = [column for column in columns if column not in races.columns]
+        if missing:
+            raise KeyError(f"Colunas ausentes no DataFrame de corridas: {missing}")
+
+        ordered = races[columns].sort_values(["year", "raceId"], kind="stable")
+        race_ids = ordered["raceId"].to_numpy(dtype=np.int64)
+        years = ordered["year"].to_numpy(dtype=np.int64)
+
+        #Como esta ordenado por ano, cada ano e uma fatia continua dos IDs
+        self._by_year = {}
+        unique_years, starts = np.unique(years, return_index=True)
+        stops = np.append(starts[1:], len(years))
+        for year, start, stop in zip(unique_years, starts, stops):
+            ids = race_ids[start:stop].copy()
+            ids.flags.writeable = False
+            self._by_year[int(year)] = ids
+
+        self._by_race = {
+            int(race): RaceInfo(int(year), int(rnd), int(circuit), name)
+            for race, year, rnd, circuit, name in zip(race_ids, years, ordered["round"],
+                                                      ordered["circuitId"], ordered["name"])
+        }
+        self._empty = np.array([], dtype=np.int64)
+        self._empty.flags.writeable = False
+
+    def races_of_year(self, year: int) -> np.ndarray:
+        """
+        IDs das corridas de um ano, em ordem crescente.
+
+        Parameters
+        ----------
+        year : int
+            Ano desejado.
+
+        Returns
+        -------
+        np.ndarray
+            Array somente leitura com os IDs (vazio se nao houver corridas no ano).
+        """
+        return self._by_year.get(year, self._empty)
+
+    def race_info(self, race_id: int) -> RaceInfo:
+        """
+        Ano, rodada, circuito e nome de uma corrida.
+
+        Parameters
+        ----------
+        race_id : int
+            Id da corrida.
+
+        Returns
+        -------
+        RaceInfo
+            Dados da corrida.
+
+        Raises
+        ------
+        KeyError
+            Se a corrida nao existir.
+        """
+        return self._by_race[int(race_id)]
+
+    def year_of_race(self, race_id: int) -> int:
+        """
+        Ano em que a corrida aconteceu.
+
+        Parameters
+        ----------
+        race_id : int
+            Id da corrida.
+
+        Returns
+        -------
+        int
+            Ano da corrida.
+
+        Raises
+        ------
+        KeyError
+            Se a corrida nao existir.
+        """
+        return self._by_race[int(race_id)].year
+
+    def years(self) -> list:
+        """
+        Anos presentes no indice, em ordem crescente.
+        """
+        return list(self._by_year)
+
+    def __contains__(self, race_id) -> bool:
+        return int(race_id) in self._by_race
+
+_race_index = None
+_race_index_key = None
+_lock = threading.Lock()
+#Indices construidos a partir de um dataset informado, guardados enquanto o dataset existir
+_dataset_indexes = weakref.WeakKeyDictionary()
+
+def _dataset_index(dataset: tabelas.Dataset, key, build):
+    with _lock:
+        cached = _dataset_indexes.setdefault(dataset, {})
+        if key not in cached:
+            cached[key] = build()
+        return cached[key]
+
+def race_index(dataset: tabelas.Dataset = None) -> RaceIndex:
+    """
+    Indice de corridas compartilhado pelos modulos, construido uma vez a partir
+    do races.csv e refeito apenas quando o arquivo mudar.
+
+    Parameters
+    ----------
+    dataset : tabelas.Dataset, opcional
+        Se informado, o indice e construido a partir da tabela races do dataset
+        (uma vez por dataset).
+
+    Returns
+    -------
+    RaceIndex
+        Indice de corridas.
+
+    Examples
+    --------
+    >>> race_index().races_of_year(2023)[:3]
+    array([1098, 1099, 1100])
+    >>> race_index().race_info(1098).name
+    'Bahrain Grand Prix'
+    """
+    global _race_index, _race_index_key
+    if dataset is not None:
+        dataset = tabelas.resolve_dataset(dataset)
+        return _dataset_index(dataset, "races", lambda: RaceIndex(dataset.table("races")))
+    filepath = tabelas.table_path("races")
+    stat = os.stat(filepath)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _race_index is None or _race_index_key != key:
+            _race_index = RaceIndex(tabelas.read_csv_cached(filepath))
+            _race_index_key = key
+        return _race_index
+
+class ConstructorIndex:
+    """
+    Indice compacto (raceId, driverId) -> constructorId. As duas chaves viram
+    uma chave int64 (raceId << 32 | driverId), guardada ordenada, e a busca e
+    feita com searchsorted para todos os pares de uma vez.
+
+    Parameters
+    ----------
+    keys : np.ndarray
+        Chaves compostas ordenadas e sem repeticao.
+    constructors : np.ndarray
+        constructorId de cada chave.
+
+    Raises
+    ------
+    ValueError
+        Se os arrays tiverem tamanhos diferentes.
+    """
+
+    def __init__(self, keys: np.ndarray, constructors: np.ndarray):
+        if len(keys) != len(constructors):
+            raise ValueError("keys e constructors devem ter o mesmo tamanho.")
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.constructors = np.asarray(constructors, dtype=np.int64)
+
+    @staticmethod
+    def composite_keys(race_ids, driver_ids) -> np.ndarray:
+        """
+        Junta raceId e driverId numa unica chave int64.
+        """
+        return (np.asarray(race_ids, dtype=np.int64) << 32) | np.asarray(driver_ids, dtype=np.int64)
+
+    @classmethod
+    def from_frames(cls, *frames: pd.DataFrame) -> "ConstructorIndex":
+        """
+        Constroi o indice a partir de uma ou mais tabelas com raceId, driverId e
+        constructorId (ex.: results e sprint_results). Se um par aparecer mais de
+        uma vez, vale a primeira ocorrencia, seguindo a ordem das tabelas.
+
+        Parameters
+        ----------
+        *frames : pd.DataFrame
+            Tabelas de resultados.
+
+        Returns
+        -------
+        ConstructorIndex
+            Indice construido.
+
+        Raises
+        ------
+        TypeError
+            Se alguma tabela nao for um DataFrame.
+        """
+        if not all(isinstance(frame, pd.DataFrame) for frame in frames):
+            raise TypeError("As tabelas de resultados devem ser DataFrames.")
+        keys = np.concatenate([cls.composite_keys(frame["raceId"], frame["driverId"]) for frame in frames])
+        constructors = np.concatenate([frame["constructorId"].to_numpy(dtype=np.int64) for frame in frames])
+        #np.unique devolve a primeira posicao de cada chave, ja ordenada
+        keys, first = np.unique(keys, return_index=True)
+        return cls(keys, constructors[first])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, race_ids, driver_ids) -> np.ndarray:
+        """
+        constructorId de cada par (raceId, driverId).
+
+        Parameters
+        ----------
+        race_ids : array-like
+            IDs das corridas.
+        driver_ids : array-like
+            IDs dos pilotos, do mesmo tamanho.
+
+        Returns
+        -------
+        np.ndarray
+            constructorId de cada par, ou -1 quando o par nao existe.
+        """
+        wanted = self.composite_keys(race_ids, driver_ids)
+        if len(self.keys) == 0:
+            return np.full(len(wanted), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.keys, wanted), len(self.keys) - 1)
+        found = self.keys[pos] == wanted
+        return np.where(found, self.constructors[pos], -1)
+
+    def save(self, filepath: str, meta: dict = None) -> None:
+        """
+        Grava o indice num .npz (de forma atomica), junto com metadados opcionais.
+        """
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        tmp = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, keys=self.keys, constructors=self.constructors, meta=np.array(json.dumps(meta or {})))
+        os.replace(tmp, filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> tuple:
+        """
+        Le um indice gravado com save.
+
+        Returns
+        -------
+        tuple
+            (indice, metadados).
+        """
+        with np.load(filepath) as saved:
+            return cls(saved["keys"], saved["constructors"]), json.loads(str(saved["meta"]))
+
+INDEX_DIR = os.path.join(tabelas.CACHE_DIR, 'indices')
+_constructor_indexes = {}
+
+def constructor_index(include_sprints: bool = False, dataset: tabelas.Dataset = None) -> ConstructorIndex:
+    """
+    Indice (raceId, driverId) -> constructorId compartilhado, construido a partir
+    do results.csv (e do sprint_results.csv, se pedido). Fica gravado em
+    .cache/indices e so e refeito quando algum dos arquivos mudar.
+
+    Parameters
+    ----------
+    include_sprints : bool
+        Se True, inclui os pares que so aparecem nas corridas sprint.
+    dataset : tabelas.Dataset, opcional
+        Se informado, o indice e construido a partir das tabelas do dataset
+        (uma vez por dataset) e nao e gravado em disco.
+
+    Returns
+    -------
+    ConstructorIndex
+        Indice de construtores.
+
+    Raises
+    ------
+    TypeError
+        Se include_sprints nao for bool.
+
+    Examples
+    --------
+    >>> constructor_index().lookup([1098, 1098], [830, 1])
+    array([  9, 131])
+    """
+    if not isinstance(include_sprints, bool):
+        raise TypeError("include_sprints deve ser um bool.")
+    names = ["results", "sprint_results"] if include_sprints else ["results"]
+    if dataset is not None:
+        dataset = tabelas.resolve_dataset(dataset)
+        return _dataset_index(dataset, ("constructors", include_sprints),
+                              lambda: ConstructorIndex.from_frames(*[dataset.table(name) for name in names]))
+    meta = {}
+    for name in names:
+        stat = os.stat(tabelas.table_path(name))
+        meta[name] = [stat.st_mtime_ns, stat.st_size]
+
+    with _lock:
+        cached = _constructor_indexes.get(include_sprints)
+        if cached is not None and cached[1] == meta:
+            return cached[0]
+        filepath = os.path.join(INDEX_DIR, "constructors_sprints.npz" if include_sprints else "constructors.npz")
+        try:
+            index, saved_meta = ConstructorIndex.load(filepath)
+        except (OSError, ValueError, KeyError):
+            index, saved_meta = None, None
+        if index is None or saved_meta != meta:
+            index = ConstructorIndex.from_frames(*[tabelas.load_table(name) for name in names])
+            try:
+                index.save(filepath, meta)
+            except OSError:
+                pass
+        _constructor_indexes[include_sprints] = (index, meta)
+        return index
@@ -0,0 +1,241 @@
+import os
+import glob
+import pickle
+import hashlib
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import tabelas
+
+#Pasta da camada em disco, um subdiretorio por funcao
+MEMO_DIR = os.path.join(tabelas.CACHE_DIR, 'memo')
+#A camada em disco e opcional: F1_MEMO_DISK=1 liga, F1_MEMO_DISK_MB limita o tamanho total
+DISK_ENABLED = os.environ.get("F1_MEMO_DISK", "0") == "1"
+DISK_MAX_BYTES = int(os.environ.get("F1_MEMO_DISK_MB", "64")) * 2**20
+
+_registry = []
+
+def _fingerprint(tables: tuple) -> tuple:
+    #Caminho, mtime e tamanho de cada CSV de entrada: se algum mudar, a chave muda
+    fingerprint = []
+    for name in tables:
+        filepath = tabelas.table_path(name)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        fingerprint.append((filepath, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+def _protect(value):
+    #Quem chama recebe sempre uma copia, entao alterar o resultado nao altera o cache
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    return value
+
+class _Memo:
+    """
+    Estado de uma funcao memoizada: camada LRU em memoria e camada opcional em disco.
+    """
+
+    def __init__(self, func, tables: tuple, maxsize: int, disk):
+        self.func = func
+        self.tables = tuple(tables)
+        self.maxsize = maxsize
+        self.disk = disk
+        self.signature = inspect.signature(func)
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, args: tuple, kwargs: dict):
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError:
+            return None
+        bound.apply_defaults()
+        #Com um dataset informado os dados nao vem dos CSVs, entao nao ha como validar a chave
+        if bound.arguments.get("dataset") is not None:
+            return None
+        fingerprint = _fingerprint(self.tables)
+        if fingerprint is None:
+            return None
+        key = (self.name, tuple(bound.arguments.items()), fingerprint)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def disk_enabled(self) -> bool:
+        return DISK_ENABLED if self.disk is None else self.disk
+
+    def disk_path(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(MEMO_DIR, self.name, f"{digest}.pkl")
+
+    def load_disk(self, key):
+        filepath = self.disk_path(key)
+        try:
+            with open(filepath, 'rb') as f:
+                saved_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if saved_key != key:
+            return None
+        #O mtime marca o ultimo uso, usado para escolher quem sai quando o limite estoura
+        try:
+            os.utime(filepath)
+        except OSError:
+            pass
+        return (value,)
+
+    def save_disk(self, key, value) -> None:
+        filepath = self.disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            tmp = f"{filepath}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, filepath)
+            _evict_disk(DISK_MAX_BYTES)
+        except OSError:
+            pass
+
+    def remember(self, key, value) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def __call__(self, *args, **kwargs):
+        key = self.key(args, kwargs)
+        if key is None:
+            return self.func(*args, **kwargs)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return _protect(self.entries[key])
+        if self.disk_enabled():
+            saved = self.load_disk(key)
+            if saved is not None:
+                with self.lock:
+                    self.disk_hits += 1
+                self.remember(key, saved[0])
+                return _protect(saved[0])
+        with self.lock:
+            self.misses += 1
+        value = self.func(*args, **kwargs)
+        self.remember(key, _protect(value))
+        if self.disk_enabled():
+            self.save_disk(key, value)
+        return _protect(value)
+
+    def cache_info(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "entries": len(self.entries), "maxsize": self.maxsize}
+
+    def cache_clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+def _evict_disk(max_bytes: int) -> None:
+    #Remove os arquivos usados ha mais tempo ate a camada em disco caber no limite
+    files = []
+    for filepath in glob.glob(os.path.join(MEMO_DIR, '*', '*.pkl')):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            continue
+        files.append((stat.st_mtime_ns, stat.st_size, filepath))
+    total = sum(size for _, size, _ in files)
+    for _, size, filepath in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(filepath)
+        except OSError:
+            continue
+        total -= size
+
+def memoize(tables, maxsize: int = 128, disk: bool = None):
+    """
+    Decorador que guarda os resultados de uma funcao de analise. A chave e a
+    funcao, os argumentos (com os valores padrao preenchidos) e a impressao
+    digital (caminho, mtime e tamanho) dos CSVs de entrada, entao uma planilha
+    alterada invalida os resultados que dependem dela.
+
+    Ha uma camada em memoria, LRU com no maximo maxsize resultados por funcao,
+    e uma camada opcional em disco (.cache/memo), limitada a DISK_MAX_BYTES no
+    total e esvaziada a partir dos arquivos usados ha mais tempo. DataFrames,
+    Series e arrays sao devolvidos como copias. Chamadas com um dataset
+    informado, ou com argumentos que nao podem virar chave, nao passam pelo cache.
+
+    Parameters
+    ----------
+    tables : list
+        Nomes das tabelas lidas pela funcao (ex.: ["races", "driver_standings"]).
+    maxsize : int
+        Quantidade maxima de resultados guardados em memoria por funcao.
+    disk : bool, opcional
+        Liga ou desliga a camada em disco para esta funcao. Se None, segue
+        DISK_ENABLED (variavel de ambiente F1_MEMO_DISK).
+
+    Returns
+    -------
+    callable
+        O decorador. A funcao decorada ganha cache_info() e cache_clear().
+
+    Raises
+    ------
+    TypeError
+        Se tables nao for uma lista de nomes ou maxsize nao for inteiro.
+    ValueError
+        Se maxsize nao for positivo.
+
+    Examples
+    --------
+    >>> @memoize(["races", "constructor_results"])
+    ... def constructor_result(year: int) -> pd.Series:
+    ...     ...
+    """
+    if isinstance(tables, str) or not all(isinstance(name, str) for name in tables):
+        raise TypeError("tables deve ser uma lista com os nomes das tabelas.")
+    if not isinstance(maxsize, int):
+        raise TypeError("maxsize deve ser um inteiro.")
+    if maxsize <= 0:
+        raise ValueError("maxsize deve ser positivo.")
+
+    def decorator(func):
+        state = _Memo(func, tables, maxsize, disk)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return state(*args, **kwargs)
+
+        wrapper.cache_info = state.cache_info
+        wrapper.cache_clear = state.cache_clear
+        _registry.append(state)
+        return wrapper
+
+    return decorator
+
+def clear_all(disk: bool = False) -> None:
+    """
+    Esvazia a camada em memoria de todas as funcoes memoizadas e, se disk=True,
+    apaga tambem a camada em disco.
+    """
+    for state in _registry:
+        state.cache_clear()
+    if disk:
+        _evict_disk(0)
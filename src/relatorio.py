@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import html
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import tabelas
+import hipotese1
+import hipotese2
+import hipotese3
+
+#Pasta padrao do relatorio, com as figuras, o manifest.json e o index.html
+REPORT_DIR = os.path.join(tabelas.CACHE_DIR, 'relatorio')
+#Mudar quando o desenho das figuras mudar, para refazer todas
+_RENDER_VERSION = 1
+
+#Parametros padrao, os mesmos dos __main__ de cada hipotese
+DEFAULTS = {"anos_h1": (2023, 1995), "anos_h2": (2011, 2023), "periodo": 10}
+
+def _headless() -> None:
+    #Backend sem janela; usado no processo principal e em cada processo filho
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+def _figura_hipotese1(arquivo: str, parametros: dict) -> None:
+    relacao = hipotese1.calculate_hipotesis(*parametros["anos_h1"], diagnostics="silent")
+    hipotese1.plot_hipotesis(relacao, arquivo)
+
+def _figura_hipotese2(arquivo: str, parametros: dict) -> None:
+    hipotese2.plot_scatter(hipotese2.pit_stops_across_years(*parametros["anos_h2"]), arquivo)
+
+def _figura_hipotese3_mapa(arquivo: str, parametros: dict) -> None:
+    tabela = hipotese3.cubo_de_contagens().tabela(parametros["periodo"])
+    hipotese3.mapa_de_calor_rapido(tabela, arquivo, anotacoes=True)
+
+def _figura_hipotese3_barras(arquivo: str, parametros: dict) -> None:
+    tabela = hipotese3.cubo_de_contagens().tabela(parametros["periodo"])
+    maximos, paises = hipotese3.paises_com_mais_pilotos_por_periodo(tabela)
+    hipotese3.visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(maximos, paises, arquivo)
+
+#nome -> (titulo, tabelas de entrada, parametros usados, funcao que desenha)
+FIGURES = {
+    "hipotese1_dispersao": ("Hipótese 1: pontos x voltas rápidas",
+                            ["races", "driver_standings", "drivers", "lap_times"], ["anos_h1"], _figura_hipotese1),
+    "hipotese2_dispersao": ("Hipótese 2: média de pit stop x pontos dos construtores",
+                            list(hipotese2.TABLES), ["anos_h2"], _figura_hipotese2),
+    "hipotese3_mapa_de_calor": ("Hipótese 3: pilotos nascidos por período e nacionalidade",
+                                ["drivers"], ["periodo"], _figura_hipotese3_mapa),
+    "hipotese3_barras": ("Hipótese 3: país com mais pilotos nascidos por período",
+                         ["drivers"], ["periodo"], _figura_hipotese3_barras),
+}
+
+def figure_fingerprint(name: str, parametros: dict, formato: str) -> str:
+    """
+    Impressao digital de uma figura: nome, parametros usados, formato e
+    mtime/tamanho dos CSVs de entrada. Se nada disso mudar, a figura nao e refeita.
+
+    Parameters
+    ----------
+    name : str
+        Nome da figura (chave de FIGURES).
+    parametros : dict
+        Parametros do relatorio.
+    formato : str
+        Extensao do arquivo (png, svg, ...).
+
+    Returns
+    -------
+    str
+        Hash hexadecimal.
+    """
+    _, tables, usados, _ = FIGURES[name]
+    entradas = []
+    for table in tables:
+        stat = os.stat(tabelas.table_path(table))
+        entradas.append([table, stat.st_mtime_ns, stat.st_size])
+    chave = {"figura": name, "parametros": {k: list(parametros[k]) if isinstance(parametros[k], tuple) else parametros[k]
+                                              for k in usados},
+             "formato": formato, "entradas": entradas, "versao": _RENDER_VERSION}
+    return hashlib.sha1(json.dumps(chave, sort_keys=True).encode()).hexdigest()[:16]
+
+def _render(task: tuple) -> str:
+    #Executado nos processos filhos (ou no principal, sem paralelismo)
+    name, arquivo, parametros = task
+    _headless()
+    tmp = f"{arquivo}.{os.getpid()}.tmp{os.path.splitext(arquivo)[1]}"
+    FIGURES[name][3](tmp, parametros)
+    os.replace(tmp, arquivo)
+    return arquivo
+
+def _write_index(output_dir: str, entradas: dict) -> str:
+    linhas = ["<!DOCTYPE html>", "<html><head><meta charset=\"utf-8\"><title>Relatório F1</title></head><body>",
+              "<h1>Relatório das hipóteses</h1>"]
+    for name, entrada in entradas.items():
+        titulo = html.escape(FIGURES[name][0])
+        arquivo = html.escape(os.path.basename(entrada["arquivo"]))
+        linhas.append(f"<h2>{titulo}</h2>")
+        linhas.append(f"<p><img src=\"{arquivo}\" alt=\"{titulo}\" style=\"max-width:100%\"></p>")
+        linhas.append(f"<p><small>{html.escape(name)} &middot; {entrada['fingerprint']}</small></p>")
+    linhas.append("</body></html>")
+    filepath = os.path.join(output_dir, "index.html")
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    return filepath
+
+def render_reports(output_dir: str = None, figures=None, workers: int = None, force: bool = False,
+                   formato: str = "png", **parametros) -> dict:
+    """
+    Gera as figuras das tres hipoteses em arquivos, sem janela (backend Agg),
+    em processos paralelos, e escreve um index.html com todas. Figuras cuja
+    impressao digital (parametros e CSVs de entrada) nao mudou desde a ultima
+    execucao nao sao refeitas.
+
+    Parameters
+    ----------
+    output_dir : str, opcional
+        Pasta do relatorio. Se None, usa .cache/relatorio.
+    figures : list, opcional
+        Nomes das figuras (chaves de FIGURES). Se None, todas.
+    workers : int, opcional
+        Quantidade de processos. Se None, um por figura pendente (limitado
+        pela quantidade de CPUs).
+    force : bool
+        Se True, refaz todas as figuras.
+    formato : str
+        "png" ou "svg".
+    **parametros
+        anos_h1, anos_h2 e periodo, que substituem os valores de DEFAULTS.
+
+    Returns
+    -------
+    dict
+        nome -> {"arquivo", "fingerprint", "renderizado"}; a chave "index"
+        traz o caminho do index.html.
+
+    Raises
+    ------
+    KeyError
+        Se alguma figura nao existir.
+    ValueError
+        Se o formato nao for png ou svg, ou se houver parametro desconhecido.
+
+    Examples
+    --------
+    >>> resultado = render_reports(workers=4)
+    >>> resultado["index"]
+    '.../.cache/relatorio/index.html'
+    """
+    if formato not in ("png", "svg"):
+        raise ValueError('formato precisa ser "png" ou "svg"')
+    desconhecidos = set(parametros) - set(DEFAULTS)
+    if desconhecidos:
+        raise ValueError(f"Parametros desconhecidos: {sorted(desconhecidos)}")
+    parametros = {**DEFAULTS, **parametros}
+    figures = list(FIGURES) if figures is None else list(figures)
+    for name in figures:
+        if name not in FIGURES:
+            raise KeyError(f"Figura desconhecida: {name}")
+    if output_dir is None:
+        output_dir = REPORT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    _headless()
+
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    entradas = {}
+    pendentes = []
+    for name in figures:
+        arquivo = os.path.join(output_dir, f"{name}.{formato}")
+        fingerprint = figure_fingerprint(name, parametros, formato)
+        feito = manifest.get(name, {}).get("fingerprint") == fingerprint and os.path.exists(arquivo)
+        entradas[name] = {"arquivo": arquivo, "fingerprint": fingerprint, "renderizado": not feito or force}
+        if force or not feito:
+            pendentes.append((name, arquivo, parametros))
+
+    if workers is None:
+        workers = min(len(pendentes), os.cpu_count() or 1)
+    if workers > 1 and len(pendentes) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_headless) as executor:
+            list(executor.map(_render, pendentes))
+    else:
+        for task in pendentes:
+            _render(task)
+
+    manifest.update({name: {"fingerprint": entrada["fingerprint"], "arquivo": os.path.basename(entrada["arquivo"])}
+                     for name, entrada in entradas.items()})
+    tmp = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, manifest_path)
+
+    resultado = dict(entradas)
+    resultado["index"] = _write_index(output_dir, entradas)
+    return resultado
+
+if __name__ == '__main__':
+    resultado = render_reports(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(resultado["index"])
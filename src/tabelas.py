@@ -0,0 +1,486 @@
+import os
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+#Pasta com as planilhas do kaggle
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+#Pasta com os arquivos gerados (snapshots, resultados guardados, ...)
+CACHE_DIR = os.environ.get("F1_CACHE_DIR", os.path.join(ROOT_DIR, '.cache'))
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'snapshots')
+#Os snapshots podem ser desligados com F1_SNAPSHOTS=0
+USE_SNAPSHOTS = os.environ.get("F1_SNAPSHOTS", "1") != "0"
+#Abaixo deste tamanho o read_csv e tao rapido quanto o snapshot (mais rapido no formato npz,
+#ex.: races.csv, 160 KB: 4,3 ms pelo CSV contra 7,1 ms pelo npz), entao o CSV e lido direto
+SNAPSHOT_MIN_BYTES = 200_000
+_SNAPSHOT_VERSION = 2
+
+#Cache do processo: caminho absoluto -> (mtime, tamanho, dataframe, bytes ou None se ainda nao medido)
+_cache = {}
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+def table_path(name: str) -> str:
+    """
+    Monta o caminho de uma das planilhas da pasta data/.
+
+    Parameters
+    ----------
+    name : str
+        Nome da tabela, com ou sem a extensao .csv (ex.: "races").
+
+    Returns
+    -------
+    str
+        Caminho absoluto para o arquivo CSV.
+
+    Raises
+    ------
+    TypeError
+        Se o nome nao for uma string.
+    """
+    if not isinstance(name, str):
+        raise TypeError("O nome da tabela deve ser uma string.")
+    if not name.endswith('.csv'):
+        name = name + '.csv'
+    return os.path.join(DATA_DIR, name)
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reconstroi o DataFrame sobre arrays numpy marcados como somente leitura,
+    assim quem recebe a tabela do cache nao consegue alterar os dados guardados.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy(copy=True)
+        values.flags.writeable = False
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+def snapshot_path(filepath: str) -> str:
+    """
+    Caminho do snapshot colunar de um CSV da pasta data/.
+
+    Parameters
+    ----------
+    filepath : str
+        Caminho do arquivo CSV.
+
+    Returns
+    -------
+    str
+        Caminho do snapshot (.feather se o pyarrow estiver instalado,
+        senao .npz com um .npy por coluna).
+    """
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    extension = '.feather' if HAS_PYARROW else '.npz'
+    return os.path.join(SNAPSHOT_DIR, stem + extension)
+
+def _is_snapshotable(filepath: str, size: int) -> bool:
+    return (USE_SNAPSHOTS and size >= SNAPSHOT_MIN_BYTES
+            and os.path.dirname(os.path.abspath(filepath)) == os.path.abspath(DATA_DIR))
+
+def _source_meta(stat: os.stat_result) -> dict:
+    return {"version": _SNAPSHOT_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def _write_snapshot(df: pd.DataFrame, target: str, meta: dict) -> None:
+    """
+    Grava o snapshot num arquivo temporario e troca de uma vez,
+    assim um leitor nunca ve um snapshot pela metade.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    if HAS_PYARROW:
+        meta_tmp = f"{target}.json.{os.getpid()}.tmp"
+        df.to_feather(tmp)
+        with open(meta_tmp, 'w') as f:
+            json.dump(meta, f)
+        #O .json so e trocado depois do .feather: um .json novo nunca fica ao lado de um .feather antigo
+        #(o contrario, .json antigo com .feather novo, so faz o snapshot ser refeito)
+        os.replace(tmp, target)
+        os.replace(meta_tmp, target + '.json')
+    else:
+        arrays = {"__meta__": np.array(json.dumps({**meta, "columns": list(df.columns)}))}
+        for i, column in enumerate(df.columns):
+            values = df[column]
+            if values.dtype == object:
+                #Textos viram codigos + valores distintos em unicode (sem pickle), NaN fica com codigo -1
+                codes, uniques = pd.factorize(values)
+                arrays[f"c{i}"] = np.asarray(uniques).astype(str)
+                arrays[f"k{i}"] = codes.astype(np.int32)
+            elif values.dtype.kind in "biufM":
+                arrays[f"c{i}"] = values.to_numpy()
+            else:
+                raise TypeError(f"coluna {column} com tipo {values.dtype} nao suportado no snapshot")
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, target)
+
+def _read_snapshot(target: str, meta: dict):
+    """
+    Le o snapshot se ele existir e tiver sido gerado a partir da versao atual do CSV.
+    Retorna None caso contrario.
+    """
+    try:
+        if HAS_PYARROW:
+            with open(target + '.json') as f:
+                if json.load(f) != meta:
+                    return None
+            return pd.read_feather(target)
+        with np.load(target) as npz:
+            saved = json.loads(str(npz["__meta__"]))
+            columns = saved.pop("columns")
+            if saved != meta:
+                return None
+            data = {}
+            for i, column in enumerate(columns):
+                if f"k{i}" in npz:
+                    uniques = np.append(npz[f"c{i}"].astype(object), np.nan)
+                    data[column] = uniques[npz[f"k{i}"]]
+                else:
+                    data[column] = npz[f"c{i}"]
+            return pd.DataFrame(data, columns=columns)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _read_source(filepath: str, stat: os.stat_result) -> pd.DataFrame:
+    """
+    Le um CSV da pasta data/ pelo snapshot colunar, gerando ou refazendo
+    o snapshot quando ele nao existe ou ficou desatualizado.
+    """
+    if not _is_snapshotable(filepath, stat.st_size):
+        return pd.read_csv(filepath)
+    target = snapshot_path(filepath)
+    meta = _source_meta(stat)
+    df = _read_snapshot(target, meta)
+    if df is None:
+        df = pd.read_csv(filepath)
+        try:
+            _write_snapshot(df, target, meta)
+        except (OSError, TypeError):
+            #Sem snapshot o CSV continua sendo a fonte, apenas mais lenta
+            pass
+    return df
+
+def build_snapshot(name: str) -> str:
+    """
+    Gera (ou atualiza, se estiver desatualizado) o snapshot colunar de uma tabela.
+
+    Parameters
+    ----------
+    name : str
+        Nome da tabela, com ou sem a extensao .csv (ex.: "races").
+
+    Returns
+    -------
+    str
+        Caminho do snapshot gerado.
+    """
+    filepath = table_path(name)
+    stat = os.stat(filepath)
+    target = snapshot_path(filepath)
+    meta = _source_meta(stat)
+    if _read_snapshot(target, meta) is None:
+        _write_snapshot(pd.read_csv(filepath), target, meta)
+    return target
+
+def build_snapshots() -> list:
+    """
+    Gera os snapshots de todos os CSVs da pasta data/ com pelo menos
+    SNAPSHOT_MIN_BYTES (os menores sao sempre lidos direto do CSV).
+
+    Returns
+    -------
+    list
+        Caminhos dos snapshots gerados.
+    """
+    names = sorted(f for f in os.listdir(DATA_DIR)
+                   if f.endswith('.csv') and os.path.getsize(os.path.join(DATA_DIR, f)) >= SNAPSHOT_MIN_BYTES)
+    return [build_snapshot(name) for name in names]
+
+def read_csv_cached(filepath: str) -> pd.DataFrame:
+    """
+    Le um CSV passando pelo cache do processo. Cada arquivo e lido uma unica vez
+    e so volta a ser lido quando a data de modificacao ou o tamanho mudarem.
+    Arquivos da pasta data/ sao lidos pelo snapshot colunar quando possivel.
+
+    Parameters
+    ----------
+    filepath : str
+        Caminho do arquivo CSV.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame somente leitura com os dados do arquivo. Adicionar colunas
+        no objeto devolvido e permitido, alterar valores existentes nao.
+
+    Raises
+    ------
+    TypeError
+        Se o caminho nao for uma string.
+    FileNotFoundError
+        Se o arquivo nao existir.
+    """
+    if not isinstance(filepath, str):
+        raise TypeError("O caminho do arquivo deve ser uma string.")
+
+    key = os.path.abspath(filepath)
+    try:
+        stat = os.stat(key)
+    except OSError:
+        #Sem como validar o arquivo, le direto sem guardar (o pandas acusa o erro se for o caso)
+        return pd.read_csv(filepath)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            _stats["hits"] += 1
+            return entry[2].copy(deep=False)
+        _stats["misses"] += 1
+
+    df = _freeze(_read_source(key, stat))
+    #O tamanho em memoria so e medido quando cache_stats for chamado, fora do caminho da leitura
+    with _lock:
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, df, None)
+    return df.copy(deep=False)
+
+def load_table(name: str) -> pd.DataFrame:
+    """
+    Carrega uma das planilhas da pasta data/ pelo cache do processo.
+
+    Parameters
+    ----------
+    name : str
+        Nome da tabela, com ou sem a extensao .csv (ex.: "races").
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame somente leitura com os dados da tabela.
+
+    Examples
+    --------
+    >>> races = load_table("races")
+    >>> races[races["year"] == 2023]["raceId"].nunique()
+    22
+    """
+    return read_csv_cached(table_path(name))
+
+def clear_cache() -> None:
+    """
+    Esvazia o cache de tabelas e zera as estatisticas.
+    """
+    with _lock:
+        _cache.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    #Mesmo valor de memory_usage(deep=True), que nao aceita os arrays somente leitura do cache
+    nbytes = int(df.memory_usage(index=True, deep=False).sum())
+    for column in df.columns[df.dtypes == object]:
+        nbytes += sum(map(sys.getsizeof, df[column].to_numpy()))
+    return nbytes
+
+def cache_stats() -> dict:
+    """
+    Retorna as estatisticas do cache de tabelas.
+
+    Returns
+    -------
+    dict
+        Dicionario com "hits", "misses", "entries" (arquivos guardados)
+        e "bytes" (memoria ocupada pelos DataFrames guardados).
+    """
+    with _lock:
+        for key, entry in _cache.items():
+            if entry[3] is None:
+                _cache[key] = entry[:3] + (_frame_bytes(entry[2]),)
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "entries": len(_cache),
+            "bytes": sum(entry[3] for entry in _cache.values()),
+        }
+
+def _table_name(name: str) -> str:
+    if not isinstance(name, str):
+        raise TypeError("O nome da tabela deve ser uma string.")
+    return name[:-4] if name.endswith('.csv') else name
+
+class Dataset:
+    """
+    Conjunto de tabelas usado pelas analises. As tabelas carregadas ficam
+    guardadas no objeto; as que faltarem sao lidas da pasta data_dir
+    (pelo cache de tabelas) ou, se data_dir for None, geram KeyError.
+    As tabelas nao devem ser alteradas depois de entrarem no conjunto, pois
+    os indices derivados delas sao guardados junto ao objeto.
+
+    Parameters
+    ----------
+    tables : dict, opcional
+        Tabelas ja carregadas, nome -> DataFrame (ex.: {"races": df}).
+    data_dir : str, opcional
+        Pasta com os CSVs usada para as tabelas que nao estiverem em tables.
+
+    Examples
+    --------
+    >>> dataset = Dataset({"races": races_df})
+    >>> dataset.table("races") is not None
+    True
+    """
+
+    def __init__(self, tables: dict = None, data_dir: str = None):
+        if tables is not None and not isinstance(tables, dict):
+            raise TypeError("tables deve ser um dicionario nome -> DataFrame.")
+        self._tables = {}
+        for name, df in (tables or {}).items():
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError(f"A tabela {name} deve ser um DataFrame.")
+            self._tables[_table_name(name)] = df
+        self.data_dir = data_dir
+
+    def table(self, name: str) -> pd.DataFrame:
+        """
+        Retorna uma tabela do conjunto.
+
+        Parameters
+        ----------
+        name : str
+            Nome da tabela, com ou sem a extensao .csv.
+
+        Returns
+        -------
+        pd.DataFrame
+            A tabela (copia rasa, colunas novas nao alteram o conjunto).
+
+        Raises
+        ------
+        KeyError
+            Se a tabela nao estiver no conjunto e nao houver data_dir.
+        """
+        name = _table_name(name)
+        if name in self._tables:
+            return self._tables[name].copy(deep=False)
+        if self.data_dir is None:
+            raise KeyError(f"A tabela {name} nao esta no dataset.")
+        return read_csv_cached(os.path.join(self.data_dir, name + '.csv'))
+
+    def __contains__(self, name: str) -> bool:
+        return _table_name(name) in self._tables
+
+    @property
+    def names(self) -> list:
+        """
+        Nomes das tabelas ja carregadas.
+        """
+        return sorted(self._tables)
+
+def resolve_dataset(dataset: Dataset = None) -> Dataset:
+    """
+    Retorna o dataset a ser usado por uma analise: o informado ou, se None,
+    o dataset padrao, que le as tabelas da pasta data/ pelo cache.
+
+    Parameters
+    ----------
+    dataset : Dataset, opcional
+        Conjunto de tabelas informado pelo chamador.
+
+    Returns
+    -------
+    Dataset
+        Conjunto de tabelas.
+
+    Raises
+    ------
+    TypeError
+        Se dataset nao for None nem um Dataset.
+    """
+    if dataset is None:
+        return Dataset(data_dir=DATA_DIR)
+    if not isinstance(dataset, Dataset):
+        raise TypeError("dataset deve ser um tabelas.Dataset.")
+    return dataset
+
+def _default_workers(paths: list) -> int:
+    #Com uma CPU as threads so disputam o processador; senao uma por tabela, ate o numero de CPUs
+    cpus = os.cpu_count() or 1
+    if cpus == 1:
+        return 1
+    return min(len(paths), cpus)
+
+def load_tables(names, workers: int = None, data_dir: str = None) -> Dataset:
+    """
+    Carrega de uma vez as tabelas que uma analise vai usar. Cada leitura passa
+    pelo cache de tabelas, entao as funcoes que leem essas tabelas depois nao
+    fazem nova leitura do disco.
+
+    As leituras vao para um pool de threads (o parser de CSV do pandas libera
+    o GIL em boa parte da leitura). Com uma unica CPU as tabelas sao
+    lidas uma apos a outra, porque ali o pool so acrescenta custo
+    (benchmarks/bench_load_tables.py).
+
+    Parameters
+    ----------
+    names : list
+        Nomes das tabelas (ex.: ["races", "pit_stops"]).
+    workers : int, opcional
+        Quantidade de threads (1 le uma tabela apos a outra). Se None, uma por
+        tabela, ate o numero de CPUs (1 se houver uma so CPU).
+    data_dir : str, opcional
+        Pasta com os CSVs. Se None, usa data/.
+
+    Returns
+    -------
+    Dataset
+        Conjunto com as tabelas carregadas.
+
+    Raises
+    ------
+    TypeError
+        Se names nao for uma lista/tupla de strings ou workers nao for inteiro.
+    ValueError
+        Se workers nao for positivo.
+
+    Examples
+    --------
+    >>> dataset = load_tables(["races", "pit_stops", "results", "constructor_results"])
+    >>> dataset.names
+    ['constructor_results', 'pit_stops', 'races', 'results']
+    """
+    if isinstance(names, str) or not isinstance(names, (list, tuple, set, frozenset)):
+        raise TypeError("names deve ser uma lista com os nomes das tabelas.")
+    names = list(dict.fromkeys(_table_name(name) for name in names))
+    if workers is not None and not isinstance(workers, int):
+        raise TypeError("workers deve ser um inteiro.")
+    if workers is not None and workers <= 0:
+        raise ValueError("workers deve ser positivo.")
+    if data_dir is None:
+        data_dir = DATA_DIR
+    if not names:
+        return Dataset({}, data_dir)
+
+    paths = [os.path.join(data_dir, name + '.csv') for name in names]
+    if workers is None:
+        workers = _default_workers(paths)
+    if workers == 1 or len(paths) == 1:
+        frames = [read_csv_cached(path) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            frames = list(executor.map(read_csv_cached, paths))
+    return Dataset(dict(zip(names, frames)), data_dir)
+
+if __name__ == '__main__':
+    for target in build_snapshots():
+        print(target)
@@ -0,0 +1,418 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import tabelas
+
+#Apenas as colunas usadas nas analises de volta a volta, com tipos compactos
+LAP_COLUMNS = {
+    "raceId": np.int32,
+    "driverId": np.int32,
+    "lap": np.int16,
+    "milliseconds": np.int32,
+}
+LAP_CHUNKSIZE = 200_000
+#Registro compacto usado no arquivo mapeado em memoria
+LAP_DTYPE = np.dtype([(column, dtype) for column, dtype in LAP_COLUMNS.items()])
+LAP_STORE_DIR = os.path.join(tabelas.CACHE_DIR, 'lap_store')
+
+def read_lap_times(races=None, filepath: str = None, chunksize: int = LAP_CHUNKSIZE) -> pd.DataFrame:
+    """
+    Le o lap_times.csv em blocos, apenas com as colunas raceId, driverId, lap
+    e milliseconds, mantendo na memoria so as linhas das corridas pedidas.
+
+    Parameters
+    ----------
+    races : np.ndarray, opcional
+        IDs das corridas desejadas. Se None, mantem todas as corridas.
+    filepath : str, opcional
+        Caminho do arquivo de voltas. Se None, usa data/lap_times.csv.
+    chunksize : int
+        Quantidade de linhas lidas por bloco. O pico de memoria fica limitado
+        por um bloco mais as linhas das corridas pedidas.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com as voltas das corridas pedidas, na ordem do arquivo.
+
+    Raises
+    ------
+    TypeError
+        Se races nao for um array numpy ou se chunksize nao for um inteiro.
+    ValueError
+        Se chunksize nao for positivo.
+
+    Examples
+    --------
+    >>> from hipotese1 import search_year
+    >>> df = read_lap_times(search_year(2023))
+    >>> df.dtypes.to_dict()
+    {'raceId': dtype('int32'), 'driverId': dtype('int32'), 'lap': dtype('int16'), 'milliseconds': dtype('int32')}
+    """
+    if races is not None and not isinstance(races, np.ndarray):
+        raise TypeError("Os IDs das corridas devem ser um array numpy.")
+    if not isinstance(chunksize, int):
+        raise TypeError("O tamanho do bloco deve ser um inteiro.")
+    if chunksize <= 0:
+        raise ValueError("O tamanho do bloco deve ser positivo.")
+    if filepath is None:
+        filepath = tabelas.table_path("lap_times")
+
+    column_raceId = "raceId"
+    wanted = None if races is None else np.unique(races.astype(np.int32))
+
+    parts = []
+    reader = pd.read_csv(filepath, usecols=list(LAP_COLUMNS), dtype=LAP_COLUMNS, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            #Filtra cada bloco antes de guardar, assim so as corridas pedidas ficam na memoria
+            if wanted is not None:
+                chunk = chunk[np.isin(chunk[column_raceId].to_numpy(), wanted)]
+            if not chunk.empty:
+                parts.append(chunk[list(LAP_COLUMNS)])
+
+    if not parts:
+        return pd.DataFrame({column: np.array([], dtype=dtype) for column, dtype in LAP_COLUMNS.items()})
+    return pd.concat(parts, ignore_index=True)
+
+def group_starts(keys: tuple) -> np.ndarray:
+    """
+    Inicio de cada grupo em chaves ja agrupadas (linhas de um mesmo grupo
+    estao lado a lado). Um novo grupo comeca quando qualquer chave muda.
+
+    Parameters
+    ----------
+    keys : tuple
+        Arrays de chaves, todos com o mesmo tamanho.
+
+    Returns
+    -------
+    np.ndarray
+        Posicao da primeira linha de cada grupo.
+    """
+    size = len(keys[0])
+    if size == 0:
+        return np.array([], dtype=np.intp)
+    change = np.zeros(size, dtype=bool)
+    change[0] = True
+    for key in keys:
+        key = np.asarray(key)
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+def _grouped_arg(values, keys: tuple, presorted: bool, reducer, fill) -> np.ndarray:
+    if not isinstance(keys, (tuple, list)) or len(keys) == 0:
+        raise TypeError("keys deve ser uma tupla com pelo menos um array de chaves.")
+    values = np.asarray(values)
+    keys = tuple(np.asarray(key) for key in keys)
+    if any(len(key) != len(values) for key in keys):
+        raise ValueError("values e keys devem ter o mesmo tamanho.")
+    if len(values) == 0:
+        return np.array([], dtype=np.intp)
+
+    if presorted:
+        order = None
+        sorted_values, sorted_keys = values, keys
+    else:
+        #lexsort usa a ultima chave como principal e e estavel: empates ficam na ordem original
+        order = np.lexsort(keys[::-1])
+        sorted_values = values[order]
+        sorted_keys = tuple(key[order] for key in keys)
+    if sorted_values.dtype.kind == 'f':
+        #NaN nunca e escolhido (como no skipna do pandas), a nao ser que o grupo inteiro seja NaN
+        sorted_values = np.where(np.isnan(sorted_values), fill, sorted_values)
+
+    starts = group_starts(sorted_keys)
+    best = reducer.reduceat(sorted_values, starts)
+    lengths = np.diff(np.append(starts, len(sorted_values)))
+    #Entre as linhas iguais ao melhor valor do grupo fica a primeira
+    positions = np.arange(len(sorted_values))
+    candidates = np.where(sorted_values == np.repeat(best, lengths), positions, len(sorted_values))
+    first = np.minimum.reduceat(candidates, starts)
+    return first if order is None else order[first]
+
+def grouped_argmin(values, keys: tuple, presorted: bool = False) -> np.ndarray:
+    """
+    Posicao do menor valor de cada grupo, usando lexsort e reduceat do numpy
+    (sem groupby do pandas). Em caso de empate fica a linha que aparece
+    primeiro, assim o resultado e sempre o mesmo.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Valores comparados (ex.: milliseconds).
+    keys : tuple
+        Arrays com as chaves dos grupos, a primeira e a principal (ex.: (raceId, lap)).
+    presorted : bool
+        True se as linhas de cada grupo ja estao lado a lado (ex.: fatias do LapStore),
+        o que dispensa a ordenacao.
+
+    Returns
+    -------
+    np.ndarray
+        Uma posicao (do array original) por grupo, com os grupos em ordem crescente
+        de chaves (ou na ordem em que aparecem, se presorted).
+
+    Raises
+    ------
+    TypeError
+        Se keys nao for uma tupla ou lista de arrays.
+    ValueError
+        Se os arrays tiverem tamanhos diferentes.
+
+    Examples
+    --------
+    >>> race = np.array([1, 1, 2, 1, 2])
+    >>> lap = np.array([1, 1, 1, 2, 1])
+    >>> ms = np.array([90, 89, 95, 91, 95])
+    >>> grouped_argmin(ms, (race, lap))
+    array([1, 3, 2])
+    """
+    return _grouped_arg(values, keys, presorted, np.minimum, np.inf)
+
+def grouped_argmax(values, keys: tuple, presorted: bool = False) -> np.ndarray:
+    """
+    Posicao do maior valor de cada grupo, com as mesmas regras de grouped_argmin.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Valores comparados.
+    keys : tuple
+        Arrays com as chaves dos grupos, a primeira e a principal.
+    presorted : bool
+        True se as linhas de cada grupo ja estao lado a lado.
+
+    Returns
+    -------
+    np.ndarray
+        Uma posicao (do array original) por grupo.
+    """
+    return _grouped_arg(values, keys, presorted, np.maximum, -np.inf)
+
+class LapStore:
+    """
+    Voltas gravadas num array estruturado do numpy, ordenado por (raceId, lap)
+    e aberto com mmap. Cada corrida e uma fatia continua do arquivo, entao
+    pegar as voltas de uma corrida nao copia nada, e varios processos lendo o
+    mesmo arquivo compartilham o cache de paginas do sistema operacional.
+
+    Parameters
+    ----------
+    directory : str
+        Pasta gerada por build_lap_store.
+
+    Attributes
+    ----------
+    laps : np.memmap
+        Todas as voltas, com os campos raceId, driverId, lap e milliseconds.
+    race_ids : np.ndarray
+        IDs das corridas presentes, em ordem crescente.
+    offsets : np.ndarray
+        Inicio de cada corrida em laps; a corrida i vai de offsets[i] a offsets[i + 1].
+    meta : dict
+        Origem da conversao (caminho, data de modificacao e tamanho do CSV).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.laps = np.load(os.path.join(directory, 'laps.npy'), mmap_mode='r')
+        with np.load(os.path.join(directory, 'index.npz')) as index:
+            self.race_ids = index['race_ids']
+            self.offsets = index['offsets']
+        self._slices = {int(race): (int(self.offsets[i]), int(self.offsets[i + 1]))
+                        for i, race in enumerate(self.race_ids)}
+
+    def __len__(self) -> int:
+        return len(self.laps)
+
+    def __contains__(self, race_id) -> bool:
+        return int(race_id) in self._slices
+
+    def race(self, race_id: int) -> np.ndarray:
+        """
+        Voltas de uma corrida, ordenadas por volta, sem copia.
+
+        Parameters
+        ----------
+        race_id : int
+            Id da corrida.
+
+        Returns
+        -------
+        np.ndarray
+            Fatia do arquivo mapeado (vazia se a corrida nao tiver voltas).
+        """
+        start, stop = self._slices.get(int(race_id), (0, 0))
+        return self.laps[start:stop]
+
+    def races(self, race_ids: np.ndarray) -> np.ndarray:
+        """
+        Voltas de varias corridas, na ordem pedida. Aqui existe uma copia,
+        do tamanho apenas das corridas pedidas.
+
+        Parameters
+        ----------
+        race_ids : np.ndarray
+            IDs das corridas.
+
+        Returns
+        -------
+        np.ndarray
+            Array estruturado com as voltas das corridas.
+        """
+        blocks = [self.race(race) for race in race_ids]
+        if not blocks:
+            return np.empty(0, dtype=LAP_DTYPE)
+        return np.concatenate(blocks)
+
+def _lap_store_meta(filepath: str) -> dict:
+    stat = os.stat(filepath)
+    return {"source": os.path.abspath(filepath), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def _read_records(f, count: int) -> np.ndarray:
+    #Le ate count registros a partir da posicao atual do arquivo
+    data = f.read(count * LAP_DTYPE.itemsize)
+    return np.frombuffer(data, dtype=LAP_DTYPE).copy()
+
+def build_lap_store(filepath: str = None, directory: str = None, chunksize: int = LAP_CHUNKSIZE) -> str:
+    """
+    Converte o lap_times.csv para o formato do LapStore: um arquivo .npy com as
+    voltas ordenadas por (raceId, lap) e um indice com o inicio de cada corrida.
+
+    A conversao nao carrega o arquivo inteiro: o CSV e lido em blocos e gravado
+    como registros binarios (contando as voltas de cada corrida), depois cada
+    bloco e copiado para a posicao da sua corrida no .npy e, por fim, cada
+    corrida e ordenada por volta no proprio arquivo. O pico de memoria fica
+    limitado por um bloco e pela maior corrida.
+
+    Parameters
+    ----------
+    filepath : str, opcional
+        Caminho do arquivo de voltas. Se None, usa data/lap_times.csv.
+    directory : str, opcional
+        Pasta de destino. Se None, usa .cache/lap_store.
+    chunksize : int
+        Quantidade de linhas lidas por bloco.
+
+    Returns
+    -------
+    str
+        Pasta onde o store foi gravado.
+    """
+    if filepath is None:
+        filepath = tabelas.table_path("lap_times")
+    if directory is None:
+        directory = LAP_STORE_DIR
+    meta = _lap_store_meta(filepath)
+    itemsize = LAP_DTYPE.itemsize
+
+    os.makedirs(directory, exist_ok=True)
+    tmp = f".{os.getpid()}.tmp"
+    raw_path = os.path.join(directory, 'raw' + tmp)
+    laps_path = os.path.join(directory, 'laps.npy' + tmp)
+    try:
+        #1a passada: CSV em blocos -> registros binarios na ordem do arquivo, contando as voltas por corrida
+        counts = np.zeros(0, dtype=np.int64)
+        reader = pd.read_csv(filepath, usecols=list(LAP_COLUMNS), dtype=LAP_COLUMNS, chunksize=chunksize)
+        with reader, open(raw_path, 'wb') as raw:
+            for chunk in reader:
+                records = np.empty(len(chunk), dtype=LAP_DTYPE)
+                for column in LAP_COLUMNS:
+                    records[column] = chunk[column].to_numpy()
+                records.tofile(raw)
+                chunk_counts = np.bincount(records["raceId"])
+                if len(chunk_counts) > len(counts):
+                    counts = np.pad(counts, (0, len(chunk_counts) - len(counts)))
+                counts[:len(chunk_counts)] += chunk_counts
+        race_ids = np.flatnonzero(counts).astype(np.int32)
+        offsets = np.append(0, np.cumsum(counts[race_ids])).astype(np.int64)
+        total = int(offsets[-1])
+
+        with open(raw_path, 'rb') as raw, open(laps_path, 'w+b') as out:
+            np.lib.format.write_array_header_1_0(out, {"descr": np.lib.format.dtype_to_descr(LAP_DTYPE),
+                                                       "fortran_order": False, "shape": (total,)})
+            header = out.tell()
+            out.truncate(header + total * itemsize)
+            #2a passada: cada bloco vai para a posicao da sua corrida, mantendo a ordem do arquivo
+            cursor = np.zeros(len(counts), dtype=np.int64)
+            cursor[race_ids] = offsets[:-1]
+            while True:
+                records = _read_records(raw, chunksize)
+                if len(records) == 0:
+                    break
+                records = records[np.argsort(records["raceId"], kind="stable")]
+                starts = group_starts((records["raceId"],))
+                for start, stop in zip(starts, np.append(starts[1:], len(records))):
+                    race = records["raceId"][start]
+                    out.seek(header + int(cursor[race]) * itemsize)
+                    out.write(records[start:stop].tobytes())
+                    cursor[race] += stop - start
+            #3a passada: ordenacao estavel por volta dentro de cada corrida (empates ficam na ordem do arquivo)
+            for start, stop in zip(offsets[:-1], offsets[1:]):
+                out.seek(header + int(start) * itemsize)
+                block = _read_records(out, int(stop - start))
+                lap = block["lap"]
+                if np.any(lap[1:] < lap[:-1]):
+                    out.seek(header + int(start) * itemsize)
+                    out.write(block[np.argsort(lap, kind="stable")].tobytes())
+
+        with open(os.path.join(directory, 'index.npz' + tmp), 'wb') as f:
+            np.savez(f, race_ids=race_ids, offsets=offsets)
+        with open(os.path.join(directory, 'meta.json' + tmp), 'w') as f:
+            json.dump(meta, f)
+        for name in ('laps.npy', 'index.npz', 'meta.json'):
+            os.replace(os.path.join(directory, name + tmp), os.path.join(directory, name))
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+    return directory
+
+_open_stores = {}
+
+def open_lap_store(filepath: str = None, directory: str = None) -> LapStore:
+    """
+    Abre o LapStore, gerando ou refazendo a conversao quando ela nao existe
+    ou quando o lap_times.csv mudou desde a ultima conversao.
+
+    Parameters
+    ----------
+    filepath : str, opcional
+        Caminho do arquivo de voltas. Se None, usa data/lap_times.csv.
+    directory : str, opcional
+        Pasta do store. Se None, usa .cache/lap_store.
+
+    Returns
+    -------
+    LapStore
+        Store aberto com mmap.
+
+    Examples
+    --------
+    >>> store = open_lap_store()
+    >>> laps = store.race(1098)
+    >>> laps["lap"][:3]
+    memmap([1, 1, 1], dtype=int16)
+    """
+    if filepath is None:
+        filepath = tabelas.table_path("lap_times")
+    if directory is None:
+        directory = LAP_STORE_DIR
+    meta = _lap_store_meta(filepath)
+
+    store = _open_stores.get(directory)
+    if store is not None and store.meta == meta:
+        return store
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            stale = json.load(f) != meta
+    except (OSError, ValueError):
+        stale = True
+    if stale:
+        build_lap_store(filepath, directory)
+    store = LapStore(directory)
+    _open_stores[directory] = store
+    return store
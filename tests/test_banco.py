@@ -0,0 +1,50 @@
+import pytest
+import os
+import sys
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import banco
+import memo
+import tabelas
+import hipotese1
+import hipotese2
+
+
+@pytest.fixture
+def sqlite(tmp_path, monkeypatch):
+    monkeypatch.setattr(banco, "DB_PATH", str(tmp_path / "f1.sqlite"))
+    memo.clear_all()
+    yield
+    memo.clear_all()
+
+def test_backend_igual_ao_csv(sqlite, monkeypatch):
+    races = hipotese2.search_year(2022)
+    esperado = (hipotese1.championship_result(2022), hipotese2.filter_pit_stops(2022, races),
+                hipotese2.constructor_result(2022), hipotese2.pit_stops(2022))
+    memo.clear_all()
+    monkeypatch.setattr(banco, "ENABLED", True)
+    assert hipotese2.search_year(2022).tolist() == races.tolist()
+    pd.testing.assert_frame_equal(hipotese1.championship_result(2022), esperado[0])
+    pd.testing.assert_frame_equal(hipotese2.filter_pit_stops(2022, races), esperado[1])
+    pd.testing.assert_series_equal(hipotese2.constructor_result(2022), esperado[2])
+    pd.testing.assert_frame_equal(hipotese2.pit_stops(2022), esperado[3])
+
+def test_indices_criados(sqlite):
+    banco.ensure_tables(["races", "pit_stops"])
+    nomes = set(banco.query("SELECT name FROM sqlite_master WHERE type = 'index'")["name"])
+    assert {"ix_races_raceId", "ix_races_year", "ix_pit_stops_raceId", "ix_pit_stops_driverId"} <= nomes
+
+def test_tabela_reimportada(sqlite, tmp_path, monkeypatch):
+    monkeypatch.setattr(tabelas, "DATA_DIR", str(tmp_path))
+    arquivo = tmp_path / "races.csv"
+    arquivo.write_text("raceId,year\n1,2000\n2,2001\n")
+    assert banco.races_of_year(2000).tolist() == [1]
+    arquivo.write_text("raceId,year\n1,2000\n2,2001\n3,2000\n")
+    assert banco.races_of_year(2000).tolist() == [1, 3]
+
+def test_dataset_ignora_backend(sqlite, monkeypatch):
+    monkeypatch.setattr(banco, "ENABLED", True)
+    dataset = tabelas.Dataset({"races": pd.DataFrame({"raceId": [7], "year": [2000], "round": [1],
+                                                      "circuitId": [1], "name": ["GP"]})})
+    assert hipotese2.search_year(2000, dataset).tolist() == [7]
+    assert not banco.active(dataset)
@@ -0,0 +1,102 @@
+import pytest
+import io
+import json
+import os
+import sys
+import importlib
+import importlib.util
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import cli
+import hipotese1
+import hipotese2
+import hipotese3
+import tabelas
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    # --cache-dir altera atributos dos modulos e o ambiente; o monkeypatch desfaz tudo no final
+    monkeypatch.setattr(tabelas, "CACHE_DIR", tabelas.CACHE_DIR)
+    for module_name, attribute in cli.CACHE_PATHS:
+        module = importlib.import_module(module_name)
+        monkeypatch.setattr(module, attribute, getattr(module, attribute))
+    monkeypatch.setenv("F1_CACHE_DIR", tabelas.CACHE_DIR)
+    return tmp_path / "cache"
+
+
+def test_hipotese2_csv_stdout(capsys):
+    assert cli.main(["hipotese2", "--years", "2023", "2022", "--no-plot"]) == 0
+    resultado = pd.read_csv(io.StringIO(capsys.readouterr().out)).set_index("constructorId")
+    esperado = hipotese2.pit_stops_across_years(2022, 2023)
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+def test_hipotese1_inclusive_years(cache_dir, capsys):
+    cli.main(["hipotese1", "--years", "2023", "2023", "--no-plot", "--cache-dir", str(cache_dir)])
+    resultado = pd.read_csv(io.StringIO(capsys.readouterr().out))
+    esperado = hipotese1.calculate_hipotesis(2023, 2022, diagnostics="silent")
+    assert len(resultado) == len(esperado) > 0
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+    cli.main(["hipotese1", "--years", "2022", "2023", "--no-plot"])
+    resultado = pd.read_csv(io.StringIO(capsys.readouterr().out))
+    assert len(resultado) == len(hipotese1.calculate_hipotesis(2023, 2021, diagnostics="silent"))
+
+def test_hipotese1_default_years(cache_dir, capsys):
+    cli.main(["hipotese1", "--no-plot", "--cache-dir", str(cache_dir)])
+    resultado = pd.read_csv(io.StringIO(capsys.readouterr().out))
+    # todos os anos padrao tem voltas, entao nenhuma porcentagem fica NaN
+    assert len(resultado) > 0
+    assert resultado["fast"].notna().all()
+    assert resultado["points"].notna().all()
+
+def test_cache_dir(cache_dir, capsys):
+    cli.main(["hipotese1", "--years", "2023", "2023", "--no-plot", "--cache-dir", str(cache_dir)])
+    # o store de voltas e os anos calculados vao para a pasta pedida
+    assert (cache_dir / "lap_store" / "laps.npy").exists()
+    assert [name[:5] for name in os.listdir(cache_dir / "hipotese1")] == ["2023-"]
+    assert os.environ["F1_CACHE_DIR"] == str(cache_dir)
+    assert hipotese1.SEASON_STORE_DIR == str(cache_dir / "hipotese1")
+    assert tabelas.SNAPSHOT_DIR == str(cache_dir / "snapshots")
+
+def test_hipotese3_json_file(tmp_path):
+    arquivo = tmp_path / "h3.json"
+    cli.main(["hipotese3", "--period", "20", "--no-plot", "-o", str(arquivo)])
+    registros = json.loads(arquivo.read_text(encoding="utf-8"))
+    tabela = hipotese3.cubo_de_contagens().tabela(20)
+    assert len(registros) == tabela.shape[0]
+    assert registros[0]["nationality"] == tabela.index[0]
+    assert registros[0][str(tabela.columns[0])] == tabela.iloc[0, 0]
+
+def test_hipotese3_maximos_plot_file(tmp_path, capsys):
+    grafico = tmp_path / "barras.png"
+    cli.main(["hipotese3", "--maximos", "--plot-file", str(grafico), "-f", "json"])
+    registros = json.loads(capsys.readouterr().out)
+    assert set(registros[0]) == {"period", "pilotos", "nationality"}
+    assert grafico.stat().st_size > 0
+
+def test_parquet(tmp_path):
+    arquivo = tmp_path / "h2.parquet"
+    argv = ["hipotese2", "--years", "2022", "2023", "--no-plot", "-o", str(arquivo)]
+    if importlib.util.find_spec("pyarrow") is None and importlib.util.find_spec("fastparquet") is None:
+        with pytest.raises(SystemExit) as erro:
+            cli.main(argv)
+        assert erro.value.code == 2
+        assert not arquivo.exists()
+    else:
+        cli.main(argv)
+        assert len(pd.read_parquet(arquivo)) == len(hipotese2.pit_stops_across_years(2022, 2023))
+
+def test_cli_error():
+    with pytest.raises(SystemExit):
+        cli.main([])
+    with pytest.raises(SystemExit):
+        cli.main(["hipotese3", "--period", "0", "--no-plot"])
+    with pytest.raises(SystemExit):
+        cli.main(["hipotese1", "--years", "1980", "1990", "--no-plot"])
+    with pytest.raises(SystemExit):
+        cli.main(["hipotese1", "--years", "1995", "2000", "--no-plot"])
+    with pytest.raises(ValueError):
+        cli.write_result(pd.DataFrame({"a": [1]}), "xlsx")
@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+import matplotlib
+matplotlib.use("Agg")
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import graficos
+import hipotese1
+import hipotese2
+
+
+def test_scatter_mode():
+    assert graficos.scatter_mode(10) == "pontos"
+    assert graficos.scatter_mode(graficos.DENSITY_THRESHOLD + 1) == "densidade"
+    assert graficos.scatter_mode(10, limite=5) == "densidade"
+    assert graficos.scatter_mode(10**7, "pontos") == "pontos"
+    assert graficos.scatter_mode(1, "densidade") == "densidade"
+    with pytest.raises(ValueError):
+        graficos.scatter_mode(10, "hexbin")
+
+def test_density_grid():
+    x = [0, 0, 1, np.nan]
+    y = [0, 0, 1, 1]
+    anos = [2000, 2010, 2020, 2030]
+    contagens, bordas_x, bordas_y = graficos.density_grid(x, y, bins=2)
+    assert contagens.tolist() == [[2, None], [None, 1]]
+    assert bordas_x.tolist() == [0, 0.5, 1]
+    medias, _, _ = graficos.density_grid(x, y, anos, bins=2)
+    assert medias.tolist() == [[2005, None], [None, 2020]]
+
+def test_plot_density(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 5000
+    combined_df = pd.DataFrame({"mean_pit": rng.normal(25000, 3000, n), "points": rng.exponential(100, n),
+                                "year": rng.integers(2011, 2024, n)})
+    for cor in ("ano", "contagem"):
+        arquivo = tmp_path / f"h2_{cor}.png"
+        hipotese2.plot_scatter(combined_df, str(arquivo), modo="auto", limite=1000, bins=50, cor=cor)
+        assert arquivo.stat().st_size > 0
+    with pytest.raises(ValueError):
+        hipotese2.plot_scatter(combined_df, str(tmp_path / "x.png"), cor="piloto")
+
+    relacao = combined_df.rename(columns={"mean_pit": "points", "points": "fast"})
+    arquivo = tmp_path / "h1.png"
+    hipotese1.plot_hipotesis(relacao, str(arquivo), modo="densidade", bins=50)
+    assert arquivo.stat().st_size > 0
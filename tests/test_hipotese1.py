@@ -3,8 +3,25 @@ import numpy as np
 import pandas as pd
 import sys
 import os
+from unittest.mock import patch
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 import hipotese1
+import tabelas
+import voltas
+import indices
+import memo
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # calculate_hipotesis grava snapshots, o store de voltas e os anos calculados: tudo numa pasta do teste
+    monkeypatch.setattr(tabelas, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(voltas, "LAP_STORE_DIR", str(tmp_path / "lap_store"))
+    monkeypatch.setattr(indices, "INDEX_DIR", str(tmp_path / "indices"))
+    monkeypatch.setattr(memo, "MEMO_DIR", str(tmp_path / "memo"))
+    monkeypatch.setattr(hipotese1, "SEASON_STORE_DIR", str(tmp_path / "hipotese1"))
+    return tmp_path
 
 
 def test_search_year():
@@ -61,6 +78,54 @@ def test_calculate_fastest_laps():
     esperado['fast'] = esperado['fast'].astype('int32')
     pd.testing.assert_frame_equal(real, esperado)
 
+def test_calculate_fastest_laps_sintetico():
+    # empate na volta 1 fica com quem aparece primeiro, o piloto 28 nao esta no campeonato
+    df = pd.DataFrame({
+        'raceId':       [45, 45, 45, 45, 45, 45],
+        'driverId':     [1, 2, 1, 2, 28, 1],
+        'lap':          [1, 1, 2, 2, 2, 3],
+        'milliseconds': [900, 900, 950, 940, 930, 800]
+    })
+    drivers = pd.Index([2, 1], name='driverId')
+    real = hipotese1.calculate_fastest_laps(df, drivers, np.array([45]))
+
+    esperado = pd.DataFrame({'fast': np.array([0, 2], dtype=np.int32)}, index=drivers)
+    pd.testing.assert_frame_equal(real, esperado)
+
+    desconhecidos = []
+    hipotese1.calculate_fastest_laps(df, drivers, np.array([45]), desconhecidos)
+    assert desconhecidos == [(28, 45)]
+
+def test_unknown_drivers_report():
+    real = hipotese1.unknown_drivers_report([(28, 45), (19, 136), (28, 45)])
+    assert real['driverId'].tolist() == [28, 19]
+    assert real['driver'].tolist() == ['Markus Winkelhock', 'Anthony Davidson']
+    assert real['grand_prix'].tolist() == ['European Grand Prix', 'Hungarian Grand Prix']
+    assert real['laps'].tolist() == [2, 1]
+
+def test_unknown_drivers_report_error():
+    with pytest.raises(TypeError):
+        hipotese1.unknown_drivers_report((28, 45))
+
+def test_calculate_fastest_laps_lap_store(tmp_path):
+    import voltas
+    df = pd.DataFrame({
+        'raceId':       [46, 45, 45, 45, 46, 45],
+        'driverId':     [2, 1, 2, 1, 1, 2],
+        'lap':          [1, 1, 1, 2, 1, 2],
+        'position':     [1, 1, 2, 1, 2, 2],
+        'time':         ['1:30.000'] * 6,
+        'milliseconds': [900, 900, 900, 950, 901, 940]
+    })
+    df.to_csv(tmp_path / "lap_times.csv", index=False)
+    store = voltas.open_lap_store(str(tmp_path / "lap_times.csv"), str(tmp_path / "store"))
+    drivers = pd.Index([1, 2], name='driverId')
+    races = np.array([45, 46])
+
+    real = hipotese1.calculate_fastest_laps(store, drivers, races)
+    esperado = hipotese1.calculate_fastest_laps(df, drivers, races)
+    pd.testing.assert_frame_equal(real, esperado)
+
 def test_find_driver_track_err():
     real = hipotese1.find_driver_track_err(28,45)
     esperado = None
@@ -82,6 +147,100 @@ def test_calculate_hipotesis2():
     with pytest.raises(ValueError):
         hipotese1.calculate_hipotesis(10)
 
+def test_calculate_hipotesis_workers(cache, monkeypatch):
+    # force=True e uma pasta vazia: os anos nao vem do disco, entao o calculo paralelo roda de verdade
+    pools = []
+
+    class Pool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(hipotese1, "ProcessPoolExecutor", Pool)
+    serial = hipotese1.calculate_hipotesis(2023, 2020, force=True)
+    assert pools == []
+    paralelo = hipotese1.calculate_hipotesis(2023, 2020, workers=2, force=True)
+    assert pools == [2]
+    pd.testing.assert_frame_equal(serial, paralelo)
+
+def test_calculate_hipotesis_workers_error():
+    with pytest.raises(TypeError):
+        hipotese1.calculate_hipotesis(2023, 2020, workers='2')
+
+def test_calculate_hipotesis_guardado(cache):
+    calculado = hipotese1.calculate_hipotesis(2023, 2021)
+    assert sorted(os.listdir(cache / "hipotese1"))[0].startswith('2022-')
+
+    # os anos guardados sao reaproveitados, e so o que falta e calculado
+    with patch.object(hipotese1, "season_relation", wraps=hipotese1.season_relation) as mock_season:
+        guardado = hipotese1.calculate_hipotesis(2023, 2020)
+        assert [c.args[0] for c in mock_season.call_args_list] == [2021]
+        pd.testing.assert_frame_equal(guardado.iloc[:len(calculado)], calculado)
+
+        hipotese1.calculate_hipotesis(2023, 2021, force=True)
+        assert mock_season.call_count == 3
+
+def test_calculate_hipotesis_guardado_corrompido(cache):
+    calculado = hipotese1.calculate_hipotesis(2023, 2022)
+    for filename in os.listdir(cache / "hipotese1"):
+        (cache / "hipotese1" / filename).write_bytes(b"nao e um pickle")
+    # arquivo corrompido: o ano e recalculado em vez de dar erro
+    with patch.object(hipotese1, "season_relation", wraps=hipotese1.season_relation) as mock_season:
+        pd.testing.assert_frame_equal(hipotese1.calculate_hipotesis(2023, 2022), calculado)
+        assert mock_season.call_count == 1
+
+def test_save_season_concorrente(cache, monkeypatch):
+    season = pd.DataFrame({'fast': [1.0], 'points': [2.0]})
+    hipotese1._save_season(2023, 'antigo', season, [])
+    # outro processo removeu a versao antiga entre o glob e o remove
+    remove = os.remove
+    def removido_antes(path):
+        remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(hipotese1.os, "remove", removido_antes)
+    hipotese1._save_season(2023, 'novo', season, [])
+    assert os.listdir(cache / "hipotese1") == ['2023-novo.pkl']
+
+def test_season_fingerprint_versao(cache, monkeypatch):
+    store = voltas.open_lap_store()
+    chave = hipotese1.season_fingerprint(2023, store)
+    monkeypatch.setattr(hipotese1, "_SEASON_VERSION", hipotese1._SEASON_VERSION + 1)
+    assert hipotese1.season_fingerprint(2023, store) != chave
+
+def test_calculate_hipotesis_diagnostics(cache, capsys):
+    relacao, relatorio = hipotese1.calculate_hipotesis_report(2003, 2001)
+    assert list(relatorio.columns) == ['driverId', 'raceId', 'driver', 'year', 'round', 'grand_prix', 'laps']
+    capsys.readouterr()
+    pd.testing.assert_frame_equal(hipotese1.calculate_hipotesis(2003, 2001, diagnostics="silent"), relacao)
+    assert capsys.readouterr().out == ''
+    for diagnostics in ("log", "return"):
+        with pytest.raises(ValueError):
+            hipotese1.calculate_hipotesis(2003, 2001, diagnostics=diagnostics)
+
+def test_calculate_hipotesis_dataset():
+    # tudo em memoria: nenhuma leitura de arquivo e nada gravado no .cache
+    dataset = tabelas.Dataset({
+        'races': pd.DataFrame({'raceId': [1, 2], 'year': [2000, 2000], 'round': [1, 2],
+                               'circuitId': [1, 2], 'name': ['GP A', 'GP B']}),
+        'driver_standings': pd.DataFrame({'raceId': [1, 1, 2, 2], 'driverId': [1, 2, 1, 2],
+                                          'points': [10.0, 6.0, 30.0, 10.0], 'position': [1, 2, 1, 2]}),
+        'drivers': pd.DataFrame({'driverId': [1, 2, 3], 'forename': ['A', 'B', 'C'], 'surname': ['X', 'Y', 'Z']}),
+        'lap_times': pd.DataFrame({'raceId': [1, 1, 1, 1, 2, 2, 2, 2], 'driverId': [1, 2, 1, 2, 1, 3, 1, 3],
+                                   'lap': [1, 1, 2, 2, 1, 1, 2, 2],
+                                   'milliseconds': [900, 950, 850, 800, 700, 600, 650, 660]}),
+    })
+    with patch.object(tabelas, "read_csv_cached", side_effect=AssertionError("leitura de arquivo")), \
+         patch.object(hipotese1, "_save_season", side_effect=AssertionError("escrita no cache")):
+        relacao, relatorio = hipotese1.calculate_hipotesis_report(2000, 1999, dataset=dataset)
+        assert hipotese1.search_year(2000, dataset).tolist() == [1, 2]
+    esperado = pd.DataFrame({'fast': [200 / 3, 100 / 3], 'points': [75.0, 25.0]})
+    pd.testing.assert_frame_equal(relacao, esperado)
+    assert relatorio[['driverId', 'raceId', 'driver', 'laps']].values.tolist() == [[3, 2, 'C Z', 1]]
+
+def test_calculate_hipotesis_dataset_error():
+    with pytest.raises(TypeError):
+        hipotese1.calculate_hipotesis(2023, dataset={'races': None})
+
 def test_calculate_hipotesis3():
     with pytest.raises(TypeError):
         hipotese1.calculate_hipotesis('a', 10)
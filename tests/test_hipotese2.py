@@ -6,6 +6,7 @@ import os
 from unittest.mock import patch
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 import hipotese2 as hip2
+import tabelas
 
 # Testes para search_year
 def test_search_year():
@@ -44,5 +45,61 @@ def test_pit_stops_error():
     with pytest.raises(TypeError):
         hip2.pit_stops('invalid_year')
 
+# Testes para mean_pit_by_constructor
+def test_mean_pit_by_constructor():
+    agg = pd.DataFrame({'constructorId': [3, 1, 9], 'total_time_ms': [100, 90, 50], 'total_pits': [4, 3, 2]})
+    points = pd.Series([10.0, 8.0, 0.0], index=pd.Index([1, 3, 7], name='constructorId'), name='points')
+    real = hip2.mean_pit_by_constructor(agg, points)
+    # o construtor 7 pontuou sem pit stop (NaN) e o 9 so aparece nos pit stops
+    esperado = pd.DataFrame({'mean_pit': [30.0, 25.0, np.nan, 25.0]},
+                            index=pd.Index([1, 3, 7, 9], name='constructorId'))
+    pd.testing.assert_frame_equal(real, esperado)
+
+def test_mean_pit_by_constructor_error():
+    with pytest.raises(TypeError):
+        hip2.mean_pit_by_constructor("not_a_dataframe", pd.Series(dtype=float))
+
+# Testes para pit_stops_across_years
+def test_pit_stops_across_years():
+    lote = hip2.pit_stops_across_years(2011, 2023)
+    ano_a_ano = hip2.pit_stops_across_years(2011, 2023, batch=False)
+    pd.testing.assert_frame_equal(lote, ano_a_ano)
+    assert list(lote.columns) == ['mean_pit', 'year', 'points']
+    assert lote['year'].unique().tolist() == list(range(2011, 2024))
+
+def test_pit_stops_across_years_vazio():
+    # start_year > end_year: os dois modos retornam o mesmo dataframe vazio
+    lote = hip2.pit_stops_across_years(2015, 2012)
+    pd.testing.assert_frame_equal(lote, hip2.pit_stops_across_years(2015, 2012, batch=False))
+    assert lote.empty and list(lote.columns) == ['mean_pit', 'year', 'points']
+
+def test_pit_stops_dataset():
+    # dados em memoria, sem leitura de arquivo
+    dataset = tabelas.Dataset({
+        'races': pd.DataFrame({'raceId': [10, 11], 'year': [2015, 2015], 'round': [1, 2],
+                               'circuitId': [1, 2], 'name': ['GP A', 'GP B']}),
+        'pit_stops': pd.DataFrame({'raceId': [10, 10, 11, 11], 'driverId': [1, 2, 1, 2], 'stop': [1, 1, 1, 1],
+                                   'milliseconds': [20000, 30000, 24000, 90000]}),
+        'results': pd.DataFrame({'raceId': [10, 10, 11, 11], 'driverId': [1, 2, 1, 2], 'constructorId': [5, 6, 5, 6]}),
+        'constructor_results': pd.DataFrame({'raceId': [10, 10, 11, 11], 'constructorId': [5, 6, 5, 6],
+                                             'points': [10.0, 1.0, 8.0, 0.0]}),
+    })
+    with patch.object(tabelas, "read_csv_cached", side_effect=AssertionError("leitura de arquivo")):
+        resultado = hip2.pit_stops(2015, dataset)
+        lote = hip2.pit_stops_across_years(2015, 2015, dataset=dataset)
+    assert resultado['mean_pit'].to_dict() == {5: 22000.0, 6: 30000.0}
+    assert lote['points'].to_dict() == {5: 18.0, 6: 1.0}
+
+def test_pit_stops_across_years_dataset():
+    dataset = tabelas.load_tables(hip2.TABLES)
+    pd.testing.assert_frame_equal(hip2.pit_stops_across_years(2011, 2023, dataset=dataset),
+                                  hip2.pit_stops_across_years(2011, 2023))
+
+def test_pit_stops_across_years_error():
+    with pytest.raises(ValueError):
+        hip2.pit_stops_across_years(2005, 2023)
+    with pytest.raises(TypeError):
+        hip2.pit_stops_across_years(2011, 2023, batch='sim')
+
 # Execução dos testes
 pytest.main()
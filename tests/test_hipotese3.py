@@ -4,6 +4,7 @@ from unittest.mock import patch
 import pandas as pd
 import warnings
 import os
+import tempfile
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 import hipotese3 as f 
 warnings.filterwarnings("ignore")
@@ -39,7 +40,7 @@ class Test_arrumando_dados(unittest.TestCase):
     def testa_exito_arruma_dados(self):
         dataframe = pd.DataFrame({"nationality": ["British", "German", "Spanish"], "dob": ["1985-01-07", "1977-05-10", "1985-06-27"]})
         
-        dataframe_esperado = pd.DataFrame({"nationality": ["British", "German", "Spanish"], "birth year": [1985, 1977, 1985]})
+        dataframe_esperado = pd.DataFrame({"nationality": pd.Categorical(["British", "German", "Spanish"]), "birth year": [1985, 1977, 1985]})
         
         dataframe_resultante = f.arrumando_dados(dataframe)
         
@@ -59,6 +60,22 @@ class Test_arrumando_dados(unittest.TestCase):
         with self.assertRaises(KeyError):
             f.arrumando_dados(dataframe)
         
+    # Testando datas ausentes, que ficam com ano NaN como na conversão linha a linha
+    def testa_dob_ausente_arruma_dados(self):
+        dataframe = pd.DataFrame({"nationality": ["British", "German"], "dob": ["1985-01-07", None]})
+        dataframe_resultante = f.arrumando_dados(dataframe)
+        self.assertEqual(dataframe_resultante["birth year"].iloc[0], 1985)
+        self.assertTrue(pd.isna(dataframe_resultante["birth year"].iloc[1]))
+
+    # Testando a planilha de pilotos guardada e a ausência de avisos de cópia de fatia
+    def testa_planilha_guardada_arruma_dados(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            dataframe_resultante = f.arrumando_dados()
+            f.classificando_em_periodos(dataframe_resultante, 10)
+        self.assertEqual(dataframe_resultante["nationality"].dtype, "category")
+        self.assertNotIn("period", f.arrumando_dados().columns)
+
 class Test_classificando_em_periodos(unittest.TestCase):
     
     # Fazendo o teste para o caso onde a função classificando_em_periodos funciona considerando um periodo de 10 anos
@@ -187,6 +204,101 @@ class Test_paises_com_mais_pilotos_por_periodo(unittest.TestCase):
         with self.assertRaises(TypeError):
             f.paises_com_mais_pilotos_por_periodo("a")
     
+class Test_CuboDeContagens(unittest.TestCase):
+
+    # Testando se a tabela do cubo é igual à do agrupamento por linhas para vários períodos
+    def testa_exito_tabela_CuboDeContagens(self):
+        dataframe = f.arrumando_dados()
+        cubo = f.cubo_de_contagens()
+        for periodo in (1, 3, 10, 25, 50):
+            dataframe_com_periodo = f.classificando_em_periodos(dataframe.copy(), periodo)
+            tabela_esperada = f.agrupando_nacionalidades_por_periodos_e_transformando_em_tabela(dataframe_com_periodo)
+            pd.testing.assert_frame_equal(cubo.tabela(periodo), tabela_esperada)
+
+    # Testando o caso sem células vazias (tabela inteira) e com anos negativos
+    def testa_tabela_cheia_CuboDeContagens(self):
+        dataframe = pd.DataFrame({"nationality": ["A", "B", "A", "B"], "birth year": [-3, -1, 2, 5]})
+        cubo = f.CuboDeContagens(dataframe)
+        tabela_esperada = pd.DataFrame({-10: [1, 1], 0: [1, 1]}, index=pd.Index(["A", "B"], name="nationality"))
+        tabela_esperada.columns.name = "period"
+        pd.testing.assert_frame_equal(cubo.tabela(10), tabela_esperada)
+        self.assertEqual(cubo.contagens.shape, (2, 9))
+
+    # Testando os erros de parâmetros
+    def testa_erros_CuboDeContagens(self):
+        with self.assertRaises(TypeError):
+            f.CuboDeContagens("a")
+        with self.assertRaises(KeyError):
+            f.CuboDeContagens(pd.DataFrame({"nationality": ["A"]}))
+        cubo = f.CuboDeContagens(pd.DataFrame({"nationality": ["A"], "birth year": [1990]}))
+        with self.assertRaises(ZeroDivisionError):
+            cubo.tabela(0)
+        with self.assertRaises(ValueError):
+            cubo.tabela(-5)
+
+class Test_contagem_em_blocos(unittest.TestCase):
+
+    # Testando se a versão em blocos dá o mesmo resultado que o pipeline com o arquivo inteiro
+    def testa_exito_contagem_em_blocos(self):
+        path = os.path.join(os.path.dirname(__file__), "..", "data", "drivers.csv")
+        tabela_esperada = f.cubo_de_contagens().tabela(10)
+        maximos_esperados, paises_esperados = f.paises_com_mais_pilotos_por_periodo(tabela_esperada)
+        tabela, maximos, paises = f.contagem_em_blocos(path, 10, chunksize=97)
+        pd.testing.assert_frame_equal(tabela, tabela_esperada)
+        pd.testing.assert_series_equal(maximos, maximos_esperados)
+        pd.testing.assert_series_equal(paises, paises_esperados)
+
+    # Testando linhas sem data ou sem nacionalidade, que ficam fora da contagem
+    def testa_dados_ausentes_contagem_em_blocos(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            path = os.path.join(pasta, "pilotos.csv")
+            dataframe = pd.DataFrame({"nationality": ["B", "A", None, "B", "C"],
+                                      "dob": ["1990-03-01", "1971-05-02", "1980-01-01", None, "1955-12-31"]})
+            dataframe.to_csv(path, index=False)
+            tabela_esperada = f.cubo_de_contagens(dataframe).tabela(10)
+            tabela = f.cubo_em_blocos(path, chunksize=2).tabela(10)
+            pd.testing.assert_frame_equal(tabela, tabela_esperada)
+            self.assertEqual(tabela.columns.tolist(), [1950.0, 1970.0, 1990.0])
+
+    # Testando os erros de parâmetros
+    def testa_erros_contagem_em_blocos(self):
+        with self.assertRaises(FileNotFoundError):
+            f.cubo_em_blocos("nao_existe.csv")
+        path = os.path.join(os.path.dirname(__file__), "..", "data", "drivers.csv")
+        with self.assertRaises(ValueError):
+            f.cubo_em_blocos(path, chunksize=0)
+
+class Test_mapa_de_calor_rapido(unittest.TestCase):
+
+    # Testando a gravação em PNG e SVG sem janela, anotando só as células não nulas
+    def testa_exito_mapa_de_calor_rapido(self):
+        tabela = pd.DataFrame({1990: [2.0, 0.0], 2000: [0.0, 5.0]}, index=["A", "B"])
+        with tempfile.TemporaryDirectory() as pasta:
+            for extensao in ("png", "svg"):
+                arquivo = os.path.join(pasta, f"heatmap.{extensao}")
+                figura = f.mapa_de_calor_rapido(tabela, arquivo)
+                self.assertGreater(os.path.getsize(arquivo), 0)
+            textos = [texto.get_text() for texto in figura.axes[0].texts]
+            self.assertEqual(sorted(textos), ["2", "5"])
+            figura = f.mapa_de_calor_rapido(tabela, os.path.join(pasta, "top.png"), top_n=1)
+            self.assertEqual([texto.get_text() for texto in figura.axes[0].texts], ["5"])
+
+    # Testando o modo imagem pela função de visualização e os erros de parâmetros
+    def testa_modo_imagem_visualizando_pilotos_por_pais_e_periodo(self):
+        tabela = f.cubo_de_contagens().tabela(2)
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = os.path.join(pasta, "heatmap.png")
+            f.visualizando_pilotos_por_pais_e_periodo(tabela, True, modo="imagem", arquivo=arquivo, top_n=20)
+            self.assertTrue(os.path.exists(arquivo))
+        with self.assertRaises(ValueError):
+            f.visualizando_pilotos_por_pais_e_periodo(tabela, True, modo="svg")
+        with self.assertRaises(ValueError):
+            f.mapa_de_calor_rapido(tabela, top_n=-1)
+        with self.assertRaises(ValueError):
+            f.mapa_de_calor_rapido(tabela, top_n=0)
+        with self.assertRaises(TypeError):
+            f.mapa_de_calor_rapido(tabela, top_n=2.5)
+
 class Test_visualizando_quais_paises_nasceram_mais_pilotos_por_periodo(unittest.TestCase):
     
     # Testando caso onde passamos parâmetros de tipo inválido para a função
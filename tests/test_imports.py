@@ -0,0 +1,22 @@
+import pytest
+import os
+import sys
+import json
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# so o que e deterministico: importar o modulo nao carrega matplotlib/seaborn.
+# O orcamento de tempo fica com benchmarks/bench_import.py
+_CODE = """
+import sys, json
+import {module}
+print(json.dumps([m for m in ("matplotlib", "seaborn") if m in sys.modules]))
+"""
+
+@pytest.mark.parametrize("module", ["hipotese1", "hipotese2", "hipotese3", "relatorio"])
+def test_import_is_light(module):
+    saida = subprocess.run([sys.executable, "-c", _CODE.format(module=module)],
+                           cwd=SRC, capture_output=True, text=True, check=True).stdout
+    plotting = json.loads(saida.strip().splitlines()[-1])
+    assert plotting == []
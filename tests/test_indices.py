@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import indices
+
+
+def test_race_index_ano():
+    real = indices.race_index().races_of_year(2015)
+    races = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "data", "races.csv"))
+    esperado = np.sort(races[races["year"] == 2015]["raceId"].to_numpy())
+    np.testing.assert_array_equal(real, esperado)
+    assert not real.flags.writeable
+    assert len(indices.race_index().races_of_year(1900)) == 0
+
+def test_race_index_corrida():
+    info = indices.race_index().race_info(45)
+    assert (info.year, info.round, info.name) == (2007, 10, "European Grand Prix")
+    assert indices.race_index().year_of_race(1098) == 2023
+    with pytest.raises(KeyError):
+        indices.race_index().race_info(-1)
+
+def test_race_index_compartilhado():
+    assert indices.race_index() is indices.race_index()
+
+def test_race_index_error():
+    with pytest.raises(TypeError):
+        indices.RaceIndex("races")
+    with pytest.raises(KeyError):
+        indices.RaceIndex(pd.DataFrame({"raceId": [1]}))
+
+def test_constructor_index():
+    resultados = pd.DataFrame({"raceId": [10, 10, 11, 10], "driverId": [1, 2, 1, 1], "constructorId": [5, 6, 7, 9]})
+    sprints = pd.DataFrame({"raceId": [12], "driverId": [3], "constructorId": [8]})
+    indice = indices.ConstructorIndex.from_frames(resultados, sprints)
+    assert len(indice) == 4
+    # par repetido fica com a primeira ocorrencia, par inexistente vira -1
+    np.testing.assert_array_equal(indice.lookup([10, 11, 12, 13], [1, 1, 3, 1]), [5, 7, 8, -1])
+
+def test_constructor_index_salvo(tmp_path):
+    indice = indices.ConstructorIndex.from_frames(pd.DataFrame({"raceId": [1], "driverId": [2], "constructorId": [3]}))
+    indice.save(str(tmp_path / "indice.npz"), {"versao": 1})
+    carregado, meta = indices.ConstructorIndex.load(str(tmp_path / "indice.npz"))
+    assert meta == {"versao": 1}
+    np.testing.assert_array_equal(carregado.lookup([1], [2]), [3])
+
+def test_constructor_index_compartilhado():
+    assert indices.constructor_index() is indices.constructor_index()
+    np.testing.assert_array_equal(indices.constructor_index(include_sprints=True).lookup([1098], [830]), [9])
+    with pytest.raises(TypeError):
+        indices.constructor_index("sim")
@@ -0,0 +1,87 @@
+import pytest
+import os
+import sys
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+import memo
+import hipotese2
+
+
+@pytest.fixture
+def dados(tmp_path, monkeypatch):
+    # pasta de dados e de cache temporarias, com uma tabela pequena
+    monkeypatch.setattr(tabelas, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(memo, "MEMO_DIR", str(tmp_path / "memo"))
+    os.makedirs(tmp_path / "data")
+    arquivo = tmp_path / "data" / "valores.csv"
+    arquivo.write_text("ano,valor\n2020,1\n2020,2\n2021,5\n")
+    return arquivo
+
+def soma_por_ano(chamadas: list, **opcoes):
+    @memo.memoize(["valores"], **opcoes)
+    def soma(ano: int, dataset=None) -> pd.Series:
+        chamadas.append(ano)
+        df = tabelas.resolve_dataset(dataset).table("valores")
+        return df[df["ano"] == ano].groupby("ano")["valor"].sum()
+    return soma
+
+def test_memoize_lru(dados):
+    chamadas = []
+    soma = soma_por_ano(chamadas, maxsize=2, disk=False)
+    assert soma(2020).tolist() == [3]
+    soma(ano=2020)
+    soma(2021)
+    soma(2022)
+    # 2020 saiu do LRU ao entrar o terceiro ano
+    soma(2020)
+    assert chamadas == [2020, 2021, 2022, 2020]
+    assert soma.cache_info()["hits"] == 1
+    assert soma.cache_info()["entries"] == 2
+
+def test_memoize_copia(dados):
+    soma = soma_por_ano([], disk=False)
+    resultado = soma(2020)
+    resultado[2020] = 100
+    assert soma(2020).tolist() == [3]
+
+def test_memoize_csv_alterado(dados):
+    chamadas = []
+    soma = soma_por_ano(chamadas, disk=False)
+    soma(2020)
+    dados.write_text("ano,valor\n2020,1\n2020,2\n2020,4\n")
+    assert soma(2020).tolist() == [7]
+    assert chamadas == [2020, 2020]
+
+def test_memoize_dataset(dados):
+    chamadas = []
+    soma = soma_por_ano(chamadas, disk=False)
+    dataset = tabelas.Dataset({"valores": pd.DataFrame({"ano": [2020], "valor": [9]})})
+    assert soma(2020, dataset=dataset).tolist() == [9]
+    assert soma(2020, dataset=dataset).tolist() == [9]
+    assert chamadas == [2020, 2020]
+
+def test_memoize_disco(dados, monkeypatch):
+    chamadas = []
+    soma_por_ano(chamadas, disk=True)(2020)
+    # outra instancia (como outro processo) le o resultado do disco
+    outra = soma_por_ano(chamadas, disk=True)
+    assert outra(2020).tolist() == [3]
+    assert outra.cache_info()["disk_hits"] == 1
+    assert chamadas == [2020]
+    # com limite zero a camada em disco e esvaziada a cada gravacao
+    monkeypatch.setattr(memo, "DISK_MAX_BYTES", 0)
+    outra(2021)
+    assert not os.listdir(os.path.join(memo.MEMO_DIR, os.listdir(memo.MEMO_DIR)[0]))
+
+def test_memoize_error():
+    with pytest.raises(TypeError):
+        memo.memoize("races")
+    with pytest.raises(ValueError):
+        memo.memoize(["races"], maxsize=0)
+
+def test_memoize_hipotese2():
+    hipotese2.constructor_result.cache_clear()
+    primeira = hipotese2.constructor_result(2023)
+    pd.testing.assert_series_equal(hipotese2.constructor_result(2023), primeira)
+    assert hipotese2.constructor_result.cache_info()["hits"] == 1
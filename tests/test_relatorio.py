@@ -0,0 +1,36 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import relatorio
+
+
+def test_render_reports(tmp_path):
+    parametros = {"anos_h1": (2023, 2021), "anos_h2": (2022, 2023), "periodo": 20}
+    resultado = relatorio.render_reports(str(tmp_path), workers=2, **parametros)
+    for name in relatorio.FIGURES:
+        assert resultado[name]["renderizado"]
+        assert os.path.getsize(resultado[name]["arquivo"]) > 0
+    with open(resultado["index"], encoding="utf-8") as f:
+        index = f.read()
+    assert all(f"{name}.png" in index for name in relatorio.FIGURES)
+
+    # sem mudanca nos dados nada e refeito; outro periodo refaz so as figuras da hipotese 3
+    resultado = relatorio.render_reports(str(tmp_path), **parametros)
+    assert not any(resultado[name]["renderizado"] for name in relatorio.FIGURES)
+    resultado = relatorio.render_reports(str(tmp_path), **{**parametros, "periodo": 10})
+    assert [name for name in relatorio.FIGURES if resultado[name]["renderizado"]] == \
+        ["hipotese3_mapa_de_calor", "hipotese3_barras"]
+
+def test_render_reports_svg(tmp_path):
+    resultado = relatorio.render_reports(str(tmp_path), figures=["hipotese3_barras"], formato="svg", workers=1)
+    assert resultado["hipotese3_barras"]["arquivo"].endswith(".svg")
+    assert os.path.exists(resultado["hipotese3_barras"]["arquivo"])
+
+def test_render_reports_error(tmp_path):
+    with pytest.raises(ValueError):
+        relatorio.render_reports(str(tmp_path), formato="jpg")
+    with pytest.raises(KeyError):
+        relatorio.render_reports(str(tmp_path), figures=["hipotese4"])
+    with pytest.raises(ValueError):
+        relatorio.render_reports(str(tmp_path), anos=(2020, 2021))
@@ -0,0 +1,146 @@
+import pytest
+import pandas as pd
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import tabelas
+
+
+def test_load_table_cache():
+    tabelas.clear_cache()
+    primeira = tabelas.load_table("races")
+    segunda = tabelas.load_table("races.csv")
+    stats = tabelas.cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["entries"] == 1
+    assert stats["bytes"] > 0
+    pd.testing.assert_frame_equal(primeira, segunda)
+
+def test_load_table_somente_leitura():
+    races = tabelas.load_table("races")
+    with pytest.raises(ValueError):
+        races.loc[0, "year"] = 1800
+    # colunas novas ficam apenas na copia devolvida
+    races["nova"] = 1
+    assert "nova" not in tabelas.load_table("races").columns
+
+def test_read_csv_cached_recarrega(tmp_path):
+    arquivo = tmp_path / "tabela.csv"
+    arquivo.write_text("a,b\n1,2\n")
+    assert tabelas.read_csv_cached(str(arquivo))["a"].tolist() == [1]
+    arquivo.write_text("a,b\n1,2\n3,4\n")
+    assert tabelas.read_csv_cached(str(arquivo))["a"].tolist() == [1, 3]
+
+def test_clear_cache():
+    tabelas.load_table("races")
+    tabelas.clear_cache()
+    assert tabelas.cache_stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+
+def test_read_csv_cached_error():
+    with pytest.raises(TypeError):
+        tabelas.read_csv_cached(10)
+
+def test_snapshot_desatualizado(tmp_path, monkeypatch):
+    monkeypatch.setattr(tabelas, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(tabelas, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(tabelas, "USE_SNAPSHOTS", True)
+    monkeypatch.setattr(tabelas, "SNAPSHOT_MIN_BYTES", 0)
+    arquivo = tmp_path / "tabela.csv"
+    arquivo.write_text("a,b\n1,x\n2,\n")
+    alvo = tabelas.build_snapshot("tabela")
+    assert os.path.exists(alvo)
+    tabelas.clear_cache()
+    pd.testing.assert_frame_equal(tabelas.load_table("tabela"), pd.read_csv(str(arquivo)))
+
+    # o CSV mudou, o snapshot antigo nao pode ser usado
+    arquivo.write_text("a,b\n1,x\n2,\n3,y\n")
+    tabelas.clear_cache()
+    pd.testing.assert_frame_equal(tabelas.load_table("tabela"), pd.read_csv(str(arquivo)))
+
+def test_snapshot_feather_interrompido(tmp_path, monkeypatch):
+    # feather simulado com pickle, para rodar sem o pyarrow
+    monkeypatch.setattr(tabelas, "HAS_PYARROW", True)
+    monkeypatch.setattr(pd.DataFrame, "to_feather", lambda df, path: df.to_pickle(path), raising=False)
+    monkeypatch.setattr(pd, "read_feather", pd.read_pickle)
+    alvo = str(tmp_path / "tabela.feather")
+    antigo = {"version": 1, "mtime_ns": 1, "size": 1}
+    novo = {"version": 1, "mtime_ns": 2, "size": 2}
+    tabelas._write_snapshot(pd.DataFrame({"a": [1]}), alvo, antigo)
+
+    # a escrita do novo snapshot para antes de trocar o .feather
+    replace = os.replace
+    def falha_no_feather(origem, destino):
+        if destino == alvo:
+            raise OSError("interrompido")
+        replace(origem, destino)
+    monkeypatch.setattr(tabelas.os, "replace", falha_no_feather)
+    with pytest.raises(OSError):
+        tabelas._write_snapshot(pd.DataFrame({"a": [2]}), alvo, novo)
+    monkeypatch.setattr(tabelas.os, "replace", replace)
+    assert tabelas._read_snapshot(alvo, novo) is None
+    assert tabelas._read_snapshot(alvo, antigo)["a"].tolist() == [1]
+
+def test_snapshot_arquivo_pequeno(tmp_path, monkeypatch):
+    monkeypatch.setattr(tabelas, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(tabelas, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(tabelas, "USE_SNAPSHOTS", True)
+    monkeypatch.setattr(tabelas, "SNAPSHOT_MIN_BYTES", 100)
+    (tmp_path / "pequena.csv").write_text("a,b\n1,x\n")
+    (tmp_path / "grande.csv").write_text("a,b\n" + "1,x\n" * 50)
+    tabelas.clear_cache()
+    tabelas.load_table("pequena")
+    tabelas.load_table("grande")
+    # so o arquivo acima do limite ganha snapshot
+    assert os.listdir(tmp_path / "snapshots") == [os.path.basename(tabelas.snapshot_path("grande.csv"))]
+    assert tabelas.build_snapshots() == [tabelas.snapshot_path("grande.csv")]
+
+def test_load_tables():
+    tabelas.clear_cache()
+    dataset = tabelas.load_tables(["races", "pit_stops.csv", "races"])
+    assert dataset.names == ["pit_stops", "races"]
+    assert "races" in dataset
+    assert tabelas.cache_stats()["misses"] == 2
+    pd.testing.assert_frame_equal(dataset.table("races"), tabelas.load_table("races"))
+    # tabelas fora do conjunto sao lidas da pasta de dados
+    assert "drivers" not in dataset
+    assert not dataset.table("drivers").empty
+
+def test_load_tables_workers(monkeypatch):
+    criados = []
+
+    class Pool(tabelas.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            criados.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(tabelas, "ThreadPoolExecutor", Pool)
+    # uma so CPU: uma tabela apos a outra, sem pool
+    monkeypatch.setattr(tabelas.os, "cpu_count", lambda: 1)
+    tabelas.load_tables(["races", "pit_stops"])
+    assert criados == []
+    tabelas.load_tables(["races", "pit_stops"], workers=4)
+    assert criados == [2]
+    monkeypatch.setattr(tabelas.os, "cpu_count", lambda: 8)
+    dataset = tabelas.load_tables(["races", "pit_stops", "results"])
+    assert criados == [2, 3]
+    assert dataset.names == ["pit_stops", "races", "results"]
+
+def test_load_tables_error():
+    with pytest.raises(TypeError):
+        tabelas.load_tables("races")
+    with pytest.raises(ValueError):
+        tabelas.load_tables(["races"], workers=0)
+    with pytest.raises(FileNotFoundError):
+        tabelas.load_tables(["nao_existe"])
+
+def test_dataset_em_memoria():
+    races = pd.DataFrame({"raceId": [1, 2], "year": [2020, 2021]})
+    dataset = tabelas.Dataset({"races.csv": races})
+    tabela = dataset.table("races")
+    tabela["nova"] = 1
+    assert "nova" not in dataset.table("races").columns
+    with pytest.raises(KeyError):
+        dataset.table("drivers")
+    with pytest.raises(TypeError):
+        tabelas.Dataset({"races": [1, 2]})
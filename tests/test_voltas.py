@@ -0,0 +1,100 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+import voltas
+
+
+@pytest.fixture
+def lap_file(tmp_path):
+    df = pd.DataFrame({
+        'raceId':       [1, 1, 2, 2, 3, 3, 1],
+        'driverId':     [10, 11, 10, 11, 10, 11, 10],
+        'lap':          [1, 1, 1, 1, 1, 1, 2],
+        'position':     [1, 2, 1, 2, 1, 2, 1],
+        'time':         ['1:30.000'] * 7,
+        'milliseconds': [90000, 91000, 92000, 93000, 94000, 95000, 96000]
+    })
+    path = tmp_path / "lap_times.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+def test_read_lap_times(lap_file):
+    real = voltas.read_lap_times(np.array([1, 3]), lap_file, chunksize=2)
+    assert list(real.columns) == ['raceId', 'driverId', 'lap', 'milliseconds']
+    assert real['lap'].dtype == np.int16
+    assert real['milliseconds'].dtype == np.int32
+    assert real['raceId'].tolist() == [1, 1, 3, 3, 1]
+    assert real['milliseconds'].tolist() == [90000, 91000, 94000, 95000, 96000]
+
+def test_read_lap_times_vazio(lap_file):
+    real = voltas.read_lap_times(np.array([99]), lap_file)
+    assert real.empty
+    assert real['raceId'].dtype == np.int32
+
+def test_read_lap_times_error(lap_file):
+    with pytest.raises(TypeError):
+        voltas.read_lap_times([1, 2], lap_file)
+    with pytest.raises(ValueError):
+        voltas.read_lap_times(None, lap_file, chunksize=0)
+
+def test_lap_store(lap_file, tmp_path):
+    store = voltas.open_lap_store(lap_file, str(tmp_path / "store"))
+    assert len(store) == 7
+    assert 2 in store and 99 not in store
+
+    corrida = store.race(1)
+    # fatia do arquivo mapeado, sem copia, ordenada por volta
+    assert isinstance(corrida, np.memmap)
+    assert corrida['lap'].tolist() == [1, 1, 2]
+    assert corrida['driverId'].tolist() == [10, 11, 10]
+    assert len(store.race(99)) == 0
+    assert store.races(np.array([3, 1]))['raceId'].tolist() == [3, 3, 1, 1, 1]
+
+def test_lap_store_desatualizado(lap_file, tmp_path):
+    directory = str(tmp_path / "store")
+    assert len(voltas.open_lap_store(lap_file, directory)) == 7
+    with open(lap_file, 'a') as f:
+        f.write("4,10,1,1,1:30.000,90500\n")
+    store = voltas.open_lap_store(lap_file, directory)
+    assert len(store) == 8
+    assert store.race(4)['milliseconds'].tolist() == [90500]
+
+def test_build_lap_store_em_blocos(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame({'raceId': rng.integers(1, 30, n), 'driverId': rng.integers(1, 20, n),
+                       'lap': rng.integers(1, 10, n), 'position': 1, 'time': '1:30.000',
+                       'milliseconds': rng.integers(80000, 80010, n)})
+    path = str(tmp_path / "lap_times.csv")
+    df.to_csv(path, index=False)
+    # corridas misturadas e blocos pequenos: mesmo resultado da ordenacao estavel de tudo na memoria
+    directory = voltas.build_lap_store(path, str(tmp_path / "store"), chunksize=37)
+    store = voltas.LapStore(directory)
+    order = np.lexsort((df['lap'].to_numpy(), df['raceId'].to_numpy()))
+    for column in voltas.LAP_COLUMNS:
+        np.testing.assert_array_equal(store.laps[column], df[column].to_numpy()[order])
+    np.testing.assert_array_equal(store.race_ids, np.unique(df['raceId']))
+    assert sorted(os.listdir(directory)) == ['index.npz', 'laps.npy', 'meta.json']
+
+def test_grouped_argmin():
+    race = np.array([2, 1, 1, 2, 1, 1])
+    lap = np.array([1, 1, 1, 1, 2, 2])
+    ms = np.array([95, 90, 89, 95, 91, 91])
+    # grupos em ordem de chave; empate fica com a primeira linha
+    np.testing.assert_array_equal(voltas.grouped_argmin(ms, (race, lap)), [2, 4, 0])
+    np.testing.assert_array_equal(voltas.grouped_argmax(ms, (race, lap)), [1, 4, 0])
+
+def test_grouped_argmin_presorted():
+    race = np.array([5, 5, 5, 3, 3])
+    ms = np.array([3.0, np.nan, 1.0, np.nan, np.nan])
+    np.testing.assert_array_equal(voltas.grouped_argmin(ms, (race,), presorted=True), [2, 3])
+    np.testing.assert_array_equal(voltas.group_starts((race,)), [0, 3])
+
+def test_grouped_argmin_error():
+    with pytest.raises(TypeError):
+        voltas.grouped_argmin(np.array([1]), np.array([1]))
+    with pytest.raises(ValueError):
+        voltas.grouped_argmin(np.array([1, 2]), (np.array([1]),))